@@ -15,7 +15,8 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from app.core.config import settings
 from app.models.base import Base
 from app.models.user import User
-from app.models.news import News, Category, Tag, NewsTag
+from app.models.news import News, Category, Tag, NewsTag, NewsCounter
+from app.models.source import Source
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -36,6 +37,19 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+# 由数据库维护、不在 ORM 中映射的全文检索对象，autogenerate 时忽略
+UNMAPPED_FULLTEXT_OBJECTS = {"search_vector", "ix_news_search_vector", "news_fts"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """过滤 autogenerate 需要比较的对象"""
+    if reflected and compare_to is None and (
+        name in UNMAPPED_FULLTEXT_OBJECTS or name.startswith("news_fts_")
+    ):
+        return False
+    return True
+
+
 def get_url():
     """获取数据库URL"""
     return settings.DATABASE_URL
@@ -57,6 +71,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -84,7 +99,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,132 @@
+"""News full-text search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# 汉字切成二元组，字母数字按词切分（与 app/services/search_index.tokenize 一致）
+CJK_BIGRAMS_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION news_cjk_bigrams(source text) RETURNS text AS $$
+DECLARE
+    run text;
+    result text := '';
+BEGIN
+    IF source IS NULL THEN
+        RETURN '';
+    END IF;
+    FOR run IN SELECT (regexp_matches(lower(source), '[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+', 'g'))[1] LOOP
+        IF run ~ '^[a-z0-9]+$' OR char_length(run) = 1 THEN
+            result := result || ' ' || run;
+        ELSE
+            FOR i IN 1 .. char_length(run) - 1 LOOP
+                result := result || ' ' || substr(run, i, 2);
+            END LOOP;
+        END IF;
+    END LOOP;
+    RETURN result;
+END
+$$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+SEARCH_VECTOR_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION news_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', news_cjk_bigrams(NEW.title)), 'A') ||
+        setweight(to_tsvector('simple', news_cjk_bigrams(NEW.summary)), 'B') ||
+        setweight(to_tsvector('simple', news_cjk_bigrams(NEW.content)), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == 'postgresql':
+        # 可空列且无默认值，只修改元数据，不重写表
+        op.execute(CJK_BIGRAMS_FUNCTION)
+        op.execute(SEARCH_VECTOR_TRIGGER_FUNCTION)
+        op.execute("ALTER TABLE news ADD COLUMN search_vector tsvector")
+        op.execute(
+            "CREATE TRIGGER news_search_vector_trigger "
+            "BEFORE INSERT OR UPDATE OF title, summary, content "
+            "ON news FOR EACH ROW EXECUTE FUNCTION news_search_vector_update()"
+        )
+
+        # 分批回填并逐批提交，避免长事务持有大量行锁；
+        # 对 title 自赋值即可触发触发器计算 search_vector
+        with op.get_context().autocommit_block():
+            max_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM news")).scalar()
+            for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+                bind.execute(
+                    sa.text(
+                        "UPDATE news SET title = title "
+                        "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+                    ),
+                    {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+                )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_news_search_vector "
+                "ON news USING gin (search_vector)"
+            )
+
+    elif dialect == 'sqlite':
+        # 外部内容 FTS5 虚拟表 + 同步触发器
+        op.execute(
+            "CREATE VIRTUAL TABLE news_fts USING fts5("
+            "title, summary, content, content='news', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER news_fts_ai AFTER INSERT ON news BEGIN "
+            "INSERT INTO news_fts(rowid, title, summary, content) "
+            "VALUES (new.id, new.title, new.summary, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER news_fts_ad AFTER DELETE ON news BEGIN "
+            "INSERT INTO news_fts(news_fts, rowid, title, summary, content) "
+            "VALUES ('delete', old.id, old.title, old.summary, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER news_fts_au AFTER UPDATE OF title, summary, content ON news BEGIN "
+            "INSERT INTO news_fts(news_fts, rowid, title, summary, content) "
+            "VALUES ('delete', old.id, old.title, old.summary, old.content); "
+            "INSERT INTO news_fts(rowid, title, summary, content) "
+            "VALUES (new.id, new.title, new.summary, new.content); END"
+        )
+        # 为已有数据建立索引
+        op.execute("INSERT INTO news_fts(news_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_news_search_vector")
+        op.execute("DROP TRIGGER IF EXISTS news_search_vector_trigger ON news")
+        op.execute("ALTER TABLE news DROP COLUMN IF EXISTS search_vector")
+        op.execute("DROP FUNCTION IF EXISTS news_search_vector_update()")
+        op.execute("DROP FUNCTION IF EXISTS news_cjk_bigrams(text)")
+
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS news_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS news_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS news_fts_ai")
+        op.execute("DROP TABLE IF EXISTS news_fts")
@@ -0,0 +1,29 @@
+"""News keyset pagination index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 支持 is_published = true ORDER BY created_at DESC, id DESC 及 (created_at, id) 行值定位
+    op.create_index(
+        'ix_news_published_created_at_id',
+        'news',
+        ['is_published', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_news_published_created_at_id', table_name='news')
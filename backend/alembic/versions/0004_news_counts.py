@@ -0,0 +1,99 @@
+"""News counters for list totals
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = "category_id, is_featured, is_breaking, is_published"
+
+DECREMENT = (
+    "UPDATE news_counts SET news_count = news_count - 1 "
+    "WHERE category_id = old.category_id AND is_featured = old.is_featured "
+    "AND is_breaking = old.is_breaking AND is_published = old.is_published;"
+)
+INCREMENT = (
+    f"INSERT INTO news_counts ({COLUMNS}, news_count) "
+    "VALUES (new.category_id, new.is_featured, new.is_breaking, new.is_published, 1) "
+    f"ON CONFLICT ({COLUMNS}) DO UPDATE SET news_count = news_counts.news_count + 1;"
+)
+
+COUNTS_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION news_counts_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {DECREMENT}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {INCREMENT}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    op.create_table('news_counts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('is_featured', sa.Boolean(), nullable=False),
+        sa.Column('is_breaking', sa.Boolean(), nullable=False),
+        sa.Column('is_published', sa.Boolean(), nullable=False),
+        sa.Column('news_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('category_id', 'is_featured', 'is_breaking', 'is_published', name='uq_news_counts_filters')
+    )
+    op.create_index(op.f('ix_news_counts_id'), 'news_counts', ['id'], unique=False)
+
+    # 触发器与回填在同一事务中：PostgreSQL 创建触发器时持有的锁会阻塞并发写入直到提交，
+    # 因此回填的快照与之后由触发器维护的增量不会重复或遗漏
+    if dialect == 'postgresql':
+        op.execute(COUNTS_TRIGGER_FUNCTION)
+        op.execute(
+            "CREATE TRIGGER news_counts_trigger "
+            f"AFTER INSERT OR DELETE OR UPDATE OF {COLUMNS} "
+            "ON news FOR EACH ROW EXECUTE FUNCTION news_counts_update()"
+        )
+    elif dialect == 'sqlite':
+        op.execute(f"CREATE TRIGGER news_counts_ai AFTER INSERT ON news BEGIN {INCREMENT} END")
+        op.execute(f"CREATE TRIGGER news_counts_ad AFTER DELETE ON news BEGIN {DECREMENT} END")
+        op.execute(
+            f"CREATE TRIGGER news_counts_au AFTER UPDATE OF {COLUMNS} ON news "
+            f"BEGIN {DECREMENT} {INCREMENT} END"
+        )
+
+    op.execute(
+        f"INSERT INTO news_counts ({COLUMNS}, news_count) "
+        f"SELECT {COLUMNS}, count(*) FROM news GROUP BY {COLUMNS}"
+    )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS news_counts_trigger ON news")
+        op.execute("DROP FUNCTION IF EXISTS news_counts_update()")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS news_counts_au")
+        op.execute("DROP TRIGGER IF EXISTS news_counts_ad")
+        op.execute("DROP TRIGGER IF EXISTS news_counts_ai")
+
+    op.drop_index(op.f('ix_news_counts_id'), table_name='news_counts')
+    op.drop_table('news_counts')
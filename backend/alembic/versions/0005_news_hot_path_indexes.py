@@ -0,0 +1,72 @@
+"""News hot-path listing and tag indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+# (索引名, 表名, 列, PostgreSQL 部分索引条件, SQLite 部分索引条件)
+INDEXES = [
+    (
+        'ix_news_published_category_created_at_id', 'news', ['category_id', 'created_at', 'id'],
+        'is_published', 'is_published = 1',
+    ),
+    (
+        'ix_news_published_featured_created_at_id', 'news', ['is_featured', 'created_at', 'id'],
+        'is_published', 'is_published = 1',
+    ),
+    (
+        'ix_news_published_breaking_created_at_id', 'news', ['is_breaking', 'created_at', 'id'],
+        'is_published', 'is_published = 1',
+    ),
+    ('ix_news_tags_tag_id_news_id', 'news_tags', ['tag_id', 'news_id'], None, None),
+]
+
+
+def _is_invalid_index(bind, name: str) -> bool:
+    return bind.execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first() is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    context = op.get_context()
+
+    # CONCURRENTLY 不能在事务中执行；逐个建索引，不阻塞线上读写
+    with context.autocommit_block():
+        for name, table, columns, postgresql_where, sqlite_where in INDEXES:
+            # 上次中断的并发建索引会留下无效索引，IF NOT EXISTS 会跳过它，需先删除
+            if bind.dialect.name == 'postgresql' and not context.as_sql and _is_invalid_index(bind, name):
+                op.execute(f"DROP INDEX CONCURRENTLY {name}")
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(postgresql_where) if postgresql_where else None,
+                sqlite_where=sa.text(sqlite_where) if sqlite_where else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, *_ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
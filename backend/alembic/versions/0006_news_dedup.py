@@ -0,0 +1,41 @@
+"""News near-duplicate signatures
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 可空列不带默认值，PostgreSQL 只修改目录，不重写表
+    op.add_column('news', sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+    op.create_table('news_signatures',
+        sa.Column('news_id', sa.Integer(), nullable=False),
+        sa.Column('minhash', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['news_id'], ['news.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('news_id')
+    )
+
+    # 已有新闻的签名和重复标记由 `python dev_tools.py dedup` 批量生成
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_news_duplicate_of_id'), 'news', ['duplicate_of_id'],
+            unique=False, if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_news_duplicate_of_id'), table_name='news', if_exists=True, postgresql_concurrently=True)
+    op.drop_table('news_signatures')
+    op.drop_column('news', 'duplicate_of_id')
@@ -0,0 +1,46 @@
+"""News sources for the crawler
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('sources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('url', sa.String(length=1000), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('etag', sa.String(length=500), nullable=True),
+        sa.Column('last_modified', sa.String(length=100), nullable=True),
+        sa.Column('last_fetched_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_status', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sources_id'), 'sources', ['id'], unique=False)
+    op.create_index(op.f('ix_sources_url'), 'sources', ['url'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sources_url'), table_name='sources')
+    op.drop_index(op.f('ix_sources_id'), table_name='sources')
+    op.drop_table('sources')
@@ -4,7 +4,7 @@ API v1 路由聚合
 """
 from fastapi import APIRouter
 
-from .endpoints import auth, news
+from .endpoints import auth, feeds, news, sitemaps, sources
 
 api_router = APIRouter()
 
@@ -20,4 +20,25 @@ api_router.include_router(
     news.router,
     prefix="/news",
     tags=["新闻"]
-) 
\ No newline at end of file
+)
+
+# 包含订阅源路由
+api_router.include_router(
+    feeds.router,
+    prefix="/feeds",
+    tags=["订阅源"]
+)
+
+# 包含站点地图路由
+api_router.include_router(
+    sitemaps.router,
+    prefix="/sitemaps",
+    tags=["站点地图"]
+)
+
+# 包含新闻来源路由
+api_router.include_router(
+    sources.router,
+    prefix="/sources",
+    tags=["来源"]
+)
\ No newline at end of file
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from ....core.config import settings
 from ....core.database import get_db
 from ....core.security import create_access_token, create_refresh_token
+from ....core.deps import get_current_user, get_current_read_user
 from ....schemas.user import User, UserCreate, Token, UserPasswordChange
 from ....services.user_service import UserService
 
@@ -126,7 +127,7 @@ def refresh_token(
 def change_password(
     password_change: UserPasswordChange,
     db: Session = Depends(get_db),
-    current_user: User = Depends(UserService.get_current_user)
+    current_user: User = Depends(get_current_user)
 ) -> Any:
     """修改密码"""
     success = UserService.change_password(
@@ -146,8 +147,8 @@ def change_password(
 
 
 @router.get("/me", response_model=User)
-def read_users_me(
-    current_user: User = Depends(UserService.get_current_user)
+async def read_users_me(
+    current_user: User = Depends(get_current_read_user)
 ) -> Any:
     """获取当前用户信息"""
     return current_user 
\ No newline at end of file
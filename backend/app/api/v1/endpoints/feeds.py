@@ -0,0 +1,74 @@
+"""
+订阅源API路由
+全站、分类和标签的 RSS 2.0 / Atom 订阅源
+"""
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, Path, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ....core.conditional import is_not_modified, not_modified, validator_headers
+from ....core.database import get_read_db, run_read
+from ....services.news_feed import FEED_FORMATS, AsyncNewsFeedService, NewsFeedService, news_feed_cache
+from ....services.news_service import NewsService, AsyncNewsService
+
+router = APIRouter()
+
+ReadSession = Union[Session, AsyncSession]
+
+FeedFormat = Path(..., pattern="^(rss|atom)$", description="订阅源格式：rss 或 atom")
+
+
+async def _feed_response(
+    request: Request, db: ReadSession, kind: str, slug: Optional[str], feed_format: str
+) -> Response:
+    """命中缓存时直接返回（或 304）；否则查询最新新闻、渲染并写回缓存"""
+    feed = await run_in_threadpool(news_feed_cache.get, kind, slug, feed_format)
+    if feed is None:
+        source = await run_read(db, NewsFeedService.resolve, AsyncNewsFeedService.resolve, kind, slug)
+        generation = await run_in_threadpool(news_feed_cache.generation, source)
+        news = await run_read(db, NewsService.search_news, AsyncNewsService.search_news, source.search_params)
+        self_url = str(request.url.replace(query=""))
+        feed = await run_in_threadpool(NewsFeedService.render, source, news.items, feed_format, self_url)
+        await run_in_threadpool(news_feed_cache.set, source, feed_format, generation, feed)
+
+    if is_not_modified(request, feed.etag, feed.last_modified):
+        return not_modified(feed.etag, feed.last_modified)
+    return Response(
+        content=feed.body,
+        media_type=FEED_FORMATS[feed_format],
+        headers=validator_headers(feed.etag, feed.last_modified)
+    )
+
+
+@router.get("/{feed_format}")
+async def get_feed(
+    request: Request,
+    feed_format: str = FeedFormat,
+    db: ReadSession = Depends(get_read_db)
+) -> Response:
+    """全站最新新闻订阅源"""
+    return await _feed_response(request, db, "all", None, feed_format)
+
+
+@router.get("/categories/{slug}/{feed_format}")
+async def get_category_feed(
+    request: Request,
+    slug: str,
+    feed_format: str = FeedFormat,
+    db: ReadSession = Depends(get_read_db)
+) -> Response:
+    """分类订阅源"""
+    return await _feed_response(request, db, "category", slug, feed_format)
+
+
+@router.get("/tags/{slug}/{feed_format}")
+async def get_tag_feed(
+    request: Request,
+    slug: str,
+    feed_format: str = FeedFormat,
+    db: ReadSession = Depends(get_read_db)
+) -> Response:
+    """标签订阅源"""
+    return await _feed_response(request, db, "tag", slug, feed_format)
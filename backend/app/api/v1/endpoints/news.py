@@ -2,86 +2,277 @@
 新闻API路由
 包含新闻的CRUD操作和搜索功能
 """
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ....core.database import get_db
-from ....core.deps import get_current_active_user, get_optional_current_user
-from ....models.user import User
+from ....core.config import settings
+from ....core.conditional import make_etag, is_not_modified, not_modified, validator_headers
+from ....core.database import RoutingSession, get_db, get_read_db, run_read
+from ....core.deps import get_current_principal, get_optional_current_user
 from ....schemas.news import (
-    News, NewsCreate, NewsUpdate, NewsList, NewsSearch,
+    News, NewsCreate, NewsUpdate, NewsList, NewsSearch, NewsBulkResult, NewsExportParams, RelatedNews,
+    TrendingNews,
     Category, CategoryCreate, CategoryUpdate,
     Tag, TagCreate, TagUpdate
 )
-from ....services.news_service import NewsService
+from ....services.news_cache import news_list_cache
+from ....services.news_export import EXPORT_FORMATS, NewsExporter
+from ....services.news_service import NewsService, AsyncNewsService
+from ....services.principal_cache import Principal
+from ....services.related_news import related_news_index
+from ....services.trending import news_trending
+from ....services.view_counter import news_view_counter
+from ....tasks.news import news_tasks
 
 router = APIRouter()
 
+# 读接口的会话：ASYNC_READ_PATH 开启时为异步会话
+ReadSession = Union[Session, AsyncSession]
+
 
 # 新闻相关端点
 @router.get("/", response_model=NewsList)
-def get_news(
+async def get_news(
+    request: Request,
     q: str = Query(None, description="搜索关键词"),
     category_id: int = Query(None, description="分类ID"),
     tag_ids: List[int] = Query([], description="标签ID列表"),
+    tag_match: str = Query("any", pattern="^(any|all)$", description="多个标签的匹配方式：any 任一，all 全部"),
     is_featured: bool = Query(None, description="是否精选"),
     is_breaking: bool = Query(None, description="是否突发"),
     page: int = Query(1, ge=1, description="页码"),
     size: int = Query(10, ge=1, le=100, description="每页数量"),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="分页游标（来自上一页的 next_cursor，传入后忽略页码）"),
+    with_total: bool = Query(True, description="是否返回总数（不需要时关闭可减少查询）"),
+    db: ReadSession = Depends(get_read_db)
 ) -> Any:
     """获取新闻列表"""
     search_params = NewsSearch(
         q=q,
         category_id=category_id,
         tag_ids=tag_ids,
+        tag_match=tag_match,
         is_featured=is_featured,
         is_breaking=is_breaking,
         page=page,
-        size=size
+        size=size,
+        cursor=cursor,
+        with_total=with_total
     )
     
-    return NewsService.search_news(db, search_params)
+    # 缓存序列化后的响应体，命中时不访问数据库
+    cache_key, body = await run_in_threadpool(news_list_cache.get, search_params)
+    if body is None:
+        result = await run_read(db, NewsService.search_news, AsyncNewsService.search_news, search_params)
+        body = result.model_dump_json().encode()
+        await run_in_threadpool(news_list_cache.set, cache_key, body)
+    
+    # 列表的 ETag 取自响应体；命中缓存时无需查询和序列化即可返回 304
+    etag = make_etag(body)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag))
+
+
+@router.get("/export")
+def export_news(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="导出格式：ndjson 或 csv"),
+    category_id: int = Query(None, description="分类ID"),
+    is_published: bool = Query(None, description="是否已发布"),
+    created_from: datetime = Query(None, description="创建时间下限（含）"),
+    created_to: datetime = Query(None, description="创建时间上限（不含）"),
+    after_id: int = Query(0, ge=0, description="只导出该ID之后的新闻（中断后传入已收到的最大ID继续）"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    流式导出新闻（需要管理员权限）
+    按 id 升序经服务端游标逐批读取并写出，内存占用与新闻总量无关
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    
+    params = NewsExportParams(
+        category_id=category_id,
+        is_published=is_published,
+        created_from=created_from,
+        created_to=created_to,
+        after_id=after_id
+    )
+    if isinstance(db, RoutingSession) and db.replicas:
+        db.use_replica()
+    
+    def body():
+        # 依赖的清理可能先于响应体执行，会话由响应体自己关闭（关闭后的会话仍可继续使用）
+        try:
+            yield from NewsExporter.stream(db, params, format)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="news.{format}"'}
+    )
+
+
+@router.get("/trending", response_model=List[TrendingNews])
+async def get_trending_news(
+    category_id: int = Query(None, description="分类ID（为空时为全站）"),
+    limit: int = Query(20, ge=1, description="返回数量（最多 TRENDING_SIZE 条）")
+) -> Any:
+    """
+    热门新闻
+    浏览量、点赞数和评论数按时间指数衰减后的加权和排序，由热门引擎在内存中维护，不查询数据库
+    """
+    trending = news_trending.top(category_id, limit)
+    return [TrendingNews(**asdict(article), score=score) for article, score in trending]
 
 
 @router.get("/{news_id}", response_model=News)
-def get_news_by_id(
+async def get_news_by_id(
     news_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_optional_current_user)
+    request: Request,
+    response: Response,
+    db: ReadSession = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_optional_current_user)
 ) -> Any:
     """根据ID获取新闻详情"""
-    news = NewsService.get_by_id(db, news_id)
-    if not news:
+    # 先只读取更新时间，客户端缓存有效时不加载新闻
+    updated_at = await run_read(db, NewsService.get_version, AsyncNewsService.get_version, news_id)
+    if updated_at is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="新闻不存在"
         )
+    # 响应中的浏览次数不参与验证器，使用弱 ETag
+    etag = make_etag("news", news_id, updated_at, weak=True)
     
-    # 增加浏览次数
-    NewsService.increment_view_count(db, news_id)
+    # 浏览次数先写入缓冲，读请求不写数据库
+    await run_in_threadpool(NewsService.increment_view_count, news_id)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
     
-    return news
+    news = await run_read(db, NewsService.get_by_id, AsyncNewsService.get_by_id, news_id)
+    if not news:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="新闻不存在"
+        )
+    
+    response.headers.update(validator_headers(etag, updated_at))
+    # 返回值包含尚未写入数据库的浏览次数
+    result = News.model_validate(news)
+    result.view_count += await run_in_threadpool(news_view_counter.pending, news_id)
+    return result
+
+
+@router.get("/{news_id}/related", response_model=List[RelatedNews])
+async def get_related_news(
+    news_id: int,
+    limit: int = Query(None, ge=1, description="返回数量（默认全部，最多 RELATED_NEWS_TOP_K 条）")
+) -> Any:
+    """
+    相关新闻
+    由相关新闻索引预先计算，直接读取，不查询数据库；不存在或未发布的新闻返回空列表
+    """
+    related = related_news_index.get(news_id)[:limit]
+    return [RelatedNews(**asdict(article), score=score) for article, score in related]
 
 
 @router.post("/", response_model=News, status_code=status.HTTP_201_CREATED)
 def create_news(
     news_in: NewsCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
-    """创建新闻"""
-    news = NewsService.create(db, news_in=news_in, author_id=current_user.id)
+    """创建新闻（提交后即返回，索引、缓存失效等在响应发送之后执行）"""
+    with news_tasks.deferred(background_tasks):
+        news = NewsService.create(db, news_in=news_in, author_id=current_user.id)
     return news
 
 
+def _parse_ndjson_line(line: bytes) -> Any:
+    # 无法解析的行原样交给批量导入，作为校验失败的条目返回
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode(errors="replace")
+
+
+async def _bulk_batches(request: Request) -> AsyncIterator[Tuple[int, List[Any]]]:
+    """按 NEWS_BULK_BATCH_SIZE 切分请求中的条目，返回 (首条序号, 条目列表)；NDJSON 边读边切分"""
+    size = settings.NEWS_BULK_BATCH_SIZE
+    if "ndjson" not in request.headers.get("content-type", ""):
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="请求体不是合法的JSON")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="请求体应为JSON数组")
+        for start in range(0, len(payload), size):
+            yield start, payload[start:start + size]
+        return
+    
+    start, batch, buffer = 0, [], b""
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                batch.append(_parse_ndjson_line(line))
+            if len(batch) >= size:
+                yield start, batch
+                start, batch = start + len(batch), []
+    if buffer.strip():
+        batch.append(_parse_ndjson_line(buffer))
+    if batch:
+        yield start, batch
+
+
+@router.post("/bulk", response_model=NewsBulkResult)
+async def bulk_create_news(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    批量导入新闻（需要管理员权限）
+    请求体为 JSON 数组，或 application/x-ndjson（每行一条）；每 NEWS_BULK_BATCH_SIZE 条一个事务
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    
+    items = []
+    # 所有批次的写入后任务合并为一批，在响应发送之后执行
+    with news_tasks.deferred(background_tasks):
+        async for start, batch in _bulk_batches(request):
+            items += await run_in_threadpool(NewsService.bulk_create, db, batch, current_user.id, start)
+    created = sum(item.status == "created" for item in items)
+    return NewsBulkResult(created=created, failed=len(items) - created, items=items)
+
+
 @router.put("/{news_id}", response_model=News)
 def update_news(
     news_id: int,
     news_in: NewsUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """更新新闻"""
     news = NewsService.get_by_id(db, news_id)
@@ -98,15 +289,17 @@ def update_news(
             detail="没有权限编辑此新闻"
         )
     
-    news = NewsService.update(db, news_id=news_id, news_in=news_in)
+    with news_tasks.deferred(background_tasks):
+        news = NewsService.update(db, news_id=news_id, news_in=news_in)
     return news
 
 
 @router.delete("/{news_id}")
 def delete_news(
     news_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """删除新闻"""
     news = NewsService.get_by_id(db, news_id)
@@ -123,24 +316,35 @@ def delete_news(
             detail="没有权限删除此新闻"
         )
     
-    NewsService.delete(db, news_id=news_id)
+    with news_tasks.deferred(background_tasks):
+        NewsService.delete(db, news_id=news_id)
     return {"message": "新闻删除成功"}
 
 
 # 分类相关端点
 @router.get("/categories/", response_model=List[Category])
-def get_categories(
-    db: Session = Depends(get_db)
+async def get_categories(
+    request: Request,
+    response: Response,
+    db: ReadSession = Depends(get_read_db)
 ) -> Any:
     """获取所有分类"""
-    return NewsService.get_categories(db)
+    count, updated_at = await run_read(
+        db, NewsService.get_categories_version, AsyncNewsService.get_categories_version
+    )
+    etag = make_etag("categories", count, updated_at, weak=True)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    
+    response.headers.update(validator_headers(etag, updated_at))
+    return await run_read(db, NewsService.get_categories, AsyncNewsService.get_categories)
 
 
 @router.post("/categories/", response_model=Category, status_code=status.HTTP_201_CREATED)
 def create_category(
     category_in: CategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """创建分类（需要管理员权限）"""
     if not current_user.is_superuser:
@@ -154,18 +358,28 @@ def create_category(
 
 # 标签相关端点
 @router.get("/tags/", response_model=List[Tag])
-def get_tags(
-    db: Session = Depends(get_db)
+async def get_tags(
+    request: Request,
+    response: Response,
+    db: ReadSession = Depends(get_read_db)
 ) -> Any:
     """获取所有标签"""
-    return NewsService.get_tags(db)
+    count, updated_at = await run_read(
+        db, NewsService.get_tags_version, AsyncNewsService.get_tags_version
+    )
+    etag = make_etag("tags", count, updated_at, weak=True)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    
+    response.headers.update(validator_headers(etag, updated_at))
+    return await run_read(db, NewsService.get_tags, AsyncNewsService.get_tags)
 
 
 @router.post("/tags/", response_model=Tag, status_code=status.HTTP_201_CREATED)
 def create_tag(
     tag_in: TagCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """创建标签（需要管理员权限）"""
     if not current_user.is_superuser:
@@ -0,0 +1,74 @@
+"""
+站点地图API路由
+站点地图索引与按 id 区间划分的 gzip 分片
+"""
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from ....core.conditional import is_not_modified, make_etag, not_modified, validator_headers
+from ....core.database import RoutingSession, get_db
+from ....services.sitemap import SitemapService, sitemap_cache
+
+router = APIRouter()
+
+
+def _use_replica(db: Session) -> None:
+    if isinstance(db, RoutingSession) and db.replicas:
+        db.use_replica()
+
+
+@router.get("/sitemap.xml")
+def get_sitemap_index(request: Request, db: Session = Depends(get_db)) -> Any:
+    """站点地图索引"""
+    _use_replica(db)
+    count = SitemapService.shard_count(db)
+    db.rollback()
+    shards = sitemap_cache.get_many(count)
+    body = SitemapService.render_index(
+        [str(request.url_for("get_sitemap_shard", shard=shard)) for shard in range(count)],
+        [shard.last_modified if shard else None for shard in shards],
+    )
+    etag = make_etag(body)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/xml", headers=validator_headers(etag))
+
+
+@router.get("/sitemap-{shard}.xml.gz")
+def get_sitemap_shard(shard: int, request: Request, db: Session = Depends(get_db)) -> Any:
+    """
+    站点地图分片（gzip）
+    命中缓存时直接返回；否则边扫描边压缩输出，完成后写入缓存
+    """
+    cached = sitemap_cache.get(shard)
+    if cached is not None:
+        if is_not_modified(request, cached.etag, cached.last_modified):
+            return not_modified(cached.etag, cached.last_modified)
+        return Response(
+            content=cached.body,
+            media_type="application/gzip",
+            headers=validator_headers(cached.etag, cached.last_modified)
+        )
+    
+    _use_replica(db)
+    if shard < 0 or shard >= SitemapService.shard_count(db):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="站点地图分片不存在"
+        )
+    generation = sitemap_cache.generation(shard)
+    
+    def body():
+        # 依赖的清理可能先于响应体执行，会话由响应体自己关闭
+        chunks, summary = [], {}
+        try:
+            for chunk in SitemapService.iter_shard(db, shard, summary):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            db.close()
+        sitemap_cache.set(shard, generation, b"".join(chunks), summary["last_modified"])
+    
+    return StreamingResponse(body(), media_type="application/gzip")
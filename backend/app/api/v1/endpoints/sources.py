@@ -0,0 +1,82 @@
+"""
+新闻来源API路由
+聚合抓取的外部 RSS/Atom 来源的管理，以及手动触发抓取（均需要管理员权限）
+"""
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ....core.database import get_db
+from ....core.deps import get_current_principal
+from ....schemas.source import Source, SourceCreate, SourceUpdate, CrawlResult
+from ....services.crawler import crawl_sources
+from ....services.principal_cache import Principal
+from ....services.source_service import SourceService
+from ....tasks.news import news_tasks
+
+router = APIRouter()
+
+
+def get_current_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
+    """来源接口只对管理员开放"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    return current_user
+
+
+@router.get("/", response_model=List[Source])
+def get_sources(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """获取所有来源及其抓取状态"""
+    return SourceService.get_multi(db)
+
+
+@router.post("/", response_model=Source)
+def create_source(
+    source_in: SourceCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """创建来源，抓取到的新闻以当前用户为作者"""
+    return SourceService.create(db, source_in=source_in, author_id=current_user.id)
+
+
+@router.post("/crawl", response_model=CrawlResult)
+async def crawl(
+    background_tasks: BackgroundTasks,
+    source_id: Optional[List[int]] = Query(None, description="只抓取指定的来源（不论是否启用）"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """立即抓取启用的来源，返回抓取统计"""
+    # 各批新闻的写入后任务合并为一批，在响应发送之后执行
+    with news_tasks.deferred(background_tasks):
+        return await run_in_threadpool(crawl_sources, db, source_id)
+
+
+@router.put("/{source_id}", response_model=Source)
+def update_source(
+    source_id: int,
+    source_in: SourceUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """更新来源"""
+    return SourceService.update(db, source_id=source_id, source_in=source_in)
+
+
+@router.delete("/{source_id}")
+def delete_source(
+    source_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+) -> Any:
+    """删除来源（已抓取的新闻保留）"""
+    SourceService.delete(db, source_id=source_id)
+    return {"message": "来源删除成功"}
@@ -0,0 +1,180 @@
+"""
+Roaring 风格的压缩位图
+按整数高16位分桶：稀疏桶用有序 array 保存低16位，稠密桶用 Python int 作位集
+"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+# 桶内元素超过该数量时，位集（8KB）比数组更省空间
+_ARRAY_MAX_SIZE = 4096
+_BUCKET_BYTES = 1 << 13
+
+Container = Union[array, int]
+
+
+def _to_bits(container: Container) -> int:
+    if isinstance(container, int):
+        return container
+    buffer = bytearray(_BUCKET_BYTES)
+    for low in container:
+        buffer[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _to_array(bits: int) -> array:
+    result = array("H")
+    for index, byte in enumerate(bits.to_bytes(_BUCKET_BYTES, "little")):
+        if byte:
+            base = index << 3
+            result.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return result
+
+
+def _normalize(container: Container) -> Optional[Container]:
+    """按基数选择桶的表示方式，空桶返回 None"""
+    if isinstance(container, int):
+        size = container.bit_count()
+        if size == 0:
+            return None
+        return _to_array(container) if size <= _ARRAY_MAX_SIZE else container
+    if not container:
+        return None
+    return _to_bits(container) if len(container) > _ARRAY_MAX_SIZE else container
+
+
+def _and(left: Container, right: Container) -> Optional[Container]:
+    if isinstance(left, array) and isinstance(right, array):
+        return _normalize(array("H", sorted(set(left).intersection(right))))
+    return _normalize(_to_bits(left) & _to_bits(right))
+
+
+def _or(left: Container, right: Container) -> Optional[Container]:
+    if isinstance(left, array) and isinstance(right, array):
+        return _normalize(array("H", sorted(set(left).union(right))))
+    return _normalize(_to_bits(left) | _to_bits(right))
+
+
+def _sub(left: Container, right: Container) -> Optional[Container]:
+    if isinstance(left, array) and isinstance(right, array):
+        return _normalize(array("H", sorted(set(left).difference(right))))
+    return _normalize(_to_bits(left) & ~_to_bits(right))
+
+
+class RoaringBitmap:
+    """非负整数（小于 2**32）集合，支持高效的交集、并集和差集"""
+
+    __slots__ = ("_containers",)
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._containers: Dict[int, Container] = {}
+        for value in values:
+            self.add(value)
+
+    def add(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array("H", (low,))
+        elif isinstance(container, int):
+            self._containers[high] = container | (1 << low)
+        else:
+            position = bisect_left(container, low)
+            if position == len(container) or container[position] != low:
+                container.insert(position, low)
+                if len(container) > _ARRAY_MAX_SIZE:
+                    self._containers[high] = _to_bits(container)
+
+    def discard(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container = _normalize(container & ~(1 << low))
+        else:
+            position = bisect_left(container, low)
+            if position < len(container) and container[position] == low:
+                del container[position]
+            container = _normalize(container)
+        if container is None:
+            del self._containers[high]
+        else:
+            self._containers[high] = container
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+
+    def __len__(self) -> int:
+        return sum(
+            container.bit_count() if isinstance(container, int) else len(container)
+            for container in self._containers.values()
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._containers)
+
+    def __iter__(self) -> Iterator[int]:
+        """升序遍历"""
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            if isinstance(container, int):
+                container = _to_array(container)
+            base = high << 16
+            for low in container:
+                yield base | low
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RoaringBitmap):
+            return NotImplemented
+        return self._containers == other._containers
+
+    def __repr__(self) -> str:
+        return f"<RoaringBitmap(size={len(self)})>"
+
+    def copy(self) -> "RoaringBitmap":
+        result = RoaringBitmap()
+        result._containers = {
+            high: container if isinstance(container, int) else array("H", container)
+            for high, container in self._containers.items()
+        }
+        return result
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = RoaringBitmap()
+        small, large = sorted((self._containers, other._containers), key=len)
+        for high, container in small.items():
+            if high in large:
+                merged = _and(container, large[high])
+                if merged is not None:
+                    result._containers[high] = merged
+        return result
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = self.copy()
+        for high, container in other._containers.items():
+            existing = result._containers.get(high)
+            if existing is None:
+                result._containers[high] = container if isinstance(container, int) else array("H", container)
+            else:
+                result._containers[high] = _or(existing, container)
+        return result
+
+    def __sub__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = RoaringBitmap()
+        for high, container in self._containers.items():
+            if high in other._containers:
+                container = _sub(container, other._containers[high])
+                if container is None:
+                    continue
+            elif isinstance(container, array):
+                container = array("H", container)
+            result._containers[high] = container
+        return result
@@ -0,0 +1,102 @@
+"""
+缓存客户端模块
+默认连接 REDIS_URL 指向的 Redis；REDIS_URL 为 memory:// 时使用进程内替身（测试与单进程开发环境）
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import redis
+
+from .config import settings
+
+Value = Union[bytes, str, int]
+
+
+def _encode(value: Value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class MemoryCache:
+    """进程内的 Redis 替身，只实现缓存用到的命令，行为与 redis-py 一致（值以 bytes 返回）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 值为 bytes（字符串）或 dict（哈希）
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _read(self, name: str) -> Any:
+        item = self._data.get(name)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[name]
+            return None
+        return value
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._read(name)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._read(key) for key in keys]
+
+    def set(self, name: str, value: Value, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        expires_at = time.monotonic() + ex if ex else None
+        with self._lock:
+            if nx and self._read(name) is not None:
+                return None
+            self._data[name] = (_encode(value), expires_at)
+        return True
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._read(name) or 0) + amount
+            self._data[name] = (_encode(value), None)
+            return value
+
+    def hincrby(self, name: str, key: Value, amount: int = 1) -> int:
+        with self._lock:
+            fields = self._read(name)
+            if fields is None:
+                fields = {}
+                self._data[name] = (fields, None)
+            value = int(fields.get(_encode(key), 0)) + amount
+            fields[_encode(key)] = _encode(value)
+            return value
+
+    def hget(self, name: str, key: Value) -> Optional[bytes]:
+        with self._lock:
+            return (self._read(name) or {}).get(_encode(key))
+
+    def hgetall(self, name: str) -> Dict[bytes, bytes]:
+        with self._lock:
+            return dict(self._read(name) or {})
+
+    def rename(self, src: str, dst: str) -> bool:
+        with self._lock:
+            if self._read(src) is None:
+                raise redis.ResponseError("no such key")
+            self._data[dst] = self._data.pop(src)
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+        return True
+
+
+def create_cache_client(url: Optional[str] = None):
+    """按 URL 创建缓存客户端；Redis 不可用时命令快速失败，由调用方降级为不缓存"""
+    url = url or settings.REDIS_URL
+    if url.startswith("memory://"):
+        return MemoryCache()
+    return redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
@@ -0,0 +1,62 @@
+"""
+条件请求工具
+生成 ETag / Last-Modified 验证器，处理 If-None-Match 与 If-Modified-Since，命中时返回 304
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """由版本信息（或响应体）生成 ETag"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode())
+        digest.update(b"\0")
+    tag = f'"{digest.hexdigest()[:32]}"'
+    return f"W/{tag}" if weak else tag
+
+
+def as_utc(value: datetime) -> datetime:
+    """转换为带时区的 UTC 时间（SQLite 返回不带时区的 UTC 时间）"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """响应中携带的验证器头"""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(as_utc(last_modified).replace(microsecond=0), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    客户端缓存是否仍然有效：有 If-None-Match 时按 ETag 弱比较，忽略 If-Modified-Since；
+    否则按秒比较 If-Modified-Since 与最后修改时间
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return etag.removeprefix("W/") in (candidate.removeprefix("W/") for candidate in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return as_utc(last_modified).replace(microsecond=0) <= as_utc(since)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """304 响应，不含响应体"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, last_modified))
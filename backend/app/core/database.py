@@ -2,15 +2,159 @@
 数据库连接管理模块
 包含数据库引擎、会话管理和依赖注入
 """
-from typing import Generator, AsyncGenerator
-from sqlalchemy import create_engine, text
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Generator, AsyncGenerator, Iterator, List, Optional, TypeVar, Union
+
+import redis
+import structlog
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
+from .cache import create_cache_client
 from .config import settings
+from .security import verify_token
 from ..models.base import Base
 
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class ReplicaSet:
+    """
+    只读副本集合
+    轮询选择副本；副本连接或查询出错时暂停使用 REPLICA_EJECT_SECONDS 秒，
+    所有副本都不可用时返回 None，由调用方改用主库
+    """
+    
+    def __init__(self, engines: List[Engine]):
+        self.engines = list(engines)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._ejected_until: Dict[Engine, float] = {}
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._on_error)
+    
+    def __len__(self) -> int:
+        return len(self.engines)
+    
+    def choose(self) -> Optional[Engine]:
+        """按轮询顺序返回下一个可用副本"""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                replica = self.engines[self._next % len(self.engines)]
+                self._next += 1
+                if self._ejected_until.get(replica, 0) <= now:
+                    return replica
+        return None
+    
+    def eject(self, replica: Engine) -> None:
+        """暂停使用出错的副本"""
+        with self._lock:
+            self._ejected_until[replica] = time.monotonic() + settings.REPLICA_EJECT_SECONDS
+        logger.warning(f"Replica ejected: {replica.url!r}")
+    
+    def is_healthy(self, replica: Engine) -> bool:
+        return self._ejected_until.get(replica, 0) <= time.monotonic()
+    
+    def _on_error(self, context) -> None:
+        # 连接失败与断线都表现为 OperationalError；SQL 本身的错误不影响副本状态
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+            self.eject(context.engine)
+
+
+class ReadPins:
+    """
+    读己之写：用户写入后 READ_YOUR_WRITES_SECONDS 秒内其读请求走主库，
+    避免刚提交的修改因副本延迟而读不到。标记存放在缓存中，多进程共享
+    """
+    
+    def __init__(self):
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_cache_client()
+        return self._client
+    
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+    
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"db:pin:user:{user_id}"
+    
+    def pin(self, user_id: int) -> None:
+        """记录用户刚刚写入"""
+        try:
+            self.client.set(self._key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to pin reads to primary: {e}")
+    
+    def is_pinned(self, user_id: int) -> bool:
+        """用户的读请求是否应走主库；缓存不可用时保守地走主库"""
+        try:
+            return self.client.get(self._key(user_id)) is not None
+        except redis.RedisError:
+            return True
+
+
+class RoutingSession(Session):
+    """
+    读写分离会话
+    调用 use_replica() 后查询发往同一个只读副本；写入（flush 与 DML 语句）总是走主库，
+    会话内一旦写过，之后的查询也改走主库。提交了写入的会话若记录了 user_id，
+    该用户随后的读请求固定走主库一段时间
+    """
+    
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.replica: Optional[Engine] = None
+    
+    def use_replica(self) -> None:
+        """后续查询发往副本（没有可用副本时仍走主库）"""
+        if self.replicas:
+            self.replica = self.replicas.choose()
+    
+    def use_primary(self) -> None:
+        """后续查询发往主库"""
+        self.replica = None
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replica is not None and not self._flushing and not getattr(clause, "is_dml", False):
+            return self.replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session: RoutingSession, flush_context) -> None:
+    session.info["wrote"] = True
+    session.use_primary()
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: RoutingSession) -> None:
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None and session.replicas:
+        read_pins.pin(user_id)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session: RoutingSession) -> None:
+    session.info.pop("wrote", None)
+
 
 # 同步数据库引擎
 engine = create_engine(
@@ -28,8 +172,19 @@ async_engine = create_async_engine(
     echo=settings.DEBUG,
 )
 
-# 同步会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 只读副本引擎
+replicas = ReplicaSet([
+    create_engine(url, pool_pre_ping=True, pool_recycle=300, echo=settings.DEBUG)
+    for url in settings.DATABASE_REPLICA_URLS
+])
+
+# 读己之写标记
+read_pins = ReadPins()
+
+# 同步会话工厂（默认全部走主库，读接口的会话可切换到副本）
+SessionLocal = sessionmaker(
+    class_=RoutingSession, replicas=replicas, autocommit=False, autoflush=False, bind=engine
+)
 
 # 异步会话工厂
 AsyncSessionLocal = async_sessionmaker(
@@ -57,6 +212,100 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def _pinned_to_primary(request: Request) -> bool:
+    """请求携带的令牌所属用户刚刚写入过"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    user_id = verify_token(token)
+    return user_id is not None and read_pins.is_pinned(int(user_id))
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[Union[Session, AsyncSession], None]:
+    """
+    读接口的数据库会话：ASYNC_READ_PATH 开启时为异步会话，否则为同步会话。
+    配置了只读副本时同步会话的查询发往副本，刚写入过的用户仍读主库
+    """
+    if settings.ASYNC_READ_PATH:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+    
+    db = SessionLocal()
+    if isinstance(db, RoutingSession) and db.replicas and not _pinned_to_primary(request):
+        db.use_replica()
+    try:
+        yield db
+    finally:
+        # 归还连接时会回滚，可能产生网络IO，不在事件循环中执行
+        await run_in_threadpool(db.close)
+
+
+async def run_read(
+    db: Union[Session, AsyncSession],
+    sync_func: Callable[..., T],
+    async_func: Callable[..., Awaitable[T]],
+    *args: Any,
+) -> T:
+    """在读会话上调用服务方法：异步会话调用异步版本，同步会话在线程池中调用同步版本"""
+    if isinstance(db, AsyncSession):
+        return await async_func(db, *args)
+    return await run_in_threadpool(_call_and_release, sync_func, db, *args)
+
+
+def _call_and_release(func: Callable[..., T], db: Session, *args: Any) -> T:
+    """
+    调用后立即归还连接：请求在两次线程池调用之间不占用连接，
+    否则占满线程池的请求等待连接、持有连接的请求等待线程，互相等待而死锁。
+    先移出会话中的对象再结束事务，已加载的属性不会因回滚而过期
+    """
+    try:
+        try:
+            return func(db, *args)
+        except OperationalError:
+            # 副本故障（已被摘除）时在主库上重试一次
+            if not isinstance(db, RoutingSession) or db.replica is None:
+                raise
+            db.rollback()
+            db.use_primary()
+            return func(db, *args)
+    finally:
+        db.expunge_all()
+        db.rollback()
+
+
+class QueryCounter:
+    """记录执行过的 SQL 语句"""
+    
+    def __init__(self):
+        self.statements: List[str] = []
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(bind: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """
+    统计代码块内在引擎上执行的 SQL 条数，用于发现 N+1 查询
+
+        with count_queries(engine) as counter:
+            ...
+        assert counter.count <= 3
+    """
+    target = bind if bind is not None else engine
+    counter = QueryCounter()
+    event.listen(target, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", counter._record)
+
+
 def create_tables() -> None:
     """创建所有数据库表（开发环境使用）"""
     Base.metadata.create_all(bind=engine)
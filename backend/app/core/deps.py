@@ -2,38 +2,38 @@
 认证依赖模块
 用于保护需要登录的API端点
 """
-from typing import Optional
+from typing import Optional, Union
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .database import get_db
+from .database import get_db, get_read_db, run_read
 from .security import verify_token
 from ..models.user import User
-from ..services.user_service import UserService
+from ..services.principal_cache import Principal, user_principal_cache
+from ..services.user_service import UserService, AsyncUserService
 
 # HTTP Bearer 认证
 security = HTTPBearer()
+# 可选认证：未携带凭证时不直接返回 401
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    """获取当前认证用户"""
-    token = credentials.credentials
-    
-    # 验证令牌
-    user_id = verify_token(token)
+def _token_user_id(credentials: HTTPAuthorizationCredentials) -> int:
+    """从令牌中取出用户ID，令牌无效时返回 401"""
+    user_id = verify_token(credentials.credentials)
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="无效的认证令牌",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # 获取用户信息
-    user = UserService.get_by_id(db, user_id=int(user_id))
+    return int(user_id)
+
+
+def _ensure_active_user(user: Union[User, Principal, None]) -> Union[User, Principal]:
+    """用户不存在时返回 401，已禁用时返回 400"""
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -50,6 +50,39 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """获取当前认证用户"""
+    user_id = _token_user_id(credentials)
+    user = _ensure_active_user(UserService.get_by_id(db, user_id=user_id))
+    # 本次请求提交写入后，该用户的读请求暂时固定走主库
+    db.info["user_id"] = user.id
+    return user
+
+
+def get_current_principal(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """获取当前认证用户的身份与权限标志（不加载完整用户，通常命中缓存而不查询数据库）"""
+    user_id = _token_user_id(credentials)
+    principal = _ensure_active_user(UserService.get_principal(db, user_id))
+    db.info["user_id"] = principal.id
+    return principal
+
+
+async def get_current_read_user(
+    db: Union[Session, AsyncSession] = Depends(get_read_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """获取当前认证用户（读接口使用，ASYNC_READ_PATH 开启时走异步会话）"""
+    user_id = _token_user_id(credentials)
+    user = await run_read(db, UserService.get_by_id, AsyncUserService.get_by_id, user_id)
+    return _ensure_active_user(user)
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -86,11 +119,11 @@ def get_current_superuser(
     return current_user
 
 
-def get_optional_current_user(
-    db: Session = Depends(get_db),
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
-) -> Optional[User]:
-    """获取可选的当前用户（用于可选认证的端点）"""
+async def get_optional_current_user(
+    db: Union[Session, AsyncSession] = Depends(get_read_db),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[Principal]:
+    """获取可选的当前用户身份（用于可选认证的端点）"""
     if credentials is None:
         return None
     
@@ -100,10 +133,15 @@ def get_optional_current_user(
         if user_id is None:
             return None
         
-        user = UserService.get_by_id(db, user_id=int(user_id))
-        if user is None or not UserService.is_active(user):
+        # 命中缓存时不必切换到线程池
+        principal = user_principal_cache.get(int(user_id))
+        if principal is None:
+            principal = await run_read(
+                db, UserService.get_principal, AsyncUserService.get_principal, int(user_id)
+            )
+        if principal is None or not principal.is_active:
             return None
         
-        return user
+        return principal
     except Exception:
-        return None 
\ No newline at end of file
+        return None
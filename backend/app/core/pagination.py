@@ -0,0 +1,24 @@
+"""
+游标分页工具
+游标对排序键 (created_at, id) 编码，对客户端不透明
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """将排序键编码为游标"""
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解码游标，格式不正确时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("无效的分页游标") from e
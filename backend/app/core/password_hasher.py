@@ -0,0 +1,124 @@
+"""
+密码哈希执行器
+bcrypt 计算放到独立的进程池中执行，登录高峰时不争抢主进程的 GIL；
+等待哈希结果的请求数达到 PASSWORD_HASH_QUEUE_LIMIT 时直接返回 503，
+登录请求不会占满请求线程池而拖慢其他接口
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import bcrypt
+import structlog
+from fastapi import HTTPException, status
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+# bcrypt 只使用密码的前 72 字节
+_MAX_PASSWORD_BYTES = 72
+
+
+def bcrypt_hash(password: str, rounds: int) -> str:
+    """计算 bcrypt 哈希（在工作进程中执行）"""
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode()[:_MAX_PASSWORD_BYTES], salt).decode()
+
+
+def bcrypt_verify(password: str, hashed_password: str) -> bool:
+    """校验密码（在工作进程中执行）"""
+    try:
+        return bcrypt.checkpw(password.encode()[:_MAX_PASSWORD_BYTES], hashed_password.encode())
+    except ValueError:
+        # 不是合法的 bcrypt 哈希
+        return False
+
+
+def bcrypt_rounds(hashed_password: str) -> Optional[int]:
+    """从 $2b$12$... 格式的哈希中读取代价因子"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="服务繁忙，请稍后重试",
+        headers={"Retry-After": "1"},
+    )
+
+
+class PasswordHasher:
+    """
+    有界的密码哈希执行器
+    PASSWORD_HASH_WORKERS 为 0 时在调用线程中计算（仍受排队上限约束）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # 主进程有多个线程，使用 spawn 而不是 fork 创建工作进程
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _get_slots(self) -> threading.BoundedSemaphore:
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_QUEUE_LIMIT)
+            return self._slots
+
+    def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        slots = self._get_slots()
+        if not slots.acquire(blocking=False):
+            raise _busy()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return func(*args)
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            # 工作进程异常退出，下次调用时重建进程池
+            logger.error("Password hash worker pool is broken, recreating")
+            self.shutdown(wait=False)
+            raise _busy()
+        finally:
+            slots.release()
+
+    def hash(self, password: str) -> str:
+        """按 BCRYPT_ROUNDS 计算密码哈希"""
+        return self._run(bcrypt_hash, password, settings.BCRYPT_ROUNDS)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """校验密码"""
+        return self._run(bcrypt_verify, password, hashed_password)
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """哈希的代价因子与当前配置不同"""
+        return bcrypt_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭进程池（应用关闭时调用）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# 全局执行器实例
+password_hasher = PasswordHasher()
@@ -2,14 +2,66 @@
 安全认证模块
 包含密码哈希、JWT令牌生成和验证等功能
 """
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Dict, Tuple, Union, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from .config import settings
+from .password_hasher import password_hasher
 
-# 密码哈希上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class VerifiedTokenCache:
+    """
+    已验证令牌的 LRU 缓存
+    键为令牌的 SHA-256 摘要，值为解码后的声明；条目在令牌自身的 exp 时刻过期，
+    同一令牌在有效期内只做一次签名验证。验证失败的令牌不缓存
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, exp = entry
+            if exp <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+    
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if settings.TOKEN_CACHE_SIZE <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局令牌缓存实例
+verified_token_cache = VerifiedTokenCache()
 
 
 def create_access_token(
@@ -54,59 +106,66 @@ def create_refresh_token(
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """验证令牌并返回用户ID"""
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """验证令牌签名与有效期并返回声明（结果会被缓存，调用方不要修改），无效时返回 None"""
+    payload = verified_token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(
             token, 
             settings.SECRET_KEY, 
             algorithms=[settings.ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        return user_id
     except JWTError:
         return None
+    verified_token_cache.set(token, payload)
+    return payload
+
+
+def verify_token(token: str) -> Optional[str]:
+    """验证令牌并返回用户ID"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    return user_id
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """验证密码（在密码哈希进程池中执行）"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """获取密码哈希值"""
-    return pwd_context.hash(password)
+    """获取密码哈希值（在密码哈希进程池中执行）"""
+    return password_hasher.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希的代价因子与 BCRYPT_ROUNDS 不同，需要重新计算"""
+    return password_hasher.needs_rehash(hashed_password)
 
 
 def is_token_expired(token: str) -> bool:
     """检查令牌是否过期"""
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        exp = payload.get("exp")
-        if exp is None:
-            return True
-        return datetime.utcnow() > datetime.fromtimestamp(exp)
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
+        return True
+    exp = payload.get("exp")
+    if exp is None:
         return True
+    return datetime.utcnow() > datetime.fromtimestamp(exp)
 
 
 def get_token_expiration(token: str) -> Optional[datetime]:
     """获取令牌过期时间"""
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        exp = payload.get("exp")
-        if exp is None:
-            return None
-        return datetime.fromtimestamp(exp)
-    except JWTError:
-        return None 
\ No newline at end of file
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    exp = payload.get("exp")
+    if exp is None:
+        return None
+    return datetime.fromtimestamp(exp) 
\ No newline at end of file
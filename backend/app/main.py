@@ -3,15 +3,25 @@ AI-News FastAPI 主应用
 包含完整的API路由、中间件和配置
 """
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import time
 import structlog
 
 from .core.config import settings
-from .core.database import create_tables, check_database_connection
+from .core.password_hasher import password_hasher
+from .core.database import SessionLocal, replicas, create_tables, check_database_connection
 from .api.v1.api import api_router
+from .services.crawler import crawl_sources
+from .services.search_index import news_search_index, init_search_index, refresh_search_index
+from .services.tag_index import news_tag_index
+from .services.dedup import news_deduplicator
+from .services.related_news import related_news_index
+from .services.trending import news_trending
+from .services.view_counter import news_view_counter
 
 # 配置结构化日志
 structlog.configure(
@@ -150,17 +160,43 @@ async def health_check():
     # 检查数据库连接
     db_status = check_database_connection()
     
-    return {
+    result = {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
         "timestamp": time.time()
     }
+    if replicas:
+        result["replicas"] = {
+            "total": len(replicas),
+            "healthy": sum(replicas.is_healthy(replica) for replica in replicas.engines),
+        }
+    return result
+
+
+def _run_with_session(job) -> None:
+    db = SessionLocal()
+    try:
+        job(db)
+    finally:
+        db.close()
+
+
+async def _refresh_periodically(name: str, interval: int, job):
+    """定时在线程池中执行后台任务（刷新进程内索引、写入缓冲的浏览次数）"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_run_with_session, job)
+            logger.debug("Periodic job finished", job=name)
+        except Exception as e:
+            logger.warning(f"Failed to run {name}: {e}")
 
 
 @app.on_event("startup")
 async def startup_event():
     """应用启动事件"""
     logger.info("Starting AI-News API...")
+    app.state.refreshers = []
     
     # 检查数据库连接
     if check_database_connection():
@@ -173,6 +209,77 @@ async def startup_event():
                 logger.info("Database tables created/verified")
             except Exception as e:
                 logger.warning(f"Failed to create tables: {e}")
+        
+        # 加载进程内搜索索引
+        if settings.NEWS_SEARCH_MODE == "bm25":
+            db = SessionLocal()
+            try:
+                init_search_index(db, settings.SEARCH_INDEX_SNAPSHOT_PATH)
+                logger.info("Search index loaded", documents=len(news_search_index))
+            except Exception as e:
+                logger.warning(f"Failed to load search index: {e}")
+            finally:
+                db.close()
+            if settings.SEARCH_INDEX_REFRESH_SECONDS > 0:
+                app.state.refreshers.append(asyncio.create_task(_refresh_periodically(
+                    "search index", settings.SEARCH_INDEX_REFRESH_SECONDS, refresh_search_index
+                )))
+        
+        # 构建标签位图索引
+        if settings.NEWS_TAG_INDEX_ENABLED:
+            try:
+                await run_in_threadpool(_run_with_session, news_tag_index.rebuild)
+                logger.info("Tag index loaded", documents=len(news_tag_index))
+            except Exception as e:
+                logger.warning(f"Failed to build tag index: {e}")
+            if settings.TAG_INDEX_REFRESH_SECONDS > 0:
+                app.state.refreshers.append(asyncio.create_task(_refresh_periodically(
+                    "tag index", settings.TAG_INDEX_REFRESH_SECONDS, news_tag_index.rebuild
+                )))
+        
+        # 构建相关新闻索引
+        if settings.RELATED_NEWS_ENABLED:
+            try:
+                await run_in_threadpool(_run_with_session, related_news_index.rebuild)
+                logger.info("Related news index loaded", documents=len(related_news_index))
+            except Exception as e:
+                logger.warning(f"Failed to build related news index: {e}")
+            if settings.RELATED_NEWS_REBUILD_SECONDS > 0:
+                app.state.refreshers.append(asyncio.create_task(_refresh_periodically(
+                    "related news index", settings.RELATED_NEWS_REBUILD_SECONDS, related_news_index.rebuild
+                )))
+        
+        # 加载近似重复检测的原稿签名
+        if settings.NEWS_DEDUP_MODE != "off":
+            try:
+                await run_in_threadpool(_run_with_session, news_deduplicator.rebuild)
+                logger.info("Dedup index loaded", documents=len(news_deduplicator))
+            except Exception as e:
+                logger.warning(f"Failed to load dedup index: {e}")
+            if settings.NEWS_DEDUP_REFRESH_SECONDS > 0:
+                app.state.refreshers.append(asyncio.create_task(_refresh_periodically(
+                    "dedup index", settings.NEWS_DEDUP_REFRESH_SECONDS, news_deduplicator.catch_up
+                )))
+        
+        # 加载热门新闻（之后由浏览和新闻写入增量更新，无需定期重建）
+        if settings.TRENDING_ENABLED:
+            try:
+                await run_in_threadpool(_run_with_session, news_trending.rebuild)
+                logger.info("Trending news loaded", documents=len(news_trending))
+            except Exception as e:
+                logger.warning(f"Failed to load trending news: {e}")
+        
+        # 定时抓取来源（配置了消息队列时由 celery beat 调度，见 app.tasks.sources）
+        if settings.CRAWLER_INTERVAL_SECONDS > 0 and settings.CELERY_BROKER_URL.startswith("memory://"):
+            app.state.refreshers.append(asyncio.create_task(_refresh_periodically(
+                "source crawler", settings.CRAWLER_INTERVAL_SECONDS, crawl_sources
+            )))
+        
+        # 定期写入缓冲的浏览次数
+        app.state.refreshers.append(asyncio.create_task(_refresh_periodically(
+            "view counter flush", settings.VIEW_COUNT_FLUSH_SECONDS, news_view_counter.flush
+        )))
+        app.state.flush_view_counts = True
     else:
         logger.error("Failed to connect to database")
 
@@ -181,6 +288,23 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭事件"""
     logger.info("Shutting down AI-News API...")
+    
+    for refresher in getattr(app.state, "refreshers", []):
+        refresher.cancel()
+    
+    # 写入尚未落库的浏览次数
+    if getattr(app.state, "flush_view_counts", False):
+        try:
+            await run_in_threadpool(_run_with_session, news_view_counter.flush)
+        except Exception as e:
+            logger.error(f"Failed to flush view counts: {e}")
+
+    # 关闭密码哈希进程池
+    password_hasher.shutdown()
+
+    # 保存搜索索引快照
+    if news_search_index.is_loaded:
+        news_search_index.save(settings.SEARCH_INDEX_SNAPSHOT_PATH)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@
 包含新闻的基本信息、分类、标签等
 """
 from typing import Optional, List
-from sqlalchemy import String, Text, Boolean, ForeignKey, Integer
+from sqlalchemy import String, Text, Boolean, ForeignKey, Integer, Index, LargeBinary, UniqueConstraint, DDL, event, table, column, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 
@@ -42,6 +42,26 @@ class Tag(Base):
 class News(Base):
     """新闻模型"""
     __tablename__ = "news"
+    __table_args__ = (
+        # 列表按 (created_at, id) 倒序，游标分页按行值比较定位
+        Index("ix_news_published_created_at_id", "is_published", "created_at", "id"),
+        # 按分类、精选、突发过滤的已发布列表使用部分索引，过滤和排序都在索引内完成
+        Index(
+            "ix_news_published_category_created_at_id", "category_id", "created_at", "id",
+            postgresql_where=text("is_published"),
+            sqlite_where=text("is_published = 1"),
+        ),
+        Index(
+            "ix_news_published_featured_created_at_id", "is_featured", "created_at", "id",
+            postgresql_where=text("is_published"),
+            sqlite_where=text("is_published = 1"),
+        ),
+        Index(
+            "ix_news_published_breaking_created_at_id", "is_breaking", "created_at", "id",
+            postgresql_where=text("is_published"),
+            sqlite_where=text("is_published = 1"),
+        ),
+    )
     
     # 基本信息
     title: Mapped[str] = mapped_column(String(500), nullable=False, index=True)
@@ -66,6 +86,8 @@ class News(Base):
     # 关联关系
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    # 近似重复稿件指向原稿（原稿删除后由服务层改指向或清空，不加外键）
+    duplicate_of_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     
     author: Mapped["User"] = relationship("User", backref="news")
     category: Mapped["Category"] = relationship("Category", back_populates="news")
@@ -79,6 +101,182 @@ class News(Base):
 class NewsTag(Base):
     """新闻标签关联表"""
     __tablename__ = "news_tags"
+    __table_args__ = (
+        # 主键 (news_id, tag_id) 只能按新闻查标签，按标签过滤新闻需要反向索引
+        Index("ix_news_tags_tag_id_news_id", "tag_id", "news_id"),
+    )
+    
+    # 关联表以 (news_id, tag_id) 为主键，不使用 Base 的通用字段（与迁移 0001 一致）
+    id = None
+    created_at = None
+    updated_at = None
     
     news_id: Mapped[int] = mapped_column(ForeignKey("news.id"), primary_key=True)
-    tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id"), primary_key=True) 
\ No newline at end of file
+    tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id"), primary_key=True)
+
+
+class NewsSignature(Base):
+    """新闻 MinHash 签名（近似重复检测），空值表示稿件没有可比较的文字"""
+    __tablename__ = "news_signatures"
+    
+    # 以新闻ID为主键，不使用 Base 的通用字段
+    id = None
+    created_at = None
+    updated_at = None
+    
+    news_id: Mapped[int] = mapped_column(ForeignKey("news.id", ondelete="CASCADE"), primary_key=True)
+    minhash: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class NewsCounter(Base):
+    """
+    新闻计数表
+
+    按 (分类, 精选, 突发, 发布) 组合保存新闻数量，由数据库触发器在写入 news 时增量维护，
+    列表接口据此直接得到精确总数，无需 COUNT(*) 扫描
+    """
+    __tablename__ = "news_counts"
+    __table_args__ = (
+        UniqueConstraint(
+            "category_id", "is_featured", "is_breaking", "is_published",
+            name="uq_news_counts_filters",
+        ),
+    )
+    
+    category_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_featured: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    is_breaking: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    is_published: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    news_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+# 计数触发器：旧行所在组合减一，新行所在组合加一（不存在时插入）
+_NEWS_COUNTS_DECREMENT = (
+    "UPDATE news_counts SET news_count = news_count - 1 "
+    "WHERE category_id = old.category_id AND is_featured = old.is_featured "
+    "AND is_breaking = old.is_breaking AND is_published = old.is_published;"
+)
+_NEWS_COUNTS_INCREMENT = (
+    "INSERT INTO news_counts (category_id, is_featured, is_breaking, is_published, news_count) "
+    "VALUES (new.category_id, new.is_featured, new.is_breaking, new.is_published, 1) "
+    "ON CONFLICT (category_id, is_featured, is_breaking, is_published) "
+    "DO UPDATE SET news_count = news_counts.news_count + 1;"
+)
+
+NEWS_COUNTS_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION news_counts_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {_NEWS_COUNTS_DECREMENT}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {_NEWS_COUNTS_INCREMENT}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+NEWS_COUNTS_TRIGGER_COLUMNS = "category_id, is_featured, is_breaking, is_published"
+
+_postgresql_counter_ddl = [
+    NEWS_COUNTS_TRIGGER_FUNCTION,
+    "CREATE TRIGGER news_counts_trigger "
+    f"AFTER INSERT OR DELETE OR UPDATE OF {NEWS_COUNTS_TRIGGER_COLUMNS} "
+    "ON news FOR EACH ROW EXECUTE FUNCTION news_counts_update()",
+]
+
+_sqlite_counter_ddl = [
+    "CREATE TRIGGER IF NOT EXISTS news_counts_ai AFTER INSERT ON news BEGIN "
+    f"{_NEWS_COUNTS_INCREMENT} END",
+    "CREATE TRIGGER IF NOT EXISTS news_counts_ad AFTER DELETE ON news BEGIN "
+    f"{_NEWS_COUNTS_DECREMENT} END",
+    f"CREATE TRIGGER IF NOT EXISTS news_counts_au AFTER UPDATE OF {NEWS_COUNTS_TRIGGER_COLUMNS} "
+    f"ON news BEGIN {_NEWS_COUNTS_DECREMENT} {_NEWS_COUNTS_INCREMENT} END",
+]
+
+for _statement in _postgresql_counter_ddl:
+    event.listen(News.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+for _statement in _sqlite_counter_ddl:
+    event.listen(News.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+# 全文检索
+# PostgreSQL: news.search_vector 由触发器维护（标题A/摘要B/正文C 加权），配合 GIN 索引；
+#   汉字先经 news_cjk_bigrams() 切成二元组再建 tsvector，与 services/search_index.tokenize 一致
+# SQLite: news_fts 为外部内容 FTS5 虚拟表（trigram 分词，支持中文子串），由触发器与 news 表保持同步
+NEWS_CJK_BIGRAMS_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION news_cjk_bigrams(source text) RETURNS text AS $$
+DECLARE
+    run text;
+    result text := '';
+BEGIN
+    IF source IS NULL THEN
+        RETURN '';
+    END IF;
+    FOR run IN SELECT (regexp_matches(lower(source), '[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+', 'g'))[1] LOOP
+        IF run ~ '^[a-z0-9]+$' OR char_length(run) = 1 THEN
+            result := result || ' ' || run;
+        ELSE
+            FOR i IN 1 .. char_length(run) - 1 LOOP
+                result := result || ' ' || substr(run, i, 2);
+            END LOOP;
+        END IF;
+    END LOOP;
+    RETURN result;
+END
+$$ LANGUAGE plpgsql IMMUTABLE
+"""
+
+NEWS_SEARCH_VECTOR_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION news_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', news_cjk_bigrams(NEW.title)), 'A') ||
+        setweight(to_tsvector('simple', news_cjk_bigrams(NEW.summary)), 'B') ||
+        setweight(to_tsvector('simple', news_cjk_bigrams(NEW.content)), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# FTS5 虚拟表的轻量表结构，仅用于构建查询
+news_fts = table("news_fts", column("rowid", Integer))
+
+_postgresql_fulltext_ddl = [
+    NEWS_CJK_BIGRAMS_FUNCTION,
+    NEWS_SEARCH_VECTOR_TRIGGER_FUNCTION,
+    "ALTER TABLE news ADD COLUMN search_vector tsvector",
+    "CREATE TRIGGER news_search_vector_trigger BEFORE INSERT OR UPDATE OF title, summary, content "
+    "ON news FOR EACH ROW EXECUTE FUNCTION news_search_vector_update()",
+    "CREATE INDEX ix_news_search_vector ON news USING gin (search_vector)",
+]
+
+_sqlite_fulltext_ddl = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5("
+    "title, summary, content, content='news', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS news_fts_ai AFTER INSERT ON news BEGIN "
+    "INSERT INTO news_fts(rowid, title, summary, content) "
+    "VALUES (new.id, new.title, new.summary, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS news_fts_ad AFTER DELETE ON news BEGIN "
+    "INSERT INTO news_fts(news_fts, rowid, title, summary, content) "
+    "VALUES ('delete', old.id, old.title, old.summary, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS news_fts_au AFTER UPDATE OF title, summary, content ON news BEGIN "
+    "INSERT INTO news_fts(news_fts, rowid, title, summary, content) "
+    "VALUES ('delete', old.id, old.title, old.summary, old.content); "
+    "INSERT INTO news_fts(rowid, title, summary, content) "
+    "VALUES (new.id, new.title, new.summary, new.content); END",
+]
+
+for _statement in _postgresql_fulltext_ddl:
+    event.listen(News.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+for _statement in _sqlite_fulltext_ddl:
+    event.listen(News.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    News.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS news_fts").execute_if(dialect="sqlite"),
+)
\ No newline at end of file
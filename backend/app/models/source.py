@@ -0,0 +1,37 @@
+"""
+新闻来源模型
+聚合抓取的外部 RSS/Atom 订阅源，以及条件请求所需的上次响应验证器
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Text, Boolean, DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from .base import Base
+
+
+class Source(Base):
+    """新闻来源模型"""
+    __tablename__ = "sources"
+    
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    url: Mapped[str] = mapped_column(String(1000), unique=True, index=True, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    
+    # 抓取到的新闻写入的分类与作者
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    
+    # 上次成功响应的验证器，下次抓取时作为 If-None-Match / If-Modified-Since 发送
+    etag: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    
+    # 抓取状态
+    last_fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_status: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # HTTP 状态码，网络错误时为空
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # 连续失败次数
+    
+    category: Mapped["Category"] = relationship("Category")
+    
+    def __repr__(self) -> str:
+        return f"<Source(id={self.id}, url='{self.url}')>"
@@ -106,6 +106,7 @@ class News(NewsBase):
     view_count: int
     like_count: int
     comment_count: int
+    duplicate_of_id: Optional[int] = None  # 近似重复稿件的原稿ID
     created_at: datetime
     updated_at: datetime
     
@@ -115,13 +116,92 @@ class News(NewsBase):
     tags: List[Tag] = []
 
 
+class NewsSummary(BaseModel):
+    """新闻列表项模式（不含正文，正文只在详情中返回）"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str] = None
+    cover_image: Optional[str] = None
+    video_url: Optional[str] = None
+    is_published: bool
+    is_featured: bool
+    is_breaking: bool
+    category_id: int
+    author_id: int
+    view_count: int
+    like_count: int
+    comment_count: int
+    duplicate_of_id: Optional[int] = None  # 近似重复稿件的原稿ID
+    created_at: datetime
+    updated_at: datetime
+    
+    # 关联数据（作者只含公开的摘要信息）
+    author: Optional["UserSummary"] = None
+    category: Optional[Category] = None
+    tags: List[Tag] = []
+
+
+class RelatedNews(BaseModel):
+    """相关新闻模式"""
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str] = None
+    cover_image: Optional[str] = None
+    category_id: int
+    created_at: datetime
+    score: float  # 文本、标签与分类相似度的加权和
+
+
+class TrendingNews(BaseModel):
+    """热门新闻模式"""
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str] = None
+    cover_image: Optional[str] = None
+    category_id: int
+    created_at: datetime
+    score: float  # 按时间衰减后的当前热度
+
+
 class NewsList(BaseModel):
     """新闻列表响应模式"""
-    items: List[News]
-    total: int
+    items: List[NewsSummary]
+    total: Optional[int] = None  # with_total=false 时不计算
+    total_type: Optional[str] = None  # exact: 精确值; estimated: 估算值（至少为该数）
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # 游标分页时下一页的游标，没有更多数据时为空
+
+
+class NewsBulkItemResult(BaseModel):
+    """批量导入中单条新闻的结果"""
+    index: int  # 在请求中的序号（从 0 开始）
+    status: str  # created: 已创建; conflict: slug 已存在或批次内重复; invalid: 校验失败; duplicate: 近似重复（reject 模式）
+    id: Optional[int] = None  # 已创建的新闻ID，duplicate 时为已有原稿的ID
+    slug: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class NewsBulkResult(BaseModel):
+    """批量导入响应模式"""
+    created: int
+    failed: int
+    items: List[NewsBulkItemResult]
+
+
+class NewsExportParams(BaseModel):
+    """新闻导出过滤条件"""
+    category_id: Optional[int] = None
+    is_published: Optional[bool] = None
+    created_from: Optional[datetime] = None  # 含
+    created_to: Optional[datetime] = None  # 不含
+    after_id: int = Field(0, ge=0)  # 只导出 id 大于该值的新闻，用于断点续传
 
 
 class NewsSearch(BaseModel):
@@ -129,11 +209,17 @@ class NewsSearch(BaseModel):
     q: Optional[str] = None
     category_id: Optional[int] = None
     tag_ids: Optional[List[int]] = None
+    tag_match: str = Field("any", pattern="^(any|all)$")  # any: 命中任一标签; all: 命中全部标签
     is_featured: Optional[bool] = None
     is_breaking: Optional[bool] = None
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=100)
+    cursor: Optional[str] = None  # 传入后使用游标分页，忽略 page
+    with_total: bool = True  # 为 False 时不返回总数，省去计数查询
 
 
 # 解决循环引用
-News.model_rebuild() 
\ No newline at end of file
+from .user import User, UserSummary  # noqa: E402
+
+News.model_rebuild()
+NewsSummary.model_rebuild() 
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+新闻来源相关的Pydantic模式
+用于来源管理与抓取API的数据验证
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class SourceBase(BaseModel):
+    """来源基础模式"""
+    name: str = Field(..., min_length=1, max_length=200)
+    url: str = Field(..., min_length=1, max_length=1000, pattern="^https?://")
+    category_id: int
+    is_active: bool = True
+
+
+class SourceCreate(SourceBase):
+    """创建来源模式"""
+    pass
+
+
+class SourceUpdate(BaseModel):
+    """更新来源模式"""
+    name: Optional[str] = Field(None, min_length=1, max_length=200)
+    url: Optional[str] = Field(None, min_length=1, max_length=1000, pattern="^https?://")
+    category_id: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+class Source(SourceBase):
+    """来源响应模式"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    author_id: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_fetched_at: Optional[datetime] = None
+    last_status: Optional[int] = None
+    last_error: Optional[str] = None
+    error_count: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class CrawlResult(BaseModel):
+    """一次抓取的统计"""
+    sources: int  # 抓取的来源数
+    fetched: int  # 返回了新内容（200）的来源数
+    not_modified: int  # 内容未变（304）的来源数
+    failed: int  # 网络错误、HTTP 错误或无法解析的来源数
+    entries: int  # 解析出的条目数
+    created: int  # 新写入的新闻数
+    skipped: int  # 已抓取过（slug 已存在）、近似重复或校验失败的条目数
+    seconds: float
@@ -51,6 +51,16 @@ class User(UserInDB):
     hashed_password: Optional[str] = None  # 不暴露密码
 
 
+class UserSummary(BaseModel):
+    """用户摘要模式（列表中内嵌的作者信息）"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+
+
 class UserLogin(BaseModel):
     """用户登录模式"""
     email: EmailStr
@@ -0,0 +1,415 @@
+"""
+近似重复检测
+稿件（标题加正文）去掉空白和标点后取字符 5-gram 作为 shingle，计算 64 个哈希函数的 MinHash 签名，
+两份签名相同位置相等的比例即 shingle 集合 Jaccard 相似度的估计。
+签名分为 16 段（每段 4 个值）做 LSH 分桶：至少一段完全相同的稿件才成为候选，再按签名确认相似度。
+签名保存在 news_signatures 表；进程内只索引原稿（未被判为重复的新闻），入库时的检查为一次向量化的
+签名计算加 16 次桶查找。已有数据由 deduplicate_corpus 批量补签名并聚类，签名计算分发到进程池
+"""
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.news import News, NewsSignature
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# 签名按小端 uint32 保存，跨进程、跨机器一致
+_SIGNATURE_DTYPE = np.dtype("<u4")
+
+# 哈希参数必须固定：签名会持久化，换一组参数后旧签名不可比较
+_rng = np.random.default_rng(0x5EED_D0C5)
+_MULTIPLIERS = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint32) * np.uint32(2) + np.uint32(1)
+_OFFSETS = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint32)
+_SHINGLE_BASE = np.uint64(0x100000001B3)
+_BAND_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+# 计算签名时每块的 shingle 数
+_SHINGLE_CHUNK = 1024
+
+# 在线索引中桶键的低 4 位存放段号，所有段共用一个有序数组
+_BAND_BITS = 4
+
+# 在线索引新加入的原稿先放在字典尾部，攒够后并入有序数组
+_TAIL_LIMIT = 1024
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+# 按ID批量设置 duplicate_of_id（executemany）
+SET_DUPLICATE_OF = (
+    update(News.__table__)
+    .where(News.__table__.c.id == bindparam("news_id"))
+    .values(duplicate_of_id=bindparam("original_id"))
+)
+
+
+def signature(title: str, content: str) -> Optional[np.ndarray]:
+    """稿件的 MinHash 签名，去掉空白和标点后没有文字时返回 None"""
+    text = _NON_WORD.sub("", f"{title}{content}".lower())
+    if not text:
+        return None
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=_SIGNATURE_DTYPE).astype(np.uint64)
+    count = max(len(codes) - SHINGLE_SIZE + 1, 1)
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(min(SHINGLE_SIZE, len(codes))):
+        hashes = hashes * _SHINGLE_BASE + codes[offset:offset + count]
+    # splitmix64 的混合步骤，使相邻 shingle 的哈希值充分打散
+    hashes ^= hashes >> np.uint64(30)
+    hashes *= np.uint64(0xBF58476D1CE4E5B9)
+    hashes ^= hashes >> np.uint64(27)
+    hashes *= np.uint64(0x94D049BB133111EB)
+    hashes ^= hashes >> np.uint64(31)
+    # 每个哈希函数为 32 位上的 a*x + b（a 为奇数，是一个置换）；按块计算，临时矩阵留在缓存中
+    hashes = (hashes >> np.uint64(32)).astype(np.uint32)
+    result = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    for start in range(0, count, _SHINGLE_CHUNK):
+        permuted = _MULTIPLIERS[:, None] * hashes[None, start:start + _SHINGLE_CHUNK]
+        permuted += _OFFSETS[:, None]
+        np.minimum(result, permuted.min(axis=1), out=result)
+    return result.astype(_SIGNATURE_DTYPE)
+
+
+def encode(value: np.ndarray) -> bytes:
+    return value.tobytes()
+
+
+def decode(value: bytes) -> np.ndarray:
+    return np.frombuffer(value, dtype=_SIGNATURE_DTYPE)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """签名估计的 Jaccard 相似度"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """每段签名折叠成一个 64 位桶键，形状为 (..., BANDS)"""
+    bands = signatures.reshape(*signatures.shape[:-1], BANDS, ROWS).astype(np.uint64)
+    keys = np.zeros(bands.shape[:-1], dtype=np.uint64)
+    for row in range(ROWS):
+        keys = keys * _BAND_BASE + bands[..., row]
+    return keys
+
+
+def _index_keys(signatures: np.ndarray) -> np.ndarray:
+    """在线索引的桶键：低位换成段号"""
+    mask = np.uint64(~((1 << _BAND_BITS) - 1) & 0xFFFFFFFFFFFFFFFF)
+    return (band_keys(signatures) & mask) | np.arange(BANDS, dtype=np.uint64)
+
+
+class MinHashLSH:
+    """
+    LSH 分段索引
+
+    签名按槽位存放在一个 uint32 矩阵中；所有段的桶键保存在一个有序数组中（二分查找），
+    新加入的原稿先放在字典尾部，攒够后按位置插入有序数组；移除只让槽位失效，
+    失效过多时整体重建
+    """
+
+    def __init__(self):
+        self._signatures = np.zeros((0, NUM_PERM), dtype=_SIGNATURE_DTYPE)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._live = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._slots: Dict[int, int] = {}
+        self._keys = np.zeros(0, dtype=np.uint64)
+        self._key_slots = np.zeros(0, dtype=np.int64)
+        self._tail: Dict[int, List[int]] = {}
+        self._tail_count = 0
+
+    @classmethod
+    def build(cls, ids: np.ndarray, signatures: np.ndarray) -> "MinHashLSH":
+        """由全部原稿一次构建"""
+        index = cls()
+        index._ids = np.asarray(ids, dtype=np.int64)
+        index._signatures = np.asarray(signatures, dtype=_SIGNATURE_DTYPE).reshape(-1, NUM_PERM)
+        index._size = len(index._ids)
+        index._live = np.ones(index._size, dtype=bool)
+        index._slots = dict(zip(index._ids.tolist(), range(index._size)))
+        keys = _index_keys(index._signatures).ravel()
+        order = np.argsort(keys, kind="stable")
+        index._keys = keys[order]
+        index._key_slots = np.repeat(np.arange(index._size, dtype=np.int64), BANDS)[order]
+        return index
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, news_id: int) -> bool:
+        return news_id in self._slots
+
+    def add(self, news_id: int, value: np.ndarray) -> None:
+        """加入原稿（已存在时替换签名）"""
+        self.remove(news_id)
+        if self._size == len(self._ids):
+            capacity = max(2 * self._size, 64)
+            self._signatures = np.resize(self._signatures, (capacity, NUM_PERM))
+            self._ids = np.resize(self._ids, capacity)
+            self._live = np.resize(self._live, capacity)
+        slot = self._size
+        self._size += 1
+        self._signatures[slot] = value
+        self._ids[slot] = news_id
+        self._live[slot] = True
+        self._slots[news_id] = slot
+        for key in _index_keys(value).tolist():
+            self._tail.setdefault(key, []).append(slot)
+        self._tail_count += 1
+        if self._tail_count >= _TAIL_LIMIT:
+            self._merge()
+
+    def remove(self, news_id: int) -> None:
+        slot = self._slots.pop(news_id, None)
+        if slot is not None:
+            self._live[slot] = False
+
+    def query(self, value: np.ndarray, threshold: float) -> Optional[Tuple[int, float]]:
+        """相似度达到阈值的原稿中最相似的一篇（相同时取先加入的），没有时返回 None"""
+        keys = _index_keys(value)
+        starts = np.searchsorted(self._keys, keys, side="left").tolist()
+        stops = np.searchsorted(self._keys, keys, side="right").tolist()
+        candidates = [self._key_slots[start:stop] for start, stop in zip(starts, stops) if start < stop]
+        for key in keys.tolist():
+            tail = self._tail.get(key)
+            if tail:
+                candidates.append(np.asarray(tail, dtype=np.int64))
+        if not candidates:
+            return None
+        slots = np.unique(np.concatenate(candidates))
+        slots = slots[self._live[slots]]
+        if not len(slots):
+            return None
+        scores = np.count_nonzero(self._signatures[slots] == value, axis=1) / NUM_PERM
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return int(self._ids[slots[best]]), float(scores[best])
+
+    def _merge(self) -> None:
+        """尾部并入有序数组；失效槽位超过四分之一时整体重建"""
+        if self._size - len(self._slots) > self._size // 4:
+            live = np.flatnonzero(self._live[:self._size])
+            rebuilt = MinHashLSH.build(self._ids[live], self._signatures[live])
+            self.__dict__.update(rebuilt.__dict__)
+            return
+        tail_keys = np.fromiter(
+            (key for key, slots in self._tail.items() for _ in slots), dtype=np.uint64
+        )
+        tail_slots = np.fromiter(
+            (slot for slots in self._tail.values() for slot in slots), dtype=np.int64
+        )
+        order = np.argsort(tail_keys, kind="stable")
+        positions = np.searchsorted(self._keys, tail_keys[order], side="right")
+        self._keys = np.insert(self._keys, positions, tail_keys[order])
+        self._key_slots = np.insert(self._key_slots, positions, tail_slots[order])
+        self._tail = {}
+        self._tail_count = 0
+
+
+class NewsDeduplicator:
+    """
+    入库去重
+
+    启动时从 news_signatures 加载原稿签名，之后由新闻写入增量维护；
+    其他进程写入的原稿按 id 定期补充加载（catch_up）
+    """
+
+    def __init__(self):
+        self.is_loaded = False
+        self._lock = threading.Lock()
+        self._index = MinHashLSH()
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = MinHashLSH()
+            self._last_id = 0
+            self.is_loaded = False
+
+    @staticmethod
+    def _originals(db: Session, after_id: int, batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        result = db.execute(
+            select(NewsSignature.news_id, NewsSignature.minhash)
+            .join(News, News.id == NewsSignature.news_id)
+            .where(NewsSignature.news_id > after_id, News.duplicate_of_id.is_(None))
+            .order_by(NewsSignature.news_id)
+            .execution_options(yield_per=batch_size)
+        )
+        ids, values = [], []
+        for news_id, minhash in result:
+            if minhash:
+                ids.append(news_id)
+                values.append(minhash)
+        return np.asarray(ids, dtype=np.int64), decode(b"".join(values)).reshape(-1, NUM_PERM)
+
+    def rebuild(self, db: Session, batch_size: int = 10000) -> None:
+        """从数据库加载全部原稿签名，构建完成后整体替换"""
+        ids, values = self._originals(db, 0, batch_size)
+        index = MinHashLSH.build(ids, values)
+        with self._lock:
+            self._index = index
+            self._last_id = int(ids[-1]) if len(ids) else 0
+            self.is_loaded = True
+
+    def catch_up(self, db: Session, batch_size: int = 10000) -> None:
+        """加载上次之后（其他进程）新写入的原稿"""
+        ids, values = self._originals(db, self._last_id, batch_size)
+        with self._lock:
+            for news_id, value in zip(ids.tolist(), values):
+                if news_id not in self._index:
+                    self._index.add(news_id, value)
+            if len(ids):
+                self._last_id = max(self._last_id, int(ids[-1]))
+
+    def check(self, value: Optional[np.ndarray]) -> Optional[Tuple[int, float]]:
+        """查找近似重复的原稿，返回 (原稿ID, 相似度)"""
+        if value is None:
+            return None
+        with self._lock:
+            return self._index.query(value, settings.NEWS_DEDUP_THRESHOLD)
+
+    def add(self, news_id: int, value: Optional[np.ndarray]) -> None:
+        """原稿写入后加入索引（已存在时替换签名），没有签名的稿件移出索引"""
+        with self._lock:
+            if value is None:
+                self._index.remove(news_id)
+                return
+            self._index.add(news_id, value)
+            self._last_id = max(self._last_id, news_id)
+
+    def remove(self, news_id: int) -> None:
+        with self._lock:
+            self._index.remove(news_id)
+
+
+def cluster(ids: np.ndarray, signatures: np.ndarray, threshold: float, pair_chunk: int = 1 << 20) -> np.ndarray:
+    """
+    批量聚类，返回每篇新闻所在簇的原稿ID（簇内最小的ID，原稿为自身）
+    每段按桶键排序，同桶的稿件与桶内ID最小的稿件比较，相似度达到阈值的连边，连通分量为一簇
+    """
+    order = np.argsort(ids, kind="stable")
+    ids, signatures = ids[order], signatures[order]
+    count = len(ids)
+    if count == 0:
+        return ids
+    keys = band_keys(signatures)
+
+    pairs = []
+    for band in range(BANDS):
+        by_key = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[by_key, band]
+        new_bucket = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        leaders = by_key[np.flatnonzero(new_bucket)][np.cumsum(new_bucket) - 1]
+        members = leaders != by_key
+        pairs.append(leaders[members] * count + by_key[members])
+    pairs = np.unique(np.concatenate(pairs))
+
+    similar = []
+    for start in range(0, len(pairs), pair_chunk):
+        leaders, members = np.divmod(pairs[start:start + pair_chunk], count)
+        matches = np.count_nonzero(signatures[leaders] == signatures[members], axis=1) / NUM_PERM
+        similar.append(pairs[start:start + pair_chunk][matches >= threshold])
+    leaders, members = np.divmod(np.concatenate(similar), count)
+
+    graph = sparse.coo_matrix((np.ones(len(leaders), dtype=np.int8), (leaders, members)), shape=(count, count))
+    components, labels = connected_components(graph, directed=False)
+    roots = np.full(components, count, dtype=np.int64)
+    np.minimum.at(roots, labels, np.arange(count))
+    result = np.empty(count, dtype=np.int64)
+    result[order] = ids[roots[labels]]
+    return result
+
+
+def _signature_rows(rows: Sequence[Tuple[int, str, str]]) -> List[Tuple[int, bytes]]:
+    """进程池任务：计算一批稿件的签名，没有文字的稿件保存为空值"""
+    result = []
+    for news_id, title, content in rows:
+        value = signature(title, content)
+        result.append((news_id, b"" if value is None else encode(value)))
+    return result
+
+
+def _store_signatures(db: Session, rows: Iterable[Tuple[int, bytes]]) -> int:
+    rows = [{"news_id": news_id, "minhash": minhash} for news_id, minhash in rows]
+    if rows:
+        db.execute(insert(NewsSignature.__table__), rows)
+        db.commit()
+    return len(rows)
+
+
+def deduplicate_corpus(
+    db: Session,
+    workers: Optional[int] = None,
+    batch_size: int = 1000,
+    threshold: Optional[float] = None
+) -> Tuple[int, int]:
+    """
+    批量去重：为没有签名的新闻计算签名（进程池并行，最多 2*workers 批在途），
+    再对全部签名聚类并写回 duplicate_of_id。返回 (新计算的签名数, 标记为重复的新闻数)
+    """
+    threshold = settings.NEWS_DEDUP_THRESHOLD if threshold is None else threshold
+    workers = workers or os.cpu_count() or 1
+    computed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(News.id, News.title, News.content)
+                .outerjoin(NewsSignature, NewsSignature.news_id == News.id)
+                .where(News.id > last_id, NewsSignature.news_id.is_(None))
+                .order_by(News.id)
+                .limit(batch_size)
+            ).all()
+            db.rollback()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            in_flight.append(executor.submit(_signature_rows, [tuple(row) for row in rows]))
+            if len(in_flight) >= 2 * workers:
+                computed += _store_signatures(db, in_flight.popleft().result())
+        while in_flight:
+            computed += _store_signatures(db, in_flight.popleft().result())
+
+    ids, current, values = [], [], []
+    for news_id, duplicate_of_id, minhash in db.execute(
+        select(News.id, News.duplicate_of_id, NewsSignature.minhash)
+        .join(NewsSignature, NewsSignature.news_id == News.id)
+        .where(NewsSignature.minhash != b"")
+        .execution_options(yield_per=10000)
+    ):
+        ids.append(news_id)
+        current.append(duplicate_of_id)
+        values.append(minhash)
+    db.rollback()
+    roots = cluster(np.asarray(ids, dtype=np.int64), decode(b"".join(values)).reshape(-1, NUM_PERM), threshold)
+
+    changes = []
+    for news_id, root, duplicate_of_id in zip(ids, roots.tolist(), current):
+        original_id = root if root != news_id else None
+        if original_id != duplicate_of_id:
+            changes.append({"news_id": news_id, "original_id": original_id})
+    for start in range(0, len(changes), batch_size):
+        db.execute(SET_DUPLICATE_OF, changes[start:start + batch_size])
+        db.commit()
+    return computed, int(np.count_nonzero(roots != np.asarray(ids, dtype=np.int64)))
+
+
+# 全局实例
+news_deduplicator = NewsDeduplicator()
@@ -0,0 +1,127 @@
+"""
+新闻列表响应缓存
+缓存序列化后的列表 JSON，键由规范化的查询参数和相关的代数计数器组成；
+写入新闻后递增全局、分类和标签的代数，旧键随之失效，由过期时间回收
+"""
+import hashlib
+import json
+from typing import Iterable, List, Optional, Tuple
+
+import redis
+import structlog
+
+from ..core.cache import create_cache_client
+from ..core.config import settings
+from ..schemas.news import NewsSearch
+
+logger = structlog.get_logger()
+
+GLOBAL_GENERATION = "news:gen:global"
+
+
+def category_generation(category_id: int) -> str:
+    return f"news:gen:category:{category_id}"
+
+
+def tag_generation(tag_id: int) -> str:
+    return f"news:gen:tag:{tag_id}"
+
+
+class NewsListCache:
+    """
+    新闻列表缓存
+
+    按标签过滤的列表只依赖这些标签的代数，按分类过滤的列表只依赖该分类的代数，
+    其余列表依赖全局代数；写入时递增新闻前后所属分类与标签的代数以及全局代数。
+    缓存不可用时读写都降级为直接查询数据库。
+    """
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_cache_client()
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+
+    @property
+    def enabled(self) -> bool:
+        return settings.NEWS_LIST_CACHE_TTL_SECONDS > 0
+
+    @staticmethod
+    def _normalize(search_params: NewsSearch) -> dict:
+        """规范化查询参数：等价的查询得到相同的键"""
+        params = search_params.model_dump(exclude_none=True)
+        if search_params.q is not None:
+            # 各搜索模式都不区分大小写
+            params["q"] = " ".join(search_params.q.lower().split())
+        if search_params.tag_ids:
+            params["tag_ids"] = sorted(set(search_params.tag_ids))
+        else:
+            params.pop("tag_ids", None)
+        if len(params.get("tag_ids", ())) < 2:
+            params.pop("tag_match", None)
+        if search_params.cursor:
+            params.pop("page", None)
+        return params
+
+    @staticmethod
+    def _generation_keys(search_params: NewsSearch) -> List[str]:
+        if search_params.tag_ids:
+            return [tag_generation(tag_id) for tag_id in sorted(set(search_params.tag_ids))]
+        if search_params.category_id:
+            return [category_generation(search_params.category_id)]
+        return [GLOBAL_GENERATION]
+
+    def _key(self, search_params: NewsSearch) -> str:
+        generation_keys = self._generation_keys(search_params)
+        generations = [int(value or 0) for value in self.client.mget(generation_keys)]
+        params = json.dumps(self._normalize(search_params), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha1(params.encode()).hexdigest()
+        return f"news:list:{'.'.join(map(str, generations))}:{digest}"
+
+    def get(self, search_params: NewsSearch) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        返回 (缓存键, 缓存的响应体)，未命中时响应体为 None，缓存不可用时两者都为 None；
+        查询数据库前取得键，写回时使用同一个键，查询期间发生的写入不会被缓存成新代数
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            key = self._key(search_params)
+            return key, self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"News list cache unavailable: {e}")
+            return None, None
+
+    def set(self, key: Optional[str], body: bytes) -> None:
+        """缓存响应体"""
+        if key is None:
+            return
+        try:
+            self.client.set(key, body, ex=settings.NEWS_LIST_CACHE_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"News list cache unavailable: {e}")
+
+    def invalidate(self, category_ids: Iterable[Optional[int]] = (), tag_ids: Iterable[int] = ()) -> None:
+        """新闻写入后使相关列表和订阅源失效（需在提交之后调用）"""
+        # 订阅源缓存（services/news_feed）共用这些代数计数器
+        if not self.enabled and settings.NEWS_FEED_CACHE_TTL_SECONDS <= 0:
+            return
+        keys = [GLOBAL_GENERATION]
+        keys += [category_generation(category_id) for category_id in set(category_ids) if category_id]
+        keys += [tag_generation(tag_id) for tag_id in set(tag_ids)]
+        try:
+            for key in keys:
+                self.client.incr(key)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to invalidate news list cache: {e}")
+
+
+# 全局缓存实例
+news_list_cache = NewsListCache()
@@ -0,0 +1,106 @@
+"""
+新闻全量导出
+按 id 顺序经服务端游标逐批读取（yield_per），每批编码为一段 NDJSON 或 CSV，
+内存占用只与批大小有关，与新闻总量无关；中断后传入已收到的最大 id 继续导出
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.news import News, NewsTag, Tag
+from ..schemas.news import NewsExportParams
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# 只读取导出需要的列，不构造 ORM 对象
+_EXPORT_COLUMNS = (
+    News.id, News.title, News.slug, News.summary, News.content,
+    News.cover_image, News.video_url,
+    News.is_published, News.is_featured, News.is_breaking,
+    News.view_count, News.like_count, News.comment_count,
+    News.author_id, News.category_id, News.created_at, News.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in _EXPORT_COLUMNS] + ["tags"]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+class NewsExporter:
+    """新闻导出"""
+
+    @staticmethod
+    def iter_batches(
+        db: Session, params: NewsExportParams, batch_size: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """逐批返回新闻（字典，tags 为标签 slug 列表），批内与批间都按 id 升序"""
+        query = select(*_EXPORT_COLUMNS).where(News.id > params.after_id).order_by(News.id)
+        if params.category_id is not None:
+            query = query.where(News.category_id == params.category_id)
+        if params.is_published is not None:
+            query = query.where(News.is_published == params.is_published)
+        if params.created_from is not None:
+            query = query.where(News.created_at >= params.created_from)
+        if params.created_to is not None:
+            query = query.where(News.created_at < params.created_to)
+
+        # yield_per 使用服务端游标（PostgreSQL 为具名游标），每次只取一批到内存
+        result = db.execute(query.execution_options(yield_per=batch_size or settings.NEWS_EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            # 标签按批 IN 查询一次，与游标在同一事务中交替执行
+            tags: Dict[int, List[str]] = defaultdict(list)
+            tag_rows = db.execute(
+                select(NewsTag.news_id, Tag.slug)
+                .join(Tag, Tag.id == NewsTag.tag_id)
+                .where(NewsTag.news_id.in_([row.id for row in rows]))
+                .order_by(NewsTag.news_id, Tag.slug)
+            )
+            for news_id, slug in tag_rows:
+                tags[news_id].append(slug)
+            yield [{**row._asdict(), "tags": tags.get(row.id, [])} for row in rows]
+
+    @staticmethod
+    def encode_ndjson(batch: List[Dict[str, Any]]) -> bytes:
+        """每条新闻一行 JSON"""
+        return "".join(
+            json.dumps(item, ensure_ascii=False, default=_json_default) + "\n" for item in batch
+        ).encode()
+
+    @staticmethod
+    def encode_csv(batch: List[Dict[str, Any]], header: bool = False) -> bytes:
+        """CSV 行，标签以 | 分隔"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(EXPORT_FIELDS)
+        for item in batch:
+            row = [item[field] for field in EXPORT_FIELDS]
+            row[-1] = "|".join(row[-1])
+            writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def stream(
+        db: Session, params: NewsExportParams, export_format: str = "ndjson", batch_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """按批编码的导出内容，CSV 的第一段带表头"""
+        if export_format == "csv":
+            yield NewsExporter.encode_csv([], header=True)
+        for batch in NewsExporter.iter_batches(db, params, batch_size):
+            if export_format == "csv":
+                yield NewsExporter.encode_csv(batch)
+            else:
+                yield NewsExporter.encode_ndjson(batch)
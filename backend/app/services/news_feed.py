@@ -0,0 +1,264 @@
+"""
+新闻订阅源（RSS 2.0 / Atom）
+全站、分类和标签的订阅源渲染一次后以字节缓存，条目记录所依赖的列表代数计数器；
+该分类或标签的新闻写入后计数器递增，下次请求时才重新生成。命中缓存时不访问数据库
+"""
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional, Sequence, Tuple
+from xml.etree import ElementTree
+
+import redis
+import structlog
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.cache import create_cache_client
+from ..core.conditional import as_utc, make_etag
+from ..core.config import settings
+from ..models.news import Category, Tag
+from ..schemas.news import NewsSearch, NewsSummary
+from .news_cache import GLOBAL_GENERATION, category_generation, tag_generation
+
+logger = structlog.get_logger()
+
+FEED_FORMATS = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+}
+
+_ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+
+@dataclass(frozen=True)
+class FeedSource:
+    """订阅源的范围：kind 为 all / category / tag"""
+    kind: str
+    slug: Optional[str]
+    title: str
+    search_params: NewsSearch
+    generation_key: str
+
+
+@dataclass(frozen=True)
+class Feed:
+    """渲染好的订阅源及其验证器"""
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+def news_url(slug: str) -> str:
+    """新闻在前端站点上的地址"""
+    return f"{settings.SITE_URL.rstrip('/')}/news/{slug}"
+
+
+def feed_url(kind: str, slug: Optional[str], feed_format: str) -> str:
+    """订阅源在 API 上的地址（后台重新生成时没有请求地址可用）"""
+    base = f"{settings.API_BASE_URL.rstrip('/')}{settings.API_V1_STR}/feeds"
+    if kind == "all":
+        return f"{base}/{feed_format}"
+    return f"{base}/{'categories' if kind == 'category' else 'tags'}/{slug}/{feed_format}"
+
+
+class NewsFeedService:
+    """订阅源查询与渲染"""
+
+    @staticmethod
+    def resolve(db: Session, kind: str, slug: Optional[str] = None) -> FeedSource:
+        """按分类或标签的 slug 确定订阅源范围，不存在时返回 404"""
+        size = min(settings.NEWS_FEED_SIZE, 100)
+        if kind == "all":
+            return FeedSource(
+                kind, None, settings.APP_NAME,
+                NewsSearch(size=size, with_total=False), GLOBAL_GENERATION,
+            )
+
+        model = Category if kind == "category" else Tag
+        query = select(model.id, model.name).where(model.slug == slug)
+        if model is Category:
+            query = query.where(Category.is_active == True)
+        row = db.execute(query).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="分类不存在" if model is Category else "标签不存在"
+            )
+        if kind == "category":
+            search_params = NewsSearch(category_id=row.id, size=size, with_total=False)
+            generation_key = category_generation(row.id)
+        else:
+            search_params = NewsSearch(tag_ids=[row.id], size=size, with_total=False)
+            generation_key = tag_generation(row.id)
+        return FeedSource(kind, slug, f"{settings.APP_NAME} - {row.name}", search_params, generation_key)
+
+    @staticmethod
+    def render(source: FeedSource, items: Sequence[NewsSummary], feed_format: str, self_url: str) -> Feed:
+        """渲染 RSS 2.0 或 Atom 文档"""
+        built_at = datetime.now(timezone.utc).replace(microsecond=0)
+        if feed_format == "atom":
+            root = NewsFeedService._render_atom(source, items, self_url, built_at)
+        else:
+            root = NewsFeedService._render_rss(source, items, self_url, built_at)
+        body = ElementTree.tostring(root, encoding="utf-8", xml_declaration=True)
+        return Feed(body=body, etag=make_etag(body), last_modified=built_at)
+
+    @staticmethod
+    def _render_rss(
+        source: FeedSource, items: Sequence[NewsSummary], self_url: str, built_at: datetime
+    ) -> ElementTree.Element:
+        rss = ElementTree.Element("rss", {"version": "2.0", "xmlns:atom": _ATOM_NAMESPACE})
+        channel = ElementTree.SubElement(rss, "channel")
+        ElementTree.SubElement(channel, "title").text = source.title
+        ElementTree.SubElement(channel, "link").text = settings.SITE_URL
+        ElementTree.SubElement(channel, "description").text = source.title
+        ElementTree.SubElement(channel, "lastBuildDate").text = format_datetime(built_at, usegmt=True)
+        ElementTree.SubElement(channel, "atom:link", {"href": self_url, "rel": "self", "type": "application/rss+xml"})
+        for news in items:
+            item = ElementTree.SubElement(channel, "item")
+            ElementTree.SubElement(item, "title").text = news.title
+            ElementTree.SubElement(item, "link").text = news_url(news.slug)
+            ElementTree.SubElement(item, "guid", {"isPermaLink": "true"}).text = news_url(news.slug)
+            ElementTree.SubElement(item, "pubDate").text = format_datetime(as_utc(news.created_at), usegmt=True)
+            if news.summary:
+                ElementTree.SubElement(item, "description").text = news.summary
+            if news.category:
+                ElementTree.SubElement(item, "category").text = news.category.name
+            for tag in news.tags:
+                ElementTree.SubElement(item, "category").text = tag.name
+        return rss
+
+    @staticmethod
+    def _render_atom(
+        source: FeedSource, items: Sequence[NewsSummary], self_url: str, built_at: datetime
+    ) -> ElementTree.Element:
+        feed = ElementTree.Element("feed", {"xmlns": _ATOM_NAMESPACE})
+        ElementTree.SubElement(feed, "id").text = self_url
+        ElementTree.SubElement(feed, "title").text = source.title
+        ElementTree.SubElement(feed, "updated").text = built_at.isoformat()
+        ElementTree.SubElement(feed, "link", {"href": self_url, "rel": "self"})
+        ElementTree.SubElement(feed, "link", {"href": settings.SITE_URL, "rel": "alternate"})
+        for news in items:
+            entry = ElementTree.SubElement(feed, "entry")
+            ElementTree.SubElement(entry, "id").text = news_url(news.slug)
+            ElementTree.SubElement(entry, "title").text = news.title
+            ElementTree.SubElement(entry, "link", {"href": news_url(news.slug), "rel": "alternate"})
+            ElementTree.SubElement(entry, "published").text = as_utc(news.created_at).isoformat()
+            ElementTree.SubElement(entry, "updated").text = as_utc(news.updated_at).isoformat()
+            author = ElementTree.SubElement(entry, "author")
+            ElementTree.SubElement(author, "name").text = news.author.username if news.author else settings.APP_NAME
+            if news.summary:
+                ElementTree.SubElement(entry, "summary").text = news.summary
+            for category in ([news.category] if news.category else []) + list(news.tags):
+                ElementTree.SubElement(entry, "category", {"term": category.slug, "label": category.name})
+        return feed
+
+
+class AsyncNewsFeedService:
+    """订阅源查询（异步）"""
+
+    @staticmethod
+    async def resolve(db: AsyncSession, kind: str, slug: Optional[str] = None) -> FeedSource:
+        """按分类或标签的 slug 确定订阅源范围，不存在时返回 404"""
+        return await db.run_sync(NewsFeedService.resolve, kind, slug)
+
+
+class NewsFeedCache:
+    """
+    订阅源缓存
+
+    键为 (范围, slug, 格式)，值为一行 JSON 头（所依赖的代数计数器及生成时的代数、验证器）加 XML；
+    读取时比较计数器的当前值，已递增则视为未命中。缓存不可用时每次重新生成。
+    """
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_cache_client()
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+
+    @property
+    def enabled(self) -> bool:
+        return settings.NEWS_FEED_CACHE_TTL_SECONDS > 0
+
+    @staticmethod
+    def _key(kind: str, slug: Optional[str], feed_format: str) -> str:
+        return f"news:feed:{kind}:{slug or ''}:{feed_format}"
+
+    def _load(self, kind: str, slug: Optional[str], feed_format: str) -> Optional[Tuple[dict, bytes, bool]]:
+        """读取缓存的 (JSON 头, XML, 是否仍然有效)，未缓存时返回 None"""
+        value = self.client.get(self._key(kind, slug, feed_format))
+        if value is None:
+            return None
+        header, body = value.split(b"\n", 1)
+        meta = json.loads(header)
+        return meta, body, int(self.client.get(meta["generation_key"]) or 0) == meta["generation"]
+
+    def get(self, kind: str, slug: Optional[str], feed_format: str) -> Optional[Feed]:
+        """返回仍然有效的订阅源，未命中时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            cached = self._load(kind, slug, feed_format)
+        except redis.RedisError as e:
+            logger.warning(f"News feed cache unavailable: {e}")
+            return None
+        if cached is None or not cached[2]:
+            return None
+        meta, body, _ = cached
+        return Feed(body=body, etag=meta["etag"], last_modified=datetime.fromisoformat(meta["last_modified"]))
+
+    def stale(self, kind: str, slug: Optional[str], feed_format: str) -> bool:
+        """缓存过（即有人订阅）但已失效的订阅源，由后台任务提前重新生成"""
+        if not self.enabled:
+            return False
+        try:
+            cached = self._load(kind, slug, feed_format)
+        except redis.RedisError as e:
+            logger.warning(f"News feed cache unavailable: {e}")
+            return False
+        return cached is not None and not cached[2]
+
+    def generation(self, source: FeedSource) -> Optional[int]:
+        """查询新闻之前读取代数，写回时使用，查询期间发生的写入不会被缓存成新代数"""
+        if not self.enabled:
+            return None
+        try:
+            return int(self.client.get(source.generation_key) or 0)
+        except redis.RedisError as e:
+            logger.warning(f"News feed cache unavailable: {e}")
+            return None
+
+    def set(self, source: FeedSource, feed_format: str, generation: Optional[int], feed: Feed) -> None:
+        """缓存订阅源"""
+        if generation is None:
+            return
+        header = json.dumps({
+            "generation_key": source.generation_key,
+            "generation": generation,
+            "etag": feed.etag,
+            "last_modified": feed.last_modified.isoformat(),
+        }).encode()
+        try:
+            self.client.set(
+                self._key(source.kind, source.slug, feed_format),
+                header + b"\n" + feed.body,
+                ex=settings.NEWS_FEED_CACHE_TTL_SECONDS,
+            )
+        except redis.RedisError as e:
+            logger.warning(f"News feed cache unavailable: {e}")
+
+
+# 全局缓存实例
+news_feed_cache = NewsFeedCache()
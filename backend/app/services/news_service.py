@@ -2,13 +2,61 @@
 新闻服务层
 包含新闻的CRUD操作、搜索和统计功能
 """
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_, or_
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional, List, Tuple, Any, Dict, Sequence, Union
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, joinedload, selectinload
+from sqlalchemy import select, insert, update, delete, func, and_, or_, literal, literal_column, tuple_, Select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import sqlite
 from fastapi import HTTPException, status
 
-from ..models.news import News, Category, Tag, NewsTag
-from ..schemas.news import NewsCreate, NewsUpdate, NewsSearch, NewsList
+from ..core.config import settings
+from ..core.pagination import encode_cursor, decode_cursor
+from ..models.news import News, Category, Tag, NewsTag, NewsSignature, news_fts
+from ..schemas.news import NewsCreate, NewsUpdate, NewsSearch, NewsList, NewsBulkItemResult
+from ..tasks.news import news_tasks
+from .dedup import SET_DUPLICATE_OF, MinHashLSH, decode, encode, news_deduplicator, signature
+from .news_totals import NewsTotals, TOTAL_EXACT
+from .search_index import news_search_index, tokenize
+from .tag_index import news_tag_index
+from .trending import news_trending
+from .view_counter import news_view_counter
+
+# SQLite 中 server_default 写入的时间精度为秒（'2026-01-01 00:00:01'），
+# 游标比较时按相同格式绑定，否则带微秒的字符串总是更大
+_SQLITE_SECOND_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
+# 响应中内嵌作者、分类和标签：多对一关联随主查询 JOIN 加载，标签按整页 IN 查询一次加载，
+# 避免序列化时逐条懒加载
+NEWS_LOAD_OPTIONS = (
+    joinedload(News.author),
+    joinedload(News.category),
+    selectinload(News.tags),
+)
+
+# 列表只返回摘要信息（NewsSummary），不读取正文列；正文只在详情中加载
+NEWS_LIST_LOAD_OPTIONS = (defer(News.content), *NEWS_LOAD_OPTIONS)
+
+
+# 分类、标签列表的版本：数量与最近更新时间
+_CATEGORIES_VERSION = select(
+    func.count(Category.id).filter(Category.is_active == True),
+    func.max(Category.updated_at),
+)
+_TAGS_VERSION = select(func.count(Tag.id), func.max(Tag.updated_at))
+
+# 批量导入写入的列（COPY 不会套用列的 Python 端默认值，计数列显式给出）
+_BULK_NEWS_COLUMNS = (
+    "title", "slug", "summary", "content", "cover_image", "video_url",
+    "is_published", "is_featured", "is_breaking", "category_id", "author_id",
+    "view_count", "like_count", "comment_count", "duplicate_of_id",
+)
+_BULK_INSERTED_COLUMNS = (News.id, News.slug, News.created_at, News.updated_at)
 
 
 class NewsService:
@@ -17,12 +65,17 @@ class NewsService:
     @staticmethod
     def get_by_id(db: Session, news_id: int) -> Optional[News]:
         """根据ID获取新闻"""
-        return db.get(News, news_id)
+        return db.get(News, news_id, options=NEWS_LOAD_OPTIONS)
+    
+    @staticmethod
+    def get_version(db: Session, news_id: int) -> Optional[datetime]:
+        """读取新闻的更新时间（条件请求使用，不加载整行），新闻不存在时返回 None"""
+        return db.scalar(select(News.updated_at).where(News.id == news_id))
     
     @staticmethod
     def get_by_slug(db: Session, slug: str) -> Optional[News]:
         """根据slug获取新闻"""
-        stmt = select(News).where(News.slug == slug)
+        stmt = select(News).options(*NEWS_LOAD_OPTIONS).where(News.slug == slug)
         result = db.execute(stmt)
         return result.scalar_one_or_none()
     
@@ -31,17 +84,31 @@ class NewsService:
         db: Session, 
         skip: int = 0, 
         limit: int = 100,
-        published_only: bool = True
+        published_only: bool = True,
+        cursor: Optional[str] = None
     ) -> List[News]:
-        """获取多个新闻"""
-        stmt = select(News)
-        if published_only:
-            stmt = stmt.where(News.is_published == True)
-        stmt = stmt.offset(skip).limit(limit).order_by(News.created_at.desc())
-        
+        """获取多个新闻（传入游标时使用游标分页，忽略 skip；不加载正文）"""
+        stmt = NewsService._multi_stmt(db, skip, limit, published_only, cursor)
         result = db.execute(stmt)
         return result.scalars().all()
     
+    @staticmethod
+    def _multi_stmt(
+        db: Union[Session, AsyncSession],
+        skip: int,
+        limit: int,
+        published_only: bool,
+        cursor: Optional[str]
+    ) -> Select:
+        stmt = select(News).options(*NEWS_LIST_LOAD_OPTIONS)
+        if published_only:
+            stmt = stmt.where(News.is_published == True)
+        if cursor:
+            stmt = NewsService._apply_cursor(db, stmt, cursor)
+        else:
+            stmt = stmt.offset(skip)
+        return stmt.limit(limit).order_by(News.created_at.desc(), News.id.desc())
+    
     @staticmethod
     def create(db: Session, news_in: NewsCreate, author_id: int) -> News:
         """创建新闻"""
@@ -56,17 +123,252 @@ class NewsService:
         news_data = news_in.model_dump()
         tag_ids = news_data.pop("tag_ids", [])
         
-        db_news = News(**news_data, author_id=author_id)
+        minhash, duplicate_of_id = None, None
+        if settings.NEWS_DEDUP_MODE != "off":
+            minhash, duplicate_of_id = NewsService._find_duplicate(news_in.title, news_in.content)
+        
+        db_news = News(**news_data, author_id=author_id, duplicate_of_id=duplicate_of_id)
         db.add(db_news)
+        if settings.NEWS_DEDUP_MODE != "off" or tag_ids:
+            db.flush()
+        if settings.NEWS_DEDUP_MODE != "off":
+            db.add(NewsSignature(news_id=db_news.id, minhash=b"" if minhash is None else encode(minhash)))
+        # 标签关联与新闻在同一个事务中写入
+        db.add_all(NewsTag(news_id=db_news.id, tag_id=tag_id) for tag_id in dict.fromkeys(tag_ids))
         db.commit()
         db.refresh(db_news)
         
-        # 添加标签关联
-        if tag_ids:
-            NewsService.add_tags_to_news(db, db_news.id, tag_ids)
+        # 后续的入库检查要立即看到这篇原稿，去重索引同步更新；其余工作交给后台任务
+        if settings.NEWS_DEDUP_MODE != "off" and duplicate_of_id is None:
+            news_deduplicator.add(db_news.id, minhash)
+        news_tasks.news_written(
+            db, [db_news.id], category_ids=[db_news.category_id], tag_ids=tag_ids,
+            thumbnail_ids=[db_news.id] if db_news.cover_image else (),
+        )
         
         return db_news
     
+    @staticmethod
+    def bulk_create(
+        db: Session,
+        items: Sequence[Any],
+        author_id: int,
+        start_index: int = 0
+    ) -> List[NewsBulkItemResult]:
+        """
+        批量创建新闻（一个事务），返回每一条的结果；校验失败或 slug 冲突的条目跳过，不影响其他条目。
+        slug、分类、标签各用一条查询批量检查，新闻与标签关联分别批量写入
+        """
+        results: List[Optional[NewsBulkItemResult]] = [None] * len(items)
+        accepted: Dict[str, Tuple[int, NewsCreate]] = {}
+        for position, raw in enumerate(items):
+            index = start_index + position
+            try:
+                news_in = NewsCreate.model_validate(raw)
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                results[position] = NewsBulkItemResult(
+                    index=index, status="invalid", detail=f"{location}: {error['msg']}" if location else error["msg"]
+                )
+                continue
+            if news_in.slug in accepted:
+                results[position] = NewsBulkItemResult(
+                    index=index, status="conflict", slug=news_in.slug, detail="批次内slug重复"
+                )
+                continue
+            accepted[news_in.slug] = (position, news_in)
+        
+        integrity_errors = (IntegrityError, db.get_bind().dialect.dbapi.IntegrityError)
+        try:
+            created = NewsService._bulk_insert(db, accepted, author_id, start_index, results)
+        except integrity_errors:
+            # 并发导入了相同的 slug：回滚后重新检查一次
+            db.rollback()
+            created = NewsService._bulk_insert(db, accepted, author_id, start_index, results)
+        
+        if created:
+            if settings.NEWS_DEDUP_MODE != "off":
+                for news in created:
+                    if news.duplicate_of_id is None:
+                        news_deduplicator.add(news.id, news.minhash)
+            news_tasks.news_written(
+                db, [news.id for news in created],
+                category_ids={news.category_id for news in created},
+                tag_ids={tag_id for news in created for tag_id in news.tag_ids},
+                thumbnail_ids=[news.id for news in created if news.cover_image],
+            )
+        return results
+    
+    @staticmethod
+    def _bulk_insert(
+        db: Session,
+        accepted: Dict[str, Tuple[int, NewsCreate]],
+        author_id: int,
+        start_index: int,
+        results: List[Optional[NewsBulkItemResult]]
+    ) -> List[SimpleNamespace]:
+        """检查冲突并写入通过校验的条目，填充 results，返回已创建新闻（用于更新索引）"""
+        if not accepted:
+            return []
+        pending = dict(accepted)
+        existing = set(db.scalars(select(News.slug).where(News.slug.in_(list(pending)))))
+        category_ids = {news_in.category_id for _, news_in in pending.values()}
+        tag_ids = {tag_id for _, news_in in pending.values() for tag_id in news_in.tag_ids or ()}
+        known_categories = set(db.scalars(select(Category.id).where(Category.id.in_(category_ids))))
+        known_tags = set(db.scalars(select(Tag.id).where(Tag.id.in_(tag_ids)))) if tag_ids else set()
+        
+        for slug, (position, news_in) in list(pending.items()):
+            if slug in existing:
+                outcome, detail = "conflict", "新闻slug已存在"
+            elif news_in.category_id not in known_categories:
+                outcome, detail = "invalid", "分类不存在"
+            elif not set(news_in.tag_ids or ()) <= known_tags:
+                outcome, detail = "invalid", "标签不存在"
+            else:
+                continue
+            results[position] = NewsBulkItemResult(
+                index=start_index + position, status=outcome, slug=slug, detail=detail
+            )
+            del pending[slug]
+        
+        duplicates = {}
+        if settings.NEWS_DEDUP_MODE != "off":
+            duplicates = NewsService._find_batch_duplicates(pending, start_index, results)
+        
+        if not pending:
+            db.rollback()
+            return []
+        
+        rows = []
+        for slug, (_, news_in) in pending.items():
+            row = news_in.model_dump(exclude={"tag_ids"})
+            row.update(
+                author_id=author_id, view_count=0, like_count=0, comment_count=0,
+                duplicate_of_id=duplicates[slug][1] if duplicates else None,
+            )
+            rows.append(row)
+        inserted = {row.slug: row for row in NewsService._insert_news_rows(db, rows)}
+        
+        news_tags = [
+            {"news_id": inserted[slug].id, "tag_id": tag_id}
+            for slug, (_, news_in) in pending.items()
+            for tag_id in dict.fromkeys(news_in.tag_ids or ())
+        ]
+        if news_tags:
+            db.execute(insert(NewsTag.__table__), news_tags)
+        if duplicates:
+            # 批次内的近似重复指向同批写入的原稿，插入后才有ID
+            for row in rows:
+                original_slug = duplicates[row["slug"]][2]
+                if original_slug is not None:
+                    row["duplicate_of_id"] = inserted[original_slug].id
+            within_batch = [
+                {"news_id": inserted[row["slug"]].id, "original_id": row["duplicate_of_id"]}
+                for row in rows if duplicates[row["slug"]][2] is not None
+            ]
+            if within_batch:
+                db.execute(SET_DUPLICATE_OF, within_batch)
+            db.execute(insert(NewsSignature.__table__), [
+                {"news_id": inserted[slug].id, "minhash": b"" if value is None else encode(value)}
+                for slug, (value, _, _) in duplicates.items()
+            ])
+        db.commit()
+        
+        created = []
+        for row, (slug, (position, news_in)) in zip(rows, pending.items()):
+            news_row = inserted[slug]
+            results[position] = NewsBulkItemResult(
+                index=start_index + position, status="created", id=news_row.id, slug=slug
+            )
+            created.append(SimpleNamespace(
+                **row, id=news_row.id, created_at=news_row.created_at, updated_at=news_row.updated_at,
+                tag_ids=list(dict.fromkeys(news_in.tag_ids or ())),
+                minhash=duplicates[slug][0] if duplicates else None,
+            ))
+        return created
+    
+    @staticmethod
+    def _find_duplicate(title: str, content: str) -> Tuple[Optional[Any], Optional[int]]:
+        """计算签名并查找近似重复的原稿，返回 (签名, 原稿ID)；reject 模式下发现重复时拒绝"""
+        minhash = signature(title, content)
+        match = news_deduplicator.check(minhash)
+        if match is not None and settings.NEWS_DEDUP_MODE == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"与新闻 {match[0]} 近似重复"
+            )
+        return minhash, match[0] if match else None
+    
+    @staticmethod
+    def _find_batch_duplicates(
+        pending: Dict[str, Tuple[int, NewsCreate]],
+        start_index: int,
+        results: List[Optional[NewsBulkItemResult]]
+    ) -> Dict[str, Tuple[Optional[Any], Optional[int], Optional[str]]]:
+        """
+        批量导入的近似重复检测：与已有原稿以及批次内先出现的原稿比较。
+        返回 slug -> (签名, 已有原稿ID, 批次内原稿 slug)；reject 模式下重复的条目从 pending 中移除
+        """
+        batch_index = MinHashLSH()
+        batch_slugs: List[str] = []
+        found = {}
+        for slug, (position, news_in) in list(pending.items()):
+            minhash = signature(news_in.title, news_in.content)
+            match = news_deduplicator.check(minhash)
+            original_id = match[0] if match else None
+            original_slug = None
+            if match is None and minhash is not None:
+                local = batch_index.query(minhash, settings.NEWS_DEDUP_THRESHOLD)
+                original_slug = batch_slugs[local[0]] if local else None
+            
+            if settings.NEWS_DEDUP_MODE == "reject" and (original_id or original_slug):
+                results[position] = NewsBulkItemResult(
+                    index=start_index + position, status="duplicate", id=original_id, slug=slug,
+                    detail=f"与新闻 {original_id} 近似重复" if original_id else f"与批次内的 {original_slug} 近似重复"
+                )
+                del pending[slug]
+                continue
+            if original_id is None and original_slug is None and minhash is not None:
+                batch_index.add(len(batch_slugs), minhash)
+                batch_slugs.append(slug)
+            found[slug] = (minhash, original_id, original_slug)
+        return found
+    
+    @staticmethod
+    def _release_duplicates(db: Session, news_id: int) -> Optional[Any]:
+        """删除原稿前，它的近似重复稿件中最早的一篇成为新的原稿，其余改为指向它；返回新原稿 (id, minhash)"""
+        successor = db.execute(
+            select(News.id, NewsSignature.minhash)
+            .outerjoin(NewsSignature, NewsSignature.news_id == News.id)
+            .where(News.duplicate_of_id == news_id)
+            .order_by(News.id)
+            .limit(1)
+        ).first()
+        if successor is None:
+            return None
+        db.execute(update(News).where(News.id == successor.id).values(duplicate_of_id=None))
+        db.execute(update(News).where(News.duplicate_of_id == news_id).values(duplicate_of_id=successor.id))
+        return successor
+    
+    @staticmethod
+    def _insert_news_rows(db: Session, rows: List[Dict[str, Any]]) -> Sequence[Any]:
+        """
+        写入新闻行并返回 (id, slug, created_at, updated_at)。
+        PostgreSQL（psycopg）使用 COPY，其余数据库使用 executemany（INSERT ... RETURNING 多行）
+        """
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg":
+            raw = db.connection().connection.driver_connection
+            with raw.cursor() as cursor:
+                with cursor.copy(f"COPY news ({', '.join(_BULK_NEWS_COLUMNS)}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row([row[column] for column in _BULK_NEWS_COLUMNS])
+            slugs = [row["slug"] for row in rows]
+            return db.execute(select(*_BULK_INSERTED_COLUMNS).where(News.slug.in_(slugs))).all()
+        
+        return db.execute(insert(News.__table__).returning(*_BULK_INSERTED_COLUMNS), rows).all()
+    
     @staticmethod
     def update(
         db: Session, 
@@ -81,6 +383,10 @@ class NewsService:
                 detail="新闻不存在"
             )
         
+        # 修改前所在的分类和标签的列表同样需要失效
+        old_category_id = news.category_id
+        old_tag_ids = [tag.id for tag in news.tags]
+        
         # 更新字段
         update_data = news_in.model_dump(exclude_unset=True)
         tag_ids = update_data.pop("tag_ids", None)
@@ -88,12 +394,28 @@ class NewsService:
         for field, value in update_data.items():
             setattr(news, field, value)
         
-        # 更新标签
+        # 更新标签（与字段修改在同一个事务中）
         if tag_ids is not None:
-            NewsService.update_news_tags(db, news_id, tag_ids)
+            NewsService._replace_tags(db, news_id, tag_ids)
+        
+        # 文字变化后重新计算签名；已有的重复标记保持不变
+        resigned = settings.NEWS_DEDUP_MODE != "off" and bool({"title", "content"} & update_data.keys())
+        if resigned:
+            minhash = signature(news.title, news.content)
+            db.merge(NewsSignature(news_id=news_id, minhash=b"" if minhash is None else encode(minhash)))
         
         db.commit()
         db.refresh(news)
+        
+        if resigned and news.duplicate_of_id is None:
+            news_deduplicator.add(news_id, minhash)
+        news_tasks.news_written(
+            db, [news_id],
+            category_ids=[old_category_id, news.category_id],
+            tag_ids=old_tag_ids + [tag.id for tag in news.tags],
+            thumbnail_ids=[news_id] if "cover_image" in update_data else (),
+        )
+        
         return news
     
     @staticmethod
@@ -106,26 +428,55 @@ class NewsService:
                 detail="新闻不存在"
             )
         
+        category_id = news.category_id
+        cover_image = news.cover_image
+        tag_ids = [tag.id for tag in news.tags]
+        successor = NewsService._release_duplicates(db, news_id) if news.duplicate_of_id is None else None
+        
+        db.execute(delete(NewsSignature).where(NewsSignature.news_id == news_id))
         db.delete(news)
         db.commit()
+        
+        if settings.NEWS_DEDUP_MODE != "off":
+            news_deduplicator.remove(news_id)
+            if successor is not None and successor.minhash:
+                news_deduplicator.add(successor.id, decode(successor.minhash))
+        # 已删除的新闻由任务移出索引、删除缩略图
+        news_tasks.news_written(
+            db, [news_id], category_ids=[category_id], tag_ids=tag_ids,
+            thumbnail_ids=[news_id] if cover_image else (),
+        )
+        
         return True
     
     @staticmethod
     def search_news(db: Session, search_params: NewsSearch) -> NewsList:
         """搜索新闻"""
+        # 进程内索引直接给出候选集，只需按ID加载当前页
+        if (
+            search_params.q
+            and not search_params.cursor
+            and settings.NEWS_SEARCH_MODE == "bm25"
+            and news_search_index.is_loaded
+        ):
+            return NewsService._search_with_index(db, search_params)
+        
+        # 仅按标签等条件过滤时，由位图索引算出当前页的ID
+        if (
+            search_params.tag_ids
+            and not search_params.q
+            and settings.NEWS_TAG_INDEX_ENABLED
+            and news_tag_index.is_loaded
+        ):
+            return NewsService._search_with_tag_index(db, search_params)
+        
         # 构建查询
         stmt = select(News).where(News.is_published == True)
         
         # 关键词搜索
+        rank = None
         if search_params.q:
-            search_term = f"%{search_params.q}%"
-            stmt = stmt.where(
-                or_(
-                    News.title.ilike(search_term),
-                    News.summary.ilike(search_term),
-                    News.content.ilike(search_term)
-                )
-            )
+            stmt, rank = NewsService._apply_keyword_filter(db, stmt, search_params.q)
         
         # 分类过滤
         if search_params.category_id:
@@ -133,8 +484,9 @@ class NewsService:
         
         # 标签过滤
         if search_params.tag_ids:
-            # 这里需要复杂的标签查询逻辑
-            pass
+            stmt = stmt.where(
+                NewsService._tag_filter(search_params.tag_ids, search_params.tag_match == "all")
+            )
         
         # 精选新闻
         if search_params.is_featured is not None:
@@ -144,52 +496,261 @@ class NewsService:
         if search_params.is_breaking is not None:
             stmt = stmt.where(News.is_breaking == search_params.is_breaking)
         
-        # 计算总数
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = db.execute(count_stmt).scalar()
+        # 计算总数：计数表精确值或限量计数/估算值，客户端可选择不返回
+        total, total_type = NewsTotals.resolve(db, stmt, search_params)
+        pages = NewsService._count_pages(total, search_params.size)
+        stmt = stmt.options(*NEWS_LIST_LOAD_OPTIONS)
+        
+        # 游标分页：按 (created_at, id) 定位，深翻页不随位置变慢；关键词仅作过滤
+        if search_params.cursor:
+            stmt = NewsService._apply_cursor(db, stmt, search_params.cursor)
+            stmt = stmt.order_by(News.created_at.desc(), News.id.desc())
+            stmt = stmt.limit(search_params.size + 1)
+            
+            items = db.execute(stmt).scalars().all()
+            next_cursor = None
+            if len(items) > search_params.size:
+                items = items[:search_params.size]
+                next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+            
+            return NewsList(
+                items=items,
+                total=total,
+                total_type=total_type,
+                page=search_params.page,
+                size=search_params.size,
+                pages=pages,
+                next_cursor=next_cursor
+            )
         
-        # 分页
-        stmt = stmt.order_by(News.created_at.desc())
+        # 分页（有关键词时按相关度优先排序）
+        if rank is not None:
+            stmt = stmt.order_by(rank)
+        stmt = stmt.order_by(News.created_at.desc(), News.id.desc())
         stmt = stmt.offset((search_params.page - 1) * search_params.size)
         stmt = stmt.limit(search_params.size)
         
         result = db.execute(stmt)
         items = result.scalars().all()
         
-        # 计算总页数
-        pages = (total + search_params.size - 1) // search_params.size
+        # 附带游标，客户端可从第一页切换到游标分页
+        next_cursor = None
+        if rank is None and len(items) == search_params.size:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
         
         return NewsList(
             items=items,
             total=total,
+            total_type=total_type,
             page=search_params.page,
             size=search_params.size,
-            pages=pages
+            pages=pages,
+            next_cursor=next_cursor
         )
     
     @staticmethod
-    def increment_view_count(db: Session, news_id: int) -> None:
-        """增加浏览次数"""
-        stmt = select(News).where(News.id == news_id)
-        result = db.execute(stmt)
-        news = result.scalar_one_or_none()
+    def _count_pages(total: Optional[int], size: int) -> Optional[int]:
+        """根据总数计算总页数，未计算总数时返回 None"""
+        if total is None:
+            return None
+        return (total + size - 1) // size
+    
+    @staticmethod
+    def _apply_cursor(db: Session, stmt: Select, cursor: str) -> Select:
+        """按游标定位：取排序键严格小于游标的记录"""
+        try:
+            created_at, news_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标"
+            )
+        bound = literal(created_at, News.created_at.type)
+        if db.get_bind().dialect.name == "sqlite" and created_at.microsecond == 0:
+            bound = literal(created_at, _SQLITE_SECOND_TIMESTAMP)
+        return stmt.where(tuple_(News.created_at, News.id) < tuple_(bound, news_id))
+    
+    @staticmethod
+    def _tag_filter(tag_ids: List[int], match_all: bool):
+        """新闻带有任一（match_all 时为全部）指定标签"""
+        tag_ids = list(set(tag_ids))
+        news_ids = select(NewsTag.news_id).where(NewsTag.tag_id.in_(tag_ids))
+        if match_all:
+            news_ids = news_ids.group_by(NewsTag.news_id).having(func.count() == len(tag_ids))
+        return News.id.in_(news_ids)
+    
+    @staticmethod
+    def _search_with_tag_index(db: Session, search_params: NewsSearch) -> NewsList:
+        """使用标签位图索引过滤，只从数据库加载当前页"""
+        before = None
+        offset = (search_params.page - 1) * search_params.size
+        if search_params.cursor:
+            try:
+                before = decode_cursor(search_params.cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="无效的分页游标"
+                )
+            offset = 0
         
-        if news:
-            news.view_count += 1
-            db.commit()
+        # 多取一条用于判断是否还有下一页
+        total, news_ids = news_tag_index.search(
+            search_params.tag_ids,
+            match_all=search_params.tag_match == "all",
+            category_id=search_params.category_id,
+            is_featured=search_params.is_featured,
+            is_breaking=search_params.is_breaking,
+            before=before,
+            offset=offset,
+            limit=search_params.size + 1,
+        )
+        has_more = len(news_ids) > search_params.size
+        news_ids = news_ids[:search_params.size]
+        
+        items = []
+        if news_ids:
+            result = db.execute(select(News).options(*NEWS_LIST_LOAD_OPTIONS).where(News.id.in_(news_ids)))
+            news_by_id = {news.id: news for news in result.scalars()}
+            items = [news_by_id[news_id] for news_id in news_ids if news_id in news_by_id]
+        
+        next_cursor = None
+        if has_more and items:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        if not search_params.with_total:
+            total = None
+        
+        return NewsList(
+            items=items,
+            total=total,
+            total_type=TOTAL_EXACT if total is not None else None,
+            page=search_params.page,
+            size=search_params.size,
+            pages=NewsService._count_pages(total, search_params.size),
+            next_cursor=next_cursor
+        )
+    
+    @staticmethod
+    def _search_with_index(db: Session, search_params: NewsSearch) -> NewsList:
+        """使用进程内BM25索引搜索新闻"""
+        total, news_ids = news_search_index.search(
+            search_params.q,
+            category_id=search_params.category_id,
+            is_featured=search_params.is_featured,
+            is_breaking=search_params.is_breaking,
+            offset=(search_params.page - 1) * search_params.size,
+            limit=search_params.size,
+        )
+        
+        items = []
+        if news_ids:
+            result = db.execute(select(News).options(*NEWS_LIST_LOAD_OPTIONS).where(News.id.in_(news_ids)))
+            news_by_id = {news.id: news for news in result.scalars()}
+            items = [news_by_id[news_id] for news_id in news_ids if news_id in news_by_id]
+        
+        if not search_params.with_total:
+            total = None
+        
+        return NewsList(
+            items=items,
+            total=total,
+            total_type=TOTAL_EXACT if total is not None else None,
+            page=search_params.page,
+            size=search_params.size,
+            pages=NewsService._count_pages(total, search_params.size)
+        )
+    
+    @staticmethod
+    def _apply_keyword_filter(db: Session, stmt: Select, q: str) -> Tuple[Select, Optional[Any]]:
+        """添加关键词过滤条件，返回新语句和相关度排序表达式"""
+        dialect = db.get_bind().dialect.name
+        
+        # bm25 索引未就绪时同样走数据库全文检索
+        fulltext = settings.NEWS_SEARCH_MODE != "like"
+        
+        if fulltext and dialect == "postgresql":
+            # 与触发器中的 news_cjk_bigrams() 相同的切分；单个汉字无法命中二元组，改用模糊匹配
+            tokens = list(dict.fromkeys(tokenize(q)))
+            index_tokens = [token for token in tokens if token.isascii() or len(token) > 1]
+            if index_tokens:
+                ts_query = func.to_tsquery("simple", " & ".join(index_tokens))
+                search_vector = literal_column("news.search_vector")
+                stmt = stmt.where(search_vector.op("@@")(ts_query))
+                for token in tokens:
+                    if token not in index_tokens:
+                        stmt = stmt.where(NewsService._like_any_field(token))
+                return stmt, func.ts_rank_cd(search_vector, ts_query).desc()
+        
+        if fulltext and dialect == "sqlite":
+            # trigram 分词只能匹配不少于3个字符的词，更短的词改用模糊匹配
+            terms = q.split()
+            match_query = NewsService._build_fts5_query([term for term in terms if len(term) >= 3])
+            if match_query:
+                stmt = stmt.join(news_fts, news_fts.c.rowid == News.id)
+                stmt = stmt.where(literal_column("news_fts").op("MATCH")(match_query))
+                for term in terms:
+                    if len(term) < 3:
+                        stmt = stmt.where(NewsService._like_any_field(term))
+                # bm25 值越小越相关，权重依次为标题、摘要、正文
+                return stmt, func.bm25(literal_column("news_fts"), 10.0, 4.0, 1.0)
+        
+        # 兜底：ILIKE 模糊匹配
+        stmt = stmt.where(NewsService._like_any_field(q))
+        return stmt, None
+    
+    @staticmethod
+    def _like_any_field(term: str):
+        """标题、摘要或正文包含该词"""
+        search_term = f"%{term}%"
+        return or_(
+            News.title.ilike(search_term),
+            News.summary.ilike(search_term),
+            News.content.ilike(search_term)
+        )
+    
+    @staticmethod
+    def _build_fts5_query(terms: List[str]) -> str:
+        """将关键词转换为FTS5查询：每个词加引号转义，词之间为AND关系"""
+        return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms if term)
+    
+    @staticmethod
+    def increment_view_count(news_id: int) -> None:
+        """增加浏览次数（写入缓冲，由后台任务批量写入数据库），同时累加热度"""
+        news_view_counter.add(news_id)
+        if settings.TRENDING_ENABLED:
+            news_trending.record(news_id, settings.TRENDING_VIEW_WEIGHT)
     
     @staticmethod
     def add_tags_to_news(db: Session, news_id: int, tag_ids: List[int]) -> None:
         """为新闻添加标签"""
+        old_tag_ids = NewsService._replace_tags(db, news_id, tag_ids)
+        db.commit()
+        
+        news_tasks.news_written(db, [news_id], tag_ids=[*old_tag_ids, *tag_ids])
+    
+    @staticmethod
+    def _replace_tags(db: Session, news_id: int, tag_ids: List[int]) -> List[int]:
+        """替换新闻的标签（不提交），返回原来的标签ID"""
+        tag_ids = list(dict.fromkeys(tag_ids))
+        old_tag_ids = db.scalars(select(NewsTag.tag_id).where(NewsTag.news_id == news_id)).all()
+        
         # 清除现有标签
-        db.execute(select(NewsTag).where(NewsTag.news_id == news_id)).delete()
+        db.execute(delete(NewsTag).where(NewsTag.news_id == news_id))
+        
+        # 标签内嵌在新闻响应中，变更后更新 updated_at 使条件请求的验证器失效
+        db.execute(
+            update(News)
+            .where(News.id == news_id)
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
         
         # 添加新标签
         for tag_id in tag_ids:
             news_tag = NewsTag(news_id=news_id, tag_id=tag_id)
             db.add(news_tag)
         
-        db.commit()
+        return list(old_tag_ids)
     
     @staticmethod
     def update_news_tags(db: Session, news_id: int, tag_ids: List[int]) -> None:
@@ -204,6 +765,11 @@ class NewsService:
         result = db.execute(stmt)
         return result.scalars().all()
     
+    @staticmethod
+    def get_categories_version(db: Session) -> Tuple[int, Optional[datetime]]:
+        """活跃分类的数量和最近更新时间（条件请求使用；更新时间包含已停用的分类）"""
+        return tuple(db.execute(_CATEGORIES_VERSION).one())
+    
     @staticmethod
     def create_category(db: Session, category_in) -> Category:
         """创建分类"""
@@ -221,6 +787,11 @@ class NewsService:
         result = db.execute(stmt)
         return result.scalars().all()
     
+    @staticmethod
+    def get_tags_version(db: Session) -> Tuple[int, Optional[datetime]]:
+        """标签的数量和最近更新时间（条件请求使用）"""
+        return tuple(db.execute(_TAGS_VERSION).one())
+    
     @staticmethod
     def create_tag(db: Session, tag_in) -> Tag:
         """创建标签"""
@@ -228,4 +799,69 @@ class NewsService:
         db.add(db_tag)
         db.commit()
         db.refresh(db_tag)
-        return db_tag 
\ No newline at end of file
+        return db_tag
+
+
+class AsyncNewsService:
+    """新闻服务的异步读方法（ASYNC_READ_PATH），查询语句与 NewsService 相同"""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, news_id: int) -> Optional[News]:
+        """根据ID获取新闻"""
+        return await db.get(News, news_id, options=NEWS_LOAD_OPTIONS)
+    
+    @staticmethod
+    async def get_version(db: AsyncSession, news_id: int) -> Optional[datetime]:
+        """读取新闻的更新时间，新闻不存在时返回 None"""
+        return await db.scalar(select(News.updated_at).where(News.id == news_id))
+    
+    @staticmethod
+    async def get_by_slug(db: AsyncSession, slug: str) -> Optional[News]:
+        """根据slug获取新闻"""
+        stmt = select(News).options(*NEWS_LOAD_OPTIONS).where(News.slug == slug)
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_multi(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        published_only: bool = True,
+        cursor: Optional[str] = None
+    ) -> List[News]:
+        """获取多个新闻（不加载正文）"""
+        stmt = NewsService._multi_stmt(db, skip, limit, published_only, cursor)
+        result = await db.execute(stmt)
+        return result.scalars().all()
+    
+    @staticmethod
+    async def search_news(db: AsyncSession, search_params: NewsSearch) -> NewsList:
+        """
+        搜索新闻
+        总数策略、进程内索引与分页组合了多步查询，通过 run_sync 复用同步实现：
+        查询经 greenlet 走异步驱动，不占用线程池
+        """
+        return await db.run_sync(NewsService.search_news, search_params)
+    
+    @staticmethod
+    async def get_categories(db: AsyncSession) -> List[Category]:
+        """获取所有分类"""
+        result = await db.execute(select(Category).where(Category.is_active == True))
+        return result.scalars().all()
+    
+    @staticmethod
+    async def get_categories_version(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """活跃分类的数量和最近更新时间"""
+        return tuple((await db.execute(_CATEGORIES_VERSION)).one())
+    
+    @staticmethod
+    async def get_tags(db: AsyncSession) -> List[Tag]:
+        """获取所有标签"""
+        result = await db.execute(select(Tag))
+        return result.scalars().all()
+    
+    @staticmethod
+    async def get_tags_version(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """标签的数量和最近更新时间"""
+        return tuple((await db.execute(_TAGS_VERSION)).one())
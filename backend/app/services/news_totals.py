@@ -0,0 +1,86 @@
+"""
+新闻列表总数策略
+无关键词时读取计数表得到精确总数；有关键词时限量计数，超出上限后使用查询计划的估算值
+"""
+import json
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.news import NewsCounter
+from ..schemas.news import NewsSearch
+
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATED = "estimated"
+
+
+class NewsTotals:
+    """新闻列表总数计算"""
+
+    @staticmethod
+    def resolve(db: Session, stmt: Select, search_params: NewsSearch) -> Tuple[Optional[int], Optional[str]]:
+        """返回 (总数, 总数类型)；客户端不需要总数时返回 (None, None)"""
+        if not search_params.with_total:
+            return None, None
+
+        # 计数表只覆盖分类、精选、突发、发布状态的组合
+        if not search_params.q and not search_params.tag_ids:
+            total = NewsTotals.count_from_counters(
+                db,
+                category_id=search_params.category_id,
+                is_featured=search_params.is_featured,
+                is_breaking=search_params.is_breaking,
+            )
+            return total, TOTAL_EXACT
+
+        return NewsTotals.count_bounded(db, stmt)
+
+    @staticmethod
+    def count_from_counters(
+        db: Session,
+        category_id: Optional[int] = None,
+        is_featured: Optional[bool] = None,
+        is_breaking: Optional[bool] = None,
+    ) -> int:
+        """从触发器维护的计数表汇总已发布新闻数量"""
+        stmt = select(func.coalesce(func.sum(NewsCounter.news_count), 0)).where(
+            NewsCounter.is_published == True
+        )
+        if category_id:
+            stmt = stmt.where(NewsCounter.category_id == category_id)
+        if is_featured is not None:
+            stmt = stmt.where(NewsCounter.is_featured == is_featured)
+        if is_breaking is not None:
+            stmt = stmt.where(NewsCounter.is_breaking == is_breaking)
+        return db.execute(stmt).scalar()
+
+    @staticmethod
+    def count_bounded(db: Session, stmt: Select) -> Tuple[int, str]:
+        """最多数到 NEWS_TOTAL_COUNT_LIMIT 条，未超出时为精确值，否则改用估算值"""
+        limit = settings.NEWS_TOTAL_COUNT_LIMIT
+        # 子查询只选常量列，计数时不读取正文等宽列
+        rows = stmt.with_only_columns(literal_column("1"), maintain_column_froms=True)
+        capped = select(func.count()).select_from(rows.limit(limit + 1).subquery())
+        count = db.execute(capped).scalar()
+        if count <= limit:
+            return count, TOTAL_EXACT
+
+        estimate = NewsTotals.planner_estimate(db, stmt)
+        return max(count, estimate or 0), TOTAL_ESTIMATED
+
+    @staticmethod
+    def planner_estimate(db: Session, stmt: Select) -> Optional[int]:
+        """读取 PostgreSQL 查询计划的行数估算，其他数据库返回 None"""
+        dialect = db.get_bind().dialect
+        if dialect.name != "postgresql":
+            return None
+
+        compiled = stmt.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
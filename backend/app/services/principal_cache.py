@@ -0,0 +1,72 @@
+"""
+用户身份缓存
+认证依赖只需要确认用户存在并读取几个权限标志，缓存这些字段可省去每个请求的用户查询。
+缓存在进程内，用户被修改时由 UserService 显式失效；其他进程中的条目最多滞后 TTL
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from ..core.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """认证用户的身份与权限标志"""
+    id: int
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+
+
+class PrincipalCache:
+    """按用户ID缓存 Principal 的 LRU，条目在 USER_PRINCIPAL_CACHE_TTL_SECONDS 秒后过期"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[Principal, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.USER_PRINCIPAL_CACHE_TTL_SECONDS > 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        """返回未过期的条目"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + settings.USER_PRINCIPAL_CACHE_TTL_SECONDS
+        with self._lock:
+            self._entries[principal.id] = (principal, expires_at)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > settings.USER_PRINCIPAL_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """用户信息变更后删除条目"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局缓存实例
+user_principal_cache = PrincipalCache()
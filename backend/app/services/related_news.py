@@ -0,0 +1,356 @@
+"""
+相关新闻索引
+每篇已发布新闻表示为一个稀疏向量：正文词项（汉字二元组，按哈希映射到固定列）的 TF-IDF，
+加上标签和分类的独热列，各部分分别归一化后按配置的权重拼接，两篇新闻的内积即为
+文本余弦相似度、标签重合度与是否同分类的加权和。
+全量构建时按块做稀疏矩阵乘法并批量取前 K 个邻居；新闻写入时只计算该新闻与全部新闻的一次
+矩阵-向量乘积，更新它自己和受影响新闻的邻居列表。查询相关新闻只是一次字典查找
+"""
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.news import News, NewsTag
+from .search_index import FIELD_WEIGHTS, tokenize
+
+# 特征列：词项哈希到前 _TEXT_DIM 列，其后依次为标签列和分类列
+_TEXT_DIM = 1 << 20
+_TAG_DIM = 1 << 16
+_CATEGORY_DIM = 1 << 12
+_DIM = _TEXT_DIM + _TAG_DIM + _CATEGORY_DIM
+
+# 全量构建时每块相似度矩阵的元素数上限（float32，约 32MB）
+_BLOCK_CELLS = 1 << 23
+
+# 增量写入的行先放在尾部，攒够后再与主矩阵合并
+_TAIL_LIMIT = 256
+
+
+@dataclass(frozen=True)
+class RelatedArticle:
+    """相关新闻列表中展示的信息"""
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str]
+    cover_image: Optional[str]
+    category_id: int
+    created_at: datetime
+
+
+def _text_counts(news: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """按字段加权的词频，返回 (列号, 词频)"""
+    counts: Dict[int, int] = {}
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(getattr(news, field)):
+            column = hash(token) % _TEXT_DIM
+            counts[column] = counts.get(column, 0) + weight
+    return (
+        np.fromiter(counts.keys(), dtype=np.int32, count=len(counts)),
+        np.fromiter(counts.values(), dtype=np.float32, count=len(counts)),
+    )
+
+
+def _feature_row(
+    columns: np.ndarray,
+    counts: np.ndarray,
+    tag_ids: Sequence[int],
+    category_id: int,
+    df: np.ndarray,
+    documents: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """一篇新闻的特征（列号, 取值）：各部分单位化后乘以权重的平方根"""
+    parts_columns, parts_values = [], []
+    if len(columns):
+        idf = np.log((1 + documents) / (1 + df[columns])) + 1
+        weights = (1 + np.log(counts)) * idf
+        norm = np.linalg.norm(weights)
+        if norm > 0:
+            parts_columns.append(columns)
+            parts_values.append(weights / norm * math.sqrt(settings.RELATED_NEWS_TEXT_WEIGHT))
+    tag_columns = np.unique(np.fromiter((_TEXT_DIM + tag_id % _TAG_DIM for tag_id in tag_ids), dtype=np.int32))
+    if len(tag_columns):
+        parts_columns.append(tag_columns)
+        parts_values.append(np.full(
+            len(tag_columns), math.sqrt(settings.RELATED_NEWS_TAG_WEIGHT / len(tag_columns)), dtype=np.float32
+        ))
+    parts_columns.append(np.array([_TEXT_DIM + _TAG_DIM + category_id % _CATEGORY_DIM], dtype=np.int32))
+    parts_values.append(np.array([math.sqrt(settings.RELATED_NEWS_CATEGORY_WEIGHT)], dtype=np.float32))
+    return np.concatenate(parts_columns), np.concatenate(parts_values).astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """每行得分最高的 k 列（按得分降序），返回 (列号, 得分)"""
+    if scores.shape[1] > k:
+        columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        columns = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+class RelatedNewsIndex:
+    """
+    相关新闻索引
+
+    每篇已发布新闻占用矩阵中的一行（槽位），更新和删除只会让旧槽位失效；
+    _floor 记录每个槽位邻居列表中第 K 名的得分（不足 K 个时为 0），
+    新写入的新闻只需与之比较即可找出需要把它加入邻居列表的新闻。
+    IDF 在增量更新时使用当时的文档频率，定期全量重建时统一重新计算。
+    """
+
+    def __init__(self, compact_ratio: float = 0.25):
+        self.compact_ratio = compact_ratio
+        self.is_loaded = False
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._matrix = sparse.csr_matrix((0, _DIM), dtype=np.float32)
+        self._tail = sparse.csr_matrix((0, _DIM), dtype=np.float32)
+        self._slot_news_ids: List[int] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._floor = np.zeros(0, dtype=np.float32)
+        self._news_slots: Dict[int, int] = {}
+        self._df = np.zeros(_TEXT_DIM, dtype=np.int32)
+        self._articles: Dict[int, RelatedArticle] = {}
+        self._neighbours: Dict[int, List[Tuple[int, float]]] = {}
+        self._referrers: Dict[int, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._news_slots)
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock:
+            self._reset()
+            self.is_loaded = False
+
+    def get(self, news_id: int) -> List[Tuple[RelatedArticle, float]]:
+        """相关新闻及得分（按得分降序），不在索引中的新闻返回空列表"""
+        with self._lock:
+            return [
+                (self._articles[neighbour_id], score)
+                for neighbour_id, score in self._neighbours.get(news_id, ())
+            ]
+
+    # 全量构建
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> None:
+        """从数据库全量构建索引，构建完成后整体替换"""
+        tags: Dict[int, List[int]] = {}
+        for news_id, tag_id in db.execute(
+            select(NewsTag.news_id, NewsTag.tag_id).execution_options(yield_per=batch_size)
+        ):
+            tags.setdefault(news_id, []).append(tag_id)
+
+        stmt = (
+            select(
+                News.id, News.title, News.slug, News.summary, News.content,
+                News.cover_image, News.category_id, News.created_at,
+            )
+            .where(News.is_published == True)
+            .order_by(News.id)
+            .execution_options(yield_per=batch_size)
+        )
+        fresh = RelatedNewsIndex(self.compact_ratio)
+        texts, categories = [], []
+        for row in db.execute(stmt):
+            fresh._add_article(row)
+            texts.append(_text_counts(row))
+            categories.append(row.category_id)
+        fresh._build(texts, [tags.get(news_id, ()) for news_id in fresh._slot_news_ids], categories)
+
+        with self._lock:
+            self._matrix, self._tail = fresh._matrix, fresh._tail
+            self._slot_news_ids, self._live, self._floor = fresh._slot_news_ids, fresh._live, fresh._floor
+            self._news_slots, self._df, self._articles = fresh._news_slots, fresh._df, fresh._articles
+            self._neighbours, self._referrers = fresh._neighbours, fresh._referrers
+            self.is_loaded = True
+
+    def _build(
+        self,
+        texts: List[Tuple[np.ndarray, np.ndarray]],
+        tags: List[Sequence[int]],
+        categories: List[int],
+    ) -> None:
+        documents = len(texts)
+        for columns, _ in texts:
+            self._df[columns] += 1
+
+        indptr, indices, data = [0], [], []
+        for (columns, counts), tag_ids, category_id in zip(texts, tags, categories):
+            row_columns, row_values = _feature_row(columns, counts, tag_ids, category_id, self._df, documents)
+            indices.append(row_columns)
+            data.append(row_values)
+            indptr.append(indptr[-1] + len(row_columns))
+        if documents:
+            self._matrix = sparse.csr_matrix(
+                (np.concatenate(data), np.concatenate(indices), np.array(indptr)), shape=(documents, _DIM)
+            )
+        self._live = np.ones(documents, dtype=bool)
+        self._floor = np.zeros(documents, dtype=np.float32)
+
+        k = settings.RELATED_NEWS_TOP_K
+        if documents < 2 or k <= 0:
+            return
+        transposed = self._matrix.T.tocsr()
+        block = max(1, _BLOCK_CELLS // documents)
+        for start in range(0, documents, block):
+            stop = min(start + block, documents)
+            scores = (self._matrix[start:stop] @ transposed).toarray()
+            scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            columns, values = _top_k(scores, min(k, documents - 1))
+            for offset in range(stop - start):
+                self._set_neighbours(start + offset, columns[offset], values[offset])
+
+    # 增量更新
+
+    def update_news(self, news: Any, tag_ids: Iterable[int]) -> None:
+        """新闻写入后更新其向量和邻居列表，未发布的新闻会被移出索引"""
+        with self._lock:
+            affected = self._remove(news.id)
+            if news.is_published:
+                slot = self._add_article(news)
+                columns, counts = _text_counts(news)
+                self._df[columns] += 1
+                row_columns, row_values = _feature_row(
+                    columns, counts, list(tag_ids), news.category_id, self._df, len(self._news_slots)
+                )
+                row = sparse.csr_matrix((row_values, row_columns, [0, len(row_columns)]), shape=(1, _DIM))
+                self._tail = sparse.vstack([self._tail, row], format="csr")
+                self._live = np.append(self._live, True)
+                self._floor = np.append(self._floor, np.float32(0))
+
+                scores = self._scores(slot)
+                self._refresh_slot(slot, scores)
+                # 与新文章的得分超过自身第 K 名的新闻，把它加入邻居列表
+                for other in np.flatnonzero(scores > self._floor):
+                    self._offer(int(other), news.id, float(scores[other]))
+            for news_id in affected:
+                slot = self._news_slots.get(news_id)
+                if slot is not None:
+                    self._refresh_slot(slot, self._scores(slot))
+            self._maybe_compact()
+
+    def remove(self, news_id: int) -> None:
+        """将新闻移出索引，原先把它列为邻居的新闻重新计算邻居"""
+        self.update_news(_Removed(news_id), ())
+
+    def _add_article(self, news: Any) -> int:
+        slot = len(self._slot_news_ids)
+        self._slot_news_ids.append(news.id)
+        self._news_slots[news.id] = slot
+        self._articles[news.id] = RelatedArticle(
+            id=news.id, title=news.title, slug=news.slug, summary=news.summary,
+            cover_image=news.cover_image, category_id=news.category_id, created_at=news.created_at,
+        )
+        return slot
+
+    def _remove(self, news_id: int) -> Set[int]:
+        """使槽位失效，返回原先把它列为邻居的新闻"""
+        slot = self._news_slots.pop(news_id, None)
+        if slot is None:
+            return set()
+        row = self._row(slot)
+        self._df[row.indices[row.indices < _TEXT_DIM]] -= 1
+        self._live[slot] = False
+        self._floor[slot] = np.inf
+        del self._articles[news_id]
+        for neighbour_id, _ in self._neighbours.pop(news_id, ()):
+            self._referrers.get(neighbour_id, set()).discard(news_id)
+        affected = self._referrers.pop(news_id, set())
+        for referrer_id in affected:
+            self._neighbours[referrer_id] = [
+                item for item in self._neighbours.get(referrer_id, ()) if item[0] != news_id
+            ]
+        return affected
+
+    def _row(self, slot: int) -> sparse.csr_matrix:
+        rows = self._matrix.shape[0]
+        return self._matrix[slot] if slot < rows else self._tail[slot - rows]
+
+    def _scores(self, slot: int) -> np.ndarray:
+        """槽位与全部槽位的得分，失效槽位和自身为 -inf"""
+        row = self._row(slot).T
+        scores = np.concatenate([
+            (self._matrix @ row).toarray().ravel(),
+            (self._tail @ row).toarray().ravel(),
+        ])
+        scores[~self._live] = -np.inf
+        scores[slot] = -np.inf
+        return scores
+
+    def _refresh_slot(self, slot: int, scores: np.ndarray) -> None:
+        k = min(settings.RELATED_NEWS_TOP_K, len(scores))
+        if k <= 0:
+            return
+        columns, values = _top_k(scores[np.newaxis, :], k)
+        self._set_neighbours(slot, columns[0], values[0])
+
+    def _set_neighbours(self, slot: int, columns: np.ndarray, values: np.ndarray) -> None:
+        news_id = self._slot_news_ids[slot]
+        for neighbour_id, _ in self._neighbours.get(news_id, ()):
+            self._referrers.get(neighbour_id, set()).discard(news_id)
+        neighbours = [
+            (self._slot_news_ids[column], float(value))
+            for column, value in zip(columns, values)
+            if value > 0
+        ]
+        self._neighbours[news_id] = neighbours
+        for neighbour_id, _ in neighbours:
+            self._referrers.setdefault(neighbour_id, set()).add(news_id)
+        self._update_floor(slot)
+
+    def _offer(self, slot: int, candidate_id: int, score: float) -> None:
+        """候选新闻加入槽位的邻居列表，超出 K 个时淘汰得分最低的"""
+        news_id = self._slot_news_ids[slot]
+        neighbours = sorted(
+            [*self._neighbours.get(news_id, ()), (candidate_id, score)], key=lambda item: -item[1]
+        )
+        for evicted_id, _ in neighbours[settings.RELATED_NEWS_TOP_K:]:
+            self._referrers.get(evicted_id, set()).discard(news_id)
+        self._neighbours[news_id] = neighbours[:settings.RELATED_NEWS_TOP_K]
+        self._referrers.setdefault(candidate_id, set()).add(news_id)
+        self._update_floor(slot)
+
+    def _update_floor(self, slot: int) -> None:
+        neighbours = self._neighbours[self._slot_news_ids[slot]]
+        full = len(neighbours) >= settings.RELATED_NEWS_TOP_K
+        self._floor[slot] = neighbours[-1][1] if full and neighbours else 0
+
+    def _maybe_compact(self) -> None:
+        """尾部行合并进主矩阵；失效槽位过多时清理并重新编号"""
+        dead = len(self._slot_news_ids) - len(self._news_slots)
+        compact = dead > 1000 and dead > len(self._slot_news_ids) * self.compact_ratio
+        if self._tail.shape[0] >= _TAIL_LIMIT or (compact and self._tail.shape[0]):
+            self._matrix = sparse.vstack([self._matrix, self._tail], format="csr")
+            self._tail = sparse.csr_matrix((0, _DIM), dtype=np.float32)
+        if not compact:
+            return
+        live = np.flatnonzero(self._live)
+        self._matrix = self._matrix[live]
+        self._floor = self._floor[live]
+        self._live = np.ones(len(live), dtype=bool)
+        self._slot_news_ids = [self._slot_news_ids[slot] for slot in live]
+        self._news_slots = {news_id: slot for slot, news_id in enumerate(self._slot_news_ids)}
+
+
+@dataclass(frozen=True)
+class _Removed:
+    """移出索引时传给 update_news 的占位对象"""
+    id: int
+    is_published: bool = False
+
+
+# 全局索引实例
+related_news_index = RelatedNewsIndex()
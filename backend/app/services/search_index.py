@@ -0,0 +1,368 @@
+"""
+新闻内存检索索引
+基于倒排索引和BM25评分，支持中文二元分词、增量更新和磁盘快照
+"""
+import heapq
+import math
+import os
+import pickle
+import re
+import tempfile
+import threading
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.news import News
+
+logger = structlog.get_logger()
+
+# 连续的中日韩汉字，或连续的小写字母/数字
+_TOKEN_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+")
+
+# 字段权重：标题 > 摘要 > 正文
+FIELD_WEIGHTS = (("title", 3), ("summary", 2), ("content", 1))
+
+_FLAG_FEATURED = 1
+_FLAG_BREAKING = 2
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """分词：汉字按二元组切分（单字保留），字母和数字按词切分"""
+    if not text:
+        return []
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        word = match.group()
+        if word.isascii() or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _index_tokens(text: Optional[str]) -> List[str]:
+    """建索引用的分词：在 tokenize 的基础上额外收录单个汉字，使单字查询可以命中"""
+    tokens = tokenize(text)
+    if text:
+        for match in _TOKEN_PATTERN.finditer(text.lower()):
+            word = match.group()
+            if not word.isascii() and len(word) > 1:
+                tokens.extend(word)
+    return tokens
+
+
+class NewsSearchIndex:
+    """
+    新闻倒排索引
+
+    每篇已发布新闻占用一个槽位（slot），倒排表以 array 紧凑存储槽位号和加权词频。
+    更新和删除只会让旧槽位失效，失效槽位过多时自动压缩。
+    """
+
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self.is_loaded = False
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._slot_news_ids = array("q")
+        self._slot_lengths = array("I")
+        self._slot_category_ids = array("q")
+        self._slot_flags = bytearray()
+        self._news_slots: Dict[int, int] = {}
+        self._total_length = 0
+        self._watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._news_slots)
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """已索引新闻中最新的 updated_at"""
+        return self._watermark
+
+    def add(self, news: Any) -> None:
+        """索引（或重新索引）一篇新闻，未发布的新闻会被移出索引"""
+        with self._lock:
+            self._remove(news.id)
+            updated_at = getattr(news, "updated_at", None)
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+            if not news.is_published:
+                return
+
+            counts: Dict[str, int] = {}
+            for field, weight in FIELD_WEIGHTS:
+                for token in _index_tokens(getattr(news, field)):
+                    counts[token] = counts.get(token, 0) + weight
+
+            slot = len(self._slot_news_ids)
+            length = sum(counts.values())
+            self._slot_news_ids.append(news.id)
+            self._slot_lengths.append(length)
+            self._slot_category_ids.append(news.category_id)
+            self._slot_flags.append(
+                (_FLAG_FEATURED if news.is_featured else 0)
+                | (_FLAG_BREAKING if news.is_breaking else 0)
+            )
+            for token, tf in counts.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = (array("I"), array("I"))
+                postings[0].append(slot)
+                postings[1].append(tf)
+
+            self._news_slots[news.id] = slot
+            self._total_length += length
+
+    def remove(self, news_id: int) -> None:
+        """将新闻移出索引"""
+        with self._lock:
+            self._remove(news_id)
+
+    def _remove(self, news_id: int) -> None:
+        slot = self._news_slots.pop(news_id, None)
+        if slot is None:
+            return
+        self._total_length -= self._slot_lengths[slot]
+        dead_slots = len(self._slot_news_ids) - len(self._news_slots)
+        if dead_slots > 1000 and dead_slots > len(self._slot_news_ids) * self.compact_ratio:
+            self._compact()
+
+    def _is_live(self, slot: int) -> bool:
+        return self._news_slots.get(self._slot_news_ids[slot]) == slot
+
+    def _compact(self) -> None:
+        """清理失效槽位并重新编号"""
+        remap: Dict[int, int] = {}
+        news_ids, lengths, category_ids, flags = array("q"), array("I"), array("q"), bytearray()
+        for slot in range(len(self._slot_news_ids)):
+            if self._is_live(slot):
+                remap[slot] = len(news_ids)
+                news_ids.append(self._slot_news_ids[slot])
+                lengths.append(self._slot_lengths[slot])
+                category_ids.append(self._slot_category_ids[slot])
+                flags.append(self._slot_flags[slot])
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        for token, (slots, tfs) in self._postings.items():
+            new_slots, new_tfs = array("I"), array("I")
+            for slot, tf in zip(slots, tfs):
+                new_slot = remap.get(slot)
+                if new_slot is not None:
+                    new_slots.append(new_slot)
+                    new_tfs.append(tf)
+            if new_slots:
+                postings[token] = (new_slots, new_tfs)
+
+        self._postings = postings
+        self._slot_news_ids, self._slot_lengths = news_ids, lengths
+        self._slot_category_ids, self._slot_flags = category_ids, flags
+        self._news_slots = {news_id: slot for slot, news_id in enumerate(news_ids)}
+
+    def search(
+        self,
+        q: str,
+        category_id: Optional[int] = None,
+        is_featured: Optional[bool] = None,
+        is_breaking: Optional[bool] = None,
+        offset: int = 0,
+        limit: int = 10,
+    ) -> Tuple[int, List[int]]:
+        """检索并按BM25得分排序，返回(命中总数, 当前页新闻ID列表)；所有词都需命中"""
+        terms = set(tokenize(q))
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if any(p is None for p in postings):
+                return 0, []
+            # 从最短的倒排表开始求交集
+            postings.sort(key=lambda p: len(p[0]))
+
+            n_docs = len(self._news_slots)
+            has_dead_slots = len(self._slot_news_ids) > n_docs
+            avg_length = self._total_length / n_docs if n_docs else 1.0
+            k1, b = self.k1, self.b
+            lengths = self._slot_lengths
+
+            scores: Optional[Dict[int, float]] = None
+            for slots, tfs in postings:
+                # 文档频率只统计有效槽位，避免失效槽位压低 idf
+                if has_dead_slots:
+                    df = sum(1 for slot in slots if self._is_live(slot))
+                else:
+                    df = len(slots)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                term_scores: Dict[int, float] = {}
+                for slot, tf in zip(slots, tfs):
+                    if scores is None:
+                        if not self._is_live(slot) or not self._matches(
+                            slot, category_id, is_featured, is_breaking
+                        ):
+                            continue
+                        previous = 0.0
+                    else:
+                        previous = scores.get(slot)
+                        if previous is None:
+                            continue
+                    norm = 1 - b + b * lengths[slot] / avg_length
+                    term_scores[slot] = previous + idf * tf * (k1 + 1) / (tf + k1 * norm)
+                scores = term_scores
+                if not scores:
+                    return 0, []
+
+            news_ids = self._slot_news_ids
+            ranked = heapq.nlargest(
+                offset + limit,
+                scores.items(),
+                key=lambda item: (item[1], news_ids[item[0]]),
+            )
+            return len(scores), [news_ids[slot] for slot, _ in ranked[offset:]]
+
+    def _matches(
+        self,
+        slot: int,
+        category_id: Optional[int],
+        is_featured: Optional[bool],
+        is_breaking: Optional[bool],
+    ) -> bool:
+        if category_id is not None and self._slot_category_ids[slot] != category_id:
+            return False
+        flags = self._slot_flags[slot]
+        if is_featured is not None and bool(flags & _FLAG_FEATURED) != is_featured:
+            return False
+        if is_breaking is not None and bool(flags & _FLAG_BREAKING) != is_breaking:
+            return False
+        return True
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> None:
+        """从数据库全量重建索引"""
+        with self._lock:
+            self._reset()
+            self.catch_up(db, batch_size=batch_size)
+            self.is_loaded = True
+
+    def catch_up(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        补充索引水位线之后更新过的新闻，并与数据库中已发布新闻的ID集合对账：
+        已删除的移出索引，漏掉的（例如其他进程写入）补入索引。返回处理的条数
+        """
+        columns = (
+            News.id, News.title, News.summary, News.content, News.category_id,
+            News.is_published, News.is_featured, News.is_breaking, News.updated_at,
+        )
+        stmt = select(*columns).execution_options(yield_per=batch_size)
+        full_scan = self._watermark is None
+        if not full_scan:
+            # 使用 >= 以免漏掉与水位线同一时刻的更新，重复索引是幂等的
+            stmt = stmt.where(News.updated_at >= self._watermark)
+
+        count = 0
+        with self._lock:
+            for row in db.execute(stmt):
+                self.add(row)
+                count += 1
+            if full_scan:
+                return count
+
+            live_ids = set(db.scalars(select(News.id).where(News.is_published == True)))
+            for news_id in [news_id for news_id in self._news_slots if news_id not in live_ids]:
+                self._remove(news_id)
+                count += 1
+
+            missing_ids = list(live_ids.difference(self._news_slots))
+            for start in range(0, len(missing_ids), batch_size):
+                batch = missing_ids[start:start + batch_size]
+                for row in db.execute(select(*columns).where(News.id.in_(batch))):
+                    self.add(row)
+                    count += 1
+        return count
+
+    def save(self, path: str) -> None:
+        """保存快照（先写临时文件再原子替换）"""
+        with self._lock:
+            self._compact()
+            state = {
+                "version": self.SNAPSHOT_VERSION,
+                "postings": self._postings,
+                "slot_news_ids": self._slot_news_ids,
+                "slot_lengths": self._slot_lengths,
+                "slot_category_ids": self._slot_category_ids,
+                "slot_flags": bytes(self._slot_flags),
+                "total_length": self._total_length,
+                "watermark": self._watermark,
+            }
+            target = Path(path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # 每次使用唯一的临时文件，多个 worker 同时保存时互不覆盖
+            with tempfile.NamedTemporaryFile(
+                dir=target.parent, prefix=target.name + ".", suffix=".tmp", delete=False
+            ) as f:
+                try:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                except BaseException:
+                    f.close()
+                    os.unlink(f.name)
+                    raise
+            os.replace(f.name, target)
+
+    def load(self, path: str) -> bool:
+        """加载快照（快照文件仅由本服务写入），版本不匹配时返回 False"""
+        target = Path(path)
+        if not target.exists():
+            return False
+        with open(target, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != self.SNAPSHOT_VERSION:
+            return False
+
+        with self._lock:
+            self._postings = state["postings"]
+            self._slot_news_ids = state["slot_news_ids"]
+            self._slot_lengths = state["slot_lengths"]
+            self._slot_category_ids = state["slot_category_ids"]
+            self._slot_flags = bytearray(state["slot_flags"])
+            self._total_length = state["total_length"]
+            self._watermark = state["watermark"]
+            self._news_slots = {news_id: slot for slot, news_id in enumerate(self._slot_news_ids)}
+            self.is_loaded = True
+        return True
+
+
+# 全局索引实例
+news_search_index = NewsSearchIndex()
+
+
+def init_search_index(db: Session, snapshot_path: str) -> None:
+    """启动时加载快照并补齐增量；没有可用快照或快照损坏时从数据库重建"""
+    try:
+        loaded = news_search_index.load(snapshot_path)
+    except Exception as e:
+        logger.warning("Failed to load search index snapshot, rebuilding", error=str(e))
+        loaded = False
+    if loaded:
+        news_search_index.catch_up(db)
+    else:
+        news_search_index.rebuild(db)
+    news_search_index.save(snapshot_path)
+
+
+def refresh_search_index(db: Session) -> int:
+    """定时对账：补齐其他进程的写入并清理已删除的新闻"""
+    if not news_search_index.is_loaded:
+        return 0
+    return news_search_index.catch_up(db)
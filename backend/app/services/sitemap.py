@@ -0,0 +1,214 @@
+"""
+站点地图
+已发布新闻按 id 区间分片（每片 SITEMAP_SHARD_SIZE 个 id，不超过协议上限 5 万个 URL），
+分片由 id 区间内的键集扫描逐批生成、边生成边 gzip 压缩，完成后按分片缓存；
+新闻写入时只递增所在分片的代数，其余分片的缓存不受影响
+"""
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+import redis
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core.cache import create_cache_client
+from ..core.conditional import as_utc, make_etag
+from ..core.config import settings
+from ..models.news import News
+from .news_feed import news_url
+
+logger = structlog.get_logger()
+
+# 键集扫描每次读取的行数
+SCAN_BATCH_SIZE = 1000
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def _generation_key(shard: int) -> str:
+    return f"sitemap:gen:{shard}"
+
+
+def _shard_key(shard: int) -> str:
+    return f"sitemap:shard:{shard}"
+
+
+def shard_of(news_id: int) -> int:
+    """新闻所在的分片"""
+    return news_id // settings.SITEMAP_SHARD_SIZE
+
+
+@dataclass(frozen=True)
+class SitemapShard:
+    """缓存的分片（gzip 压缩后的 XML）"""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+
+class SitemapService:
+    """站点地图生成"""
+
+    @staticmethod
+    def shard_count(db: Session) -> int:
+        """分片数量：按最大新闻 id 计算（主键索引查询）"""
+        max_id = db.scalar(select(func.max(News.id)))
+        return 0 if max_id is None else shard_of(max_id) + 1
+
+    @staticmethod
+    def render_index(shard_urls: Iterable[str], last_modified: List[Optional[datetime]]) -> bytes:
+        """站点地图索引，已缓存的分片带最后修改时间"""
+        parts = [_XML_HEADER, f'<sitemapindex xmlns="{_SITEMAP_NAMESPACE}">']
+        for url, modified in zip(shard_urls, last_modified):
+            parts.append(f"<sitemap><loc>{escape(url)}</loc>")
+            if modified is not None:
+                parts.append(f"<lastmod>{as_utc(modified).isoformat()}</lastmod>")
+            parts.append("</sitemap>")
+        parts.append("</sitemapindex>\n")
+        return "".join(parts).encode()
+
+    @staticmethod
+    def iter_shard(db: Session, shard: int, summary: dict) -> Iterator[bytes]:
+        """
+        逐批生成分片的 gzip 数据块；按 id 键集扫描分片区间内的已发布新闻，每次一批，
+        结束后 summary 中写入 lastmod（区间内最新的更新时间）
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        yield compressor.compress(f'{_XML_HEADER}<urlset xmlns="{_SITEMAP_NAMESPACE}">\n'.encode())
+
+        last_id = shard * settings.SITEMAP_SHARD_SIZE - 1
+        end_id = (shard + 1) * settings.SITEMAP_SHARD_SIZE
+        last_modified = None
+        while True:
+            rows = db.execute(
+                select(News.id, News.slug, News.updated_at)
+                .where(News.id > last_id, News.id < end_id, News.is_published == True)
+                .order_by(News.id)
+                .limit(SCAN_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            # 每批之间结束事务，扫描期间不长时间占用连接
+            db.rollback()
+            chunk = "".join(
+                f"<url><loc>{escape(news_url(row.slug))}</loc>"
+                f"<lastmod>{as_utc(row.updated_at).isoformat()}</lastmod></url>\n"
+                for row in rows
+            )
+            newest = max(row.updated_at for row in rows)
+            last_modified = newest if last_modified is None else max(last_modified, newest)
+            data = compressor.compress(chunk.encode())
+            if data:
+                yield data
+
+        summary["last_modified"] = last_modified
+        yield compressor.compress(b"</urlset>\n") + compressor.flush()
+
+
+class SitemapCache:
+    """
+    站点地图分片缓存
+
+    值为一行 JSON 头（生成时分片的代数、验证器）加 gzip 数据；
+    读取时与分片代数的当前值比较，已递增则视为未命中。缓存不可用时每次重新生成。
+    """
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_cache_client()
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SITEMAP_CACHE_TTL_SECONDS > 0
+
+    @staticmethod
+    def _parse(value: Optional[bytes], generation: Optional[bytes]) -> Optional[SitemapShard]:
+        if value is None:
+            return None
+        header, body = value.split(b"\n", 1)
+        meta = json.loads(header)
+        if meta["generation"] != int(generation or 0):
+            return None
+        last_modified = meta["last_modified"]
+        return SitemapShard(
+            body=body,
+            etag=meta["etag"],
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+        )
+
+    def get(self, shard: int) -> Optional[SitemapShard]:
+        """返回仍然有效的分片，未命中时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            value, generation = self.client.mget([_shard_key(shard), _generation_key(shard)])
+        except redis.RedisError as e:
+            logger.warning(f"Sitemap cache unavailable: {e}")
+            return None
+        return self._parse(value, generation)
+
+    def get_many(self, count: int) -> List[Optional[SitemapShard]]:
+        """前 count 个分片的缓存（生成索引用）"""
+        if not self.enabled or count == 0:
+            return [None] * count
+        keys = [key for shard in range(count) for key in (_shard_key(shard), _generation_key(shard))]
+        try:
+            values = self.client.mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"Sitemap cache unavailable: {e}")
+            return [None] * count
+        return [self._parse(values[2 * shard], values[2 * shard + 1]) for shard in range(count)]
+
+    def generation(self, shard: int) -> Optional[int]:
+        """扫描之前读取代数，写回时使用，扫描期间发生的写入不会被缓存成新代数"""
+        if not self.enabled:
+            return None
+        try:
+            return int(self.client.get(_generation_key(shard)) or 0)
+        except redis.RedisError as e:
+            logger.warning(f"Sitemap cache unavailable: {e}")
+            return None
+
+    def set(self, shard: int, generation: Optional[int], body: bytes, last_modified: Optional[datetime]) -> None:
+        """缓存生成好的分片"""
+        if generation is None:
+            return
+        header = json.dumps({
+            "generation": generation,
+            "etag": make_etag(body),
+            "last_modified": last_modified.isoformat() if last_modified else None,
+        }).encode()
+        try:
+            self.client.set(_shard_key(shard), header + b"\n" + body, ex=settings.SITEMAP_CACHE_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Sitemap cache unavailable: {e}")
+
+    def invalidate(self, news_ids: Iterable[int]) -> None:
+        """新闻写入后使所在分片失效（需在提交之后调用）"""
+        if not self.enabled:
+            return
+        try:
+            for shard in {shard_of(news_id) for news_id in news_ids}:
+                self.client.incr(_generation_key(shard))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to invalidate sitemap cache: {e}")
+
+
+# 全局缓存实例
+sitemap_cache = SitemapCache()
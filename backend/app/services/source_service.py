@@ -0,0 +1,89 @@
+"""
+新闻来源服务层
+来源的增删改查；抓取见 crawler
+"""
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.news import Category
+from ..models.source import Source
+from ..schemas.source import SourceCreate, SourceUpdate
+
+
+class SourceService:
+    """新闻来源服务类"""
+
+    @staticmethod
+    def get_multi(db: Session) -> List[Source]:
+        """获取所有来源"""
+        stmt = select(Source).order_by(Source.id)
+        return db.execute(stmt).scalars().all()
+
+    @staticmethod
+    def get_by_id(db: Session, source_id: int) -> Optional[Source]:
+        """根据ID获取来源"""
+        return db.get(Source, source_id)
+
+    @staticmethod
+    def _check(db: Session, url: Optional[str], category_id: Optional[int], source_id: Optional[int] = None) -> None:
+        """URL 不能与其他来源重复，分类必须存在"""
+        if url is not None:
+            existing = db.scalar(select(Source.id).where(Source.url == url))
+            if existing is not None and existing != source_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="该来源地址已存在"
+                )
+        if category_id is not None and db.get(Category, category_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="分类不存在"
+            )
+
+    @staticmethod
+    def create(db: Session, source_in: SourceCreate, author_id: int) -> Source:
+        """创建来源；抓取到的新闻以 author_id 为作者"""
+        SourceService._check(db, source_in.url, source_in.category_id)
+        source = Source(**source_in.model_dump(), author_id=author_id)
+        db.add(source)
+        db.commit()
+        db.refresh(source)
+        return source
+
+    @staticmethod
+    def update(db: Session, source_id: int, source_in: SourceUpdate) -> Source:
+        """更新来源；地址变化时清除验证器和错误计数，下次抓取重新下载"""
+        source = SourceService.get_by_id(db, source_id)
+        if not source:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="来源不存在"
+            )
+
+        update_data = source_in.model_dump(exclude_unset=True)
+        SourceService._check(db, update_data.get("url"), update_data.get("category_id"), source_id)
+        if update_data.get("url", source.url) != source.url:
+            update_data.update(etag=None, last_modified=None, last_error=None, error_count=0)
+
+        for field, value in update_data.items():
+            setattr(source, field, value)
+
+        db.commit()
+        db.refresh(source)
+        return source
+
+    @staticmethod
+    def delete(db: Session, source_id: int) -> bool:
+        """删除来源（已抓取的新闻保留）"""
+        source = SourceService.get_by_id(db, source_id)
+        if not source:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="来源不存在"
+            )
+
+        db.delete(source)
+        db.commit()
+        return True
@@ -0,0 +1,174 @@
+"""
+新闻标签位图索引
+为每个标签、分类以及精选/突发状态维护已发布新闻ID的压缩位图，
+标签过滤通过位图交并运算完成，只有当前页的新闻需要从数据库加载
+"""
+import heapq
+import threading
+from datetime import datetime
+from functools import reduce
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.bitmap import RoaringBitmap
+from ..models.news import News, NewsTag
+
+
+class NewsTagIndex:
+    """
+    新闻标签位图索引
+
+    标签关联对所有新闻都保存（下线后重新发布时无需回库查询），位图只包含已发布新闻。
+    """
+
+    def __init__(self):
+        self.is_loaded = False
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._featured = RoaringBitmap()
+        self._breaking = RoaringBitmap()
+        self._categories: Dict[int, RoaringBitmap] = {}
+        self._tags: Dict[int, RoaringBitmap] = {}
+        self._news_tags: Dict[int, Tuple[int, ...]] = {}
+        self._news_info: Dict[int, Tuple[datetime, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._news_info)
+
+    def update_news(self, news: Any) -> None:
+        """按新闻的发布状态、分类和精选/突发标记更新位图"""
+        with self._lock:
+            self._unindex(news.id)
+            if not news.is_published:
+                return
+            if news.is_featured:
+                self._featured.add(news.id)
+            if news.is_breaking:
+                self._breaking.add(news.id)
+            self._bitmap(self._categories, news.category_id).add(news.id)
+            for tag_id in self._news_tags.get(news.id, ()):
+                self._bitmap(self._tags, tag_id).add(news.id)
+            self._news_info[news.id] = (news.created_at, news.category_id)
+
+    def set_tags(self, news_id: int, tag_ids: Iterable[int]) -> None:
+        """替换新闻的标签"""
+        tag_ids = tuple(sorted(set(tag_ids)))
+        with self._lock:
+            published = news_id in self._news_info
+            for tag_id in self._news_tags.get(news_id, ()):
+                if published and tag_id not in tag_ids:
+                    self._discard(self._tags, tag_id, news_id)
+            if tag_ids:
+                self._news_tags[news_id] = tag_ids
+            else:
+                self._news_tags.pop(news_id, None)
+            if published:
+                for tag_id in tag_ids:
+                    self._bitmap(self._tags, tag_id).add(news_id)
+
+    def remove(self, news_id: int) -> None:
+        """将新闻移出索引"""
+        with self._lock:
+            self._unindex(news_id)
+            self._news_tags.pop(news_id, None)
+
+    def _unindex(self, news_id: int) -> None:
+        info = self._news_info.pop(news_id, None)
+        if info is None:
+            return
+        self._featured.discard(news_id)
+        self._breaking.discard(news_id)
+        self._discard(self._categories, info[1], news_id)
+        for tag_id in self._news_tags.get(news_id, ()):
+            self._discard(self._tags, tag_id, news_id)
+
+    @staticmethod
+    def _bitmap(bitmaps: Dict[int, RoaringBitmap], key: int) -> RoaringBitmap:
+        bitmap = bitmaps.get(key)
+        if bitmap is None:
+            bitmap = bitmaps[key] = RoaringBitmap()
+        return bitmap
+
+    @staticmethod
+    def _discard(bitmaps: Dict[int, RoaringBitmap], key: int, news_id: int) -> None:
+        bitmap = bitmaps.get(key)
+        if bitmap is not None:
+            bitmap.discard(news_id)
+            if not bitmap:
+                del bitmaps[key]
+
+    def search(
+        self,
+        tag_ids: List[int],
+        match_all: bool = False,
+        category_id: Optional[int] = None,
+        is_featured: Optional[bool] = None,
+        is_breaking: Optional[bool] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        offset: int = 0,
+        limit: int = 10,
+    ) -> Tuple[int, List[int]]:
+        """
+        按标签（match_all 为 True 时需全部命中，否则命中任一）及其他条件过滤，
+        按 (created_at, id) 倒序返回(命中总数, 当前页新闻ID列表)；
+        before 为游标位置，只返回排在其后的新闻，不影响总数
+        """
+        empty = RoaringBitmap()
+        with self._lock:
+            bitmaps = [self._tags.get(tag_id, empty) for tag_id in set(tag_ids)]
+            if not bitmaps:
+                return 0, []
+            # 求交集时从最小的位图开始
+            bitmaps.sort(key=len)
+            result = reduce(lambda a, b: a & b if match_all else a | b, bitmaps)
+
+            if category_id:
+                result &= self._categories.get(category_id, empty)
+            if is_featured is not None:
+                result = result & self._featured if is_featured else result - self._featured
+            if is_breaking is not None:
+                result = result & self._breaking if is_breaking else result - self._breaking
+
+            info = self._news_info
+            candidates: Iterable[int] = result
+            if before is not None:
+                candidates = (news_id for news_id in result if (info[news_id][0], news_id) < before)
+            page = heapq.nlargest(
+                offset + limit, candidates, key=lambda news_id: (info[news_id][0], news_id)
+            )
+            return len(result), page[offset:]
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> None:
+        """从数据库全量重建索引，构建完成后整体替换"""
+        fresh = NewsTagIndex()
+        for news_id, tag_id in db.execute(
+            select(NewsTag.news_id, NewsTag.tag_id).execution_options(yield_per=batch_size)
+        ):
+            fresh._news_tags.setdefault(news_id, ())
+            fresh._news_tags[news_id] += (tag_id,)
+
+        stmt = (
+            select(
+                News.id, News.category_id, News.is_published,
+                News.is_featured, News.is_breaking, News.created_at,
+            )
+            .where(News.is_published == True)
+            .order_by(News.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for row in db.execute(stmt):
+            fresh.update_news(row)
+
+        with self._lock:
+            self._featured, self._breaking = fresh._featured, fresh._breaking
+            self._categories, self._tags = fresh._categories, fresh._tags
+            self._news_tags, self._news_info = fresh._news_tags, fresh._news_info
+            self.is_loaded = True
+
+
+# 全局索引实例
+news_tag_index = NewsTagIndex()
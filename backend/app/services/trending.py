@@ -0,0 +1,233 @@
+"""
+热门新闻
+热度为按发布时间和互动时间指数衰减的加权和：每次互动贡献 weight * exp(-λ(now - t))。
+在对数空间中保存 log Σ weight * exp(λt)，此值不随时间变化，而当前热度只差一个公共因子
+exp(-λ·now)，因此排名无需定期重新计算；每次互动只做一次 logaddexp。
+全站和每个分类各保留一个有界的前 N 名（最小堆），查询时不扫描新闻表
+"""
+import heapq
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.conditional import as_utc
+from ..core.config import settings
+from ..models.news import News
+
+# 时间从此刻起算，使对数热度保持在较小的数值范围内
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class TrendingArticle:
+    """热门列表中展示的信息"""
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str]
+    cover_image: Optional[str]
+    category_id: int
+    created_at: datetime
+
+
+def _log_add(a: float, b: float) -> float:
+    """log(exp(a) + exp(b))，避免溢出"""
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+
+class _TopN:
+    """
+    有界的前 N 名
+
+    members 为成员及其对数热度；最小堆中成员每次加分都压入新条目，
+    旧条目在到达堆顶时跳过，堆过大时按成员重建
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.members: Dict[int, float] = {}
+        self._heap: List[Tuple[float, int]] = []
+
+    def offer(self, news_id: int, score: float) -> None:
+        """新闻热度变化后调用，超过第 N 名时挤掉第 N 名"""
+        if news_id not in self.members and len(self.members) >= self.size:
+            if score <= self._min_score():
+                return
+            _, evicted = heapq.heappop(self._heap)
+            del self.members[evicted]
+        self.members[news_id] = score
+        heapq.heappush(self._heap, (score, news_id))
+        if len(self._heap) > 2 * self.size + 64:
+            self._heap = [(score, news_id) for news_id, score in self.members.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, news_id: int) -> bool:
+        """移出成员，返回是否原本在列"""
+        return self.members.pop(news_id, None) is not None
+
+    def _min_score(self) -> float:
+        while self.members.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0]
+
+    def ranked(self) -> List[Tuple[int, float]]:
+        return sorted(self.members.items(), key=lambda item: item[1], reverse=True)
+
+
+class TrendingEngine:
+    """
+    热门新闻引擎
+
+    只跟踪已发布的新闻：启动时按数据库中的累计计数加载（视为发生在发布时刻），
+    之后由浏览等路径逐次累加；新闻写入时更新展示信息和所在分类，下线或删除时移出
+    """
+
+    def __init__(self):
+        self.is_loaded = False
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._scores: Dict[int, float] = {}
+        self._articles: Dict[int, TrendingArticle] = {}
+        # 键 None 为全站，其余为分类ID
+        self._tops: Dict[Optional[int], _TopN] = {None: _TopN(settings.TRENDING_SIZE)}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def clear(self) -> None:
+        """清空引擎"""
+        with self._lock:
+            self._reset()
+            self.is_loaded = False
+
+    @staticmethod
+    def _decay_rate() -> float:
+        """每秒的衰减率 λ"""
+        return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+    @staticmethod
+    def _elapsed(at: Optional[datetime] = None) -> float:
+        at = datetime.now(timezone.utc) if at is None else as_utc(at)
+        return (at - _EPOCH).total_seconds()
+
+    @staticmethod
+    def _initial_weight(news: Any) -> float:
+        """发布本身计 1，加上已有计数的加权和"""
+        return (
+            1.0
+            + settings.TRENDING_VIEW_WEIGHT * (news.view_count or 0)
+            + settings.TRENDING_LIKE_WEIGHT * (news.like_count or 0)
+            + settings.TRENDING_COMMENT_WEIGHT * (news.comment_count or 0)
+        )
+
+    def top(self, category_id: Optional[int] = None, limit: Optional[int] = None) -> List[Tuple[TrendingArticle, float]]:
+        """当前热门新闻及热度（按热度降序），category_id 为空时为全站"""
+        offset = self._decay_rate() * self._elapsed()
+        with self._lock:
+            ranked = self._tops[category_id].ranked() if category_id in self._tops else []
+            return [(self._articles[news_id], math.exp(score - offset)) for news_id, score in ranked[:limit]]
+
+    def rebuild(self, db: Session, batch_size: int = 1000) -> None:
+        """从数据库加载已发布新闻及其累计计数，完成后整体替换"""
+        engine = TrendingEngine()
+        result = db.execute(
+            select(
+                News.id, News.title, News.slug, News.summary, News.cover_image, News.category_id,
+                News.created_at, News.view_count, News.like_count, News.comment_count,
+            )
+            .where(News.is_published == True)
+            .execution_options(yield_per=batch_size)
+        )
+        for row in result:
+            engine._add(row)
+        with self._lock:
+            self._scores, self._articles, self._tops = engine._scores, engine._articles, engine._tops
+            self.is_loaded = True
+
+    def record(self, news_id: int, weight: float, at: Optional[datetime] = None) -> None:
+        """记录一次互动（浏览、点赞、评论等），未跟踪的新闻忽略"""
+        if weight <= 0:
+            return
+        contribution = math.log(weight) + self._decay_rate() * self._elapsed(at)
+        with self._lock:
+            score = self._scores.get(news_id)
+            if score is None:
+                return
+            score = _log_add(score, contribution)
+            self._scores[news_id] = score
+            self._tops[None].offer(news_id, score)
+            self._tops[self._articles[news_id].category_id].offer(news_id, score)
+
+    def update_news(self, news: Any) -> None:
+        """新闻写入后更新展示信息和所在分类，未发布的新闻移出"""
+        with self._lock:
+            if not news.is_published:
+                self._remove(news.id)
+                return
+            previous = self._articles.get(news.id)
+            if previous is None:
+                self._add(news)
+                return
+            self._articles[news.id] = self._article(news)
+            if previous.category_id != news.category_id:
+                self._discard(previous.category_id, news.id)
+                self._category_top(news.category_id).offer(news.id, self._scores[news.id])
+
+    def remove(self, news_id: int) -> None:
+        """将新闻移出"""
+        with self._lock:
+            self._remove(news_id)
+
+    @staticmethod
+    def _article(news: Any) -> TrendingArticle:
+        return TrendingArticle(
+            id=news.id, title=news.title, slug=news.slug, summary=news.summary,
+            cover_image=news.cover_image, category_id=news.category_id, created_at=news.created_at,
+        )
+
+    def _category_top(self, category_id: int) -> _TopN:
+        top = self._tops.get(category_id)
+        if top is None:
+            top = self._tops[category_id] = _TopN(settings.TRENDING_SIZE)
+        return top
+
+    def _add(self, news: Any) -> None:
+        score = math.log(self._initial_weight(news)) + self._decay_rate() * self._elapsed(news.created_at)
+        self._scores[news.id] = score
+        self._articles[news.id] = self._article(news)
+        self._tops[None].offer(news.id, score)
+        self._category_top(news.category_id).offer(news.id, score)
+
+    def _remove(self, news_id: int) -> None:
+        article = self._articles.pop(news_id, None)
+        if article is None:
+            return
+        del self._scores[news_id]
+        self._discard(None, news_id)
+        self._discard(article.category_id, news_id)
+
+    def _discard(self, category_id: Optional[int], news_id: int) -> None:
+        """移出前 N 名，空出的位置由范围内未入选的最高热度补上（只在下线、删除、换分类时发生）"""
+        top = self._tops.get(category_id)
+        if top is None or not top.discard(news_id):
+            return
+        candidates = (
+            (score, candidate_id) for candidate_id, score in self._scores.items()
+            if candidate_id not in top.members
+            and (category_id is None or self._articles[candidate_id].category_id == category_id)
+        )
+        best = max(candidates, default=None)
+        if best is not None:
+            top.offer(best[1], best[0])
+
+
+# 全局引擎实例
+news_trending = TrendingEngine()
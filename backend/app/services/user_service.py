@@ -3,13 +3,18 @@
 包含用户的CRUD操作和认证逻辑
 """
 from typing import Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select, update
 from fastapi import HTTPException, status
 
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
-from ..core.security import get_password_hash, verify_password
+from ..core.security import get_password_hash, password_needs_rehash, verify_password
+from .principal_cache import Principal, user_principal_cache
+
+# 认证依赖只需要这几列
+_PRINCIPAL_COLUMNS = (User.id, User.is_active, User.is_superuser, User.is_verified)
 
 
 class UserService:
@@ -20,6 +25,18 @@ class UserService:
         """根据ID获取用户"""
         return db.get(User, user_id)
     
+    @staticmethod
+    def get_principal(db: Session, user_id: int) -> Optional[Principal]:
+        """获取用户身份与权限标志，优先读取缓存，未命中时只查询所需的列"""
+        principal = user_principal_cache.get(user_id)
+        if principal is None:
+            row = db.execute(select(*_PRINCIPAL_COLUMNS).where(User.id == user_id)).one_or_none()
+            if row is None:
+                return None
+            principal = Principal(*row)
+            user_principal_cache.set(principal)
+        return principal
+    
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[User]:
         """根据邮箱获取用户"""
@@ -99,6 +116,7 @@ class UserService:
             setattr(user, field, value)
         
         db.commit()
+        user_principal_cache.invalidate(user_id)
         db.refresh(user)
         return user
     
@@ -114,6 +132,7 @@ class UserService:
         
         db.delete(user)
         db.commit()
+        user_principal_cache.invalidate(user_id)
         return True
     
     @staticmethod
@@ -126,10 +145,17 @@ class UserService:
         user = UserService.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        hashed_password = user.hashed_password
+        # 校验密码耗时较长，先结束只读事务归还数据库连接，避免登录高峰占满连接池
+        db.rollback()
+        if not verify_password(password, hashed_password):
             return None
         if not user.is_active:
             return None
+        # BCRYPT_ROUNDS 调整后，用户下次登录时按新的代价因子重新计算哈希
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = get_password_hash(password)
+            db.commit()
         return user
     
     @staticmethod
@@ -151,6 +177,7 @@ class UserService:
         
         user.is_verified = True
         db.commit()
+        user_principal_cache.invalidate(user_id)
         return True
     
     @staticmethod
@@ -170,4 +197,44 @@ class UserService:
         
         user.hashed_password = get_password_hash(new_password)
         db.commit()
-        return True 
\ No newline at end of file
+        user_principal_cache.invalidate(user_id)
+        return True
+
+
+class AsyncUserService:
+    """用户服务的异步读方法（ASYNC_READ_PATH）"""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+        """根据ID获取用户"""
+        return await db.get(User, user_id)
+    
+    @staticmethod
+    async def get_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """获取用户身份与权限标志，优先读取缓存"""
+        principal = user_principal_cache.get(user_id)
+        if principal is None:
+            row = (await db.execute(select(*_PRINCIPAL_COLUMNS).where(User.id == user_id))).one_or_none()
+            if row is None:
+                return None
+            principal = Principal(*row)
+            user_principal_cache.set(principal)
+        return principal
+    
+    @staticmethod
+    async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """根据邮箱获取用户"""
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_by_username(db: AsyncSession, username: str) -> Optional[User]:
+        """根据用户名获取用户"""
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_multi(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
+        """获取多个用户"""
+        result = await db.execute(select(User).offset(skip).limit(limit))
+        return result.scalars().all()
@@ -0,0 +1,130 @@
+"""
+新闻浏览次数写缓冲
+浏览只在进程内（或 Redis 中）累加，由后台任务定期合并写入数据库，
+每篇新闻一条 UPDATE view_count = view_count + delta，读请求不产生数据库写入
+"""
+import threading
+import uuid
+from typing import Dict
+
+import redis
+import structlog
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from ..core.cache import create_cache_client
+from ..core.config import settings
+from ..models.news import News
+
+logger = structlog.get_logger()
+
+_PENDING_KEY = "news:views:pending"
+
+_news = News.__table__
+
+# 浏览不算修改，保持 updated_at 不变（否则会套用列的 onupdate）
+_FLUSH_STATEMENT = (
+    update(_news)
+    .where(_news.c.id == bindparam("news_id"))
+    .values(view_count=_news.c.view_count + bindparam("delta"), updated_at=_news.c.updated_at)
+)
+
+
+class ViewCounter:
+    """
+    浏览次数缓冲
+
+    VIEW_COUNT_BUFFER 为 memory 时在进程内累加；为 redis 时累加到共享哈希中，
+    多个进程共同缓冲，任一进程刷新即可。Redis 不可用时退回进程内缓冲。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = {}
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_cache_client()
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+
+    @property
+    def use_redis(self) -> bool:
+        return settings.VIEW_COUNT_BUFFER == "redis"
+
+    def add(self, news_id: int, count: int = 1) -> None:
+        """记录浏览"""
+        if self.use_redis:
+            try:
+                self.client.hincrby(_PENDING_KEY, news_id, count)
+                return
+            except redis.RedisError as e:
+                logger.warning(f"View counter falls back to local buffer: {e}")
+        self._merge({news_id: count})
+
+    def pending(self, news_id: int) -> int:
+        """尚未写入数据库的浏览次数"""
+        count = self._pending.get(news_id, 0)
+        if self.use_redis:
+            try:
+                count += int(self.client.hget(_PENDING_KEY, news_id) or 0)
+            except redis.RedisError:
+                pass
+        return count
+
+    def _merge(self, deltas: Dict[int, int]) -> None:
+        with self._lock:
+            for news_id, count in deltas.items():
+                self._pending[news_id] = self._pending.get(news_id, 0) + count
+
+    def _take(self) -> Dict[int, int]:
+        """取出并清空所有缓冲的增量"""
+        with self._lock:
+            deltas, self._pending = self._pending, {}
+        if not self.use_redis:
+            return deltas
+
+        # 先改名再读取：刷新期间的新浏览写入新的哈希，不会被删除
+        flushing = f"{_PENDING_KEY}:flushing:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(_PENDING_KEY, flushing)
+        except redis.ResponseError:
+            # 没有待写入的浏览
+            return deltas
+        except redis.RedisError as e:
+            logger.warning(f"Failed to read view counter buffer: {e}")
+            return deltas
+        try:
+            shared = self.client.hgetall(flushing)
+            self.client.delete(flushing)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to read view counter buffer: {e}")
+            return deltas
+        for news_id, count in shared.items():
+            deltas[int(news_id)] = deltas.get(int(news_id), 0) + int(count)
+        return deltas
+
+    def flush(self, db: Session) -> int:
+        """将缓冲的浏览次数写入数据库，返回更新的新闻数；写入失败时增量放回缓冲"""
+        deltas = self._take()
+        if not deltas:
+            return 0
+        # 按ID顺序更新，多个进程同时刷新时加锁顺序一致
+        params = [{"news_id": news_id, "delta": count} for news_id, count in sorted(deltas.items())]
+        try:
+            db.execute(_FLUSH_STATEMENT, params)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._merge(deltas)
+            raise
+        return len(deltas)
+
+
+# 全局计数器实例
+news_view_counter = ViewCounter()
@@ -0,0 +1,27 @@
+"""
+Celery 应用
+CELERY_BROKER_URL 为 memory:// 时任务在调用方进程内立即执行（测试与单进程开发环境，无需 Redis），
+否则投递到消息队列，由 worker 执行：celery -A app.tasks.celery_app worker
+定时抓取来源（CRAWLER_INTERVAL_SECONDS > 0）另需运行 celery -A app.tasks.celery_app beat
+"""
+from celery import Celery
+
+from ..core.config import settings
+
+celery_app = Celery("ai_news", broker=settings.CELERY_BROKER_URL, include=["app.tasks.news", "app.tasks.sources"])
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_BROKER_URL.startswith("memory://"),
+    task_eager_propagates=True,
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    # 任务按数据库中的当前状态处理，可以重复执行：执行完才确认，worker 异常退出时重新投递
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+)
+
+if settings.CRAWLER_INTERVAL_SECONDS > 0:
+    celery_app.conf.beat_schedule = {
+        "crawl-sources": {"task": "sources.crawl", "schedule": float(settings.CRAWLER_INTERVAL_SECONDS)},
+    }
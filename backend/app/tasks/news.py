@@ -0,0 +1,326 @@
+"""
+新闻写入后的后台任务
+任务只接收新闻、分类、标签的ID，执行时按数据库中的当前状态处理，因此可以重复执行：
+同一次请求中安排的任务按类型合并为一批，同一篇新闻已在排队的缩略图任务不再重复投递
+"""
+import contextvars
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set
+
+import redis
+import structlog
+from celery import chain
+from fastapi import BackgroundTasks
+from PIL import Image, UnidentifiedImageError
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from ..core.cache import create_cache_client
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.news import Category, News, Tag
+from ..services.news_cache import news_list_cache
+from ..services.news_feed import FEED_FORMATS, NewsFeedService, feed_url, news_feed_cache
+from ..services.related_news import related_news_index
+from ..services.search_index import news_search_index
+from ..services.sitemap import sitemap_cache
+from ..services.tag_index import news_tag_index
+from ..services.trending import news_trending
+from .celery_app import celery_app
+
+logger = structlog.get_logger()
+
+# 索引任务每次从数据库加载的新闻数
+_LOAD_CHUNK = 1000
+
+THUMBNAIL_DIR = "thumbnails"
+
+
+# 在当前进程内执行任务时所用的数据库引擎（写入所在的主库）
+_current_bind: contextvars.ContextVar[Optional[Engine]] = contextvars.ContextVar("news_task_bind", default=None)
+
+
+def _session() -> Session:
+    """在写入的进程内执行时沿用写入所在的数据库，在 worker 中使用 SessionLocal"""
+    bind = _current_bind.get()
+    return SessionLocal() if bind is None else Session(bind=bind)
+
+
+def _chunks(ids: List[int]) -> Iterator[List[int]]:
+    for start in range(0, len(ids), _LOAD_CHUNK):
+        yield ids[start:start + _LOAD_CHUNK]
+
+
+def _indexes_enabled() -> bool:
+    return (
+        settings.NEWS_SEARCH_MODE == "bm25"
+        or settings.NEWS_TAG_INDEX_ENABLED
+        or settings.RELATED_NEWS_ENABLED
+        or settings.TRENDING_ENABLED
+    )
+
+
+@celery_app.task(name="news.index")
+def index_news(news_ids: List[int]) -> None:
+    """
+    更新进程内索引（bm25 搜索、标签位图、相关新闻、热门排行）：仍存在的新闻按当前内容重新加入，已删除的移出。
+    索引在 API 进程的内存中，此任务总是在写入的进程内执行（Task.apply），其他进程由各自的定时刷新追上
+    """
+    for chunk in _chunks(news_ids):
+        db = _session()
+        try:
+            found = db.scalars(select(News).options(selectinload(News.tags)).where(News.id.in_(chunk))).all()
+        finally:
+            db.close()
+
+        for news in found:
+            tag_ids = [tag.id for tag in news.tags]
+            if settings.NEWS_SEARCH_MODE == "bm25":
+                news_search_index.add(news)
+            if settings.NEWS_TAG_INDEX_ENABLED:
+                news_tag_index.set_tags(news.id, tag_ids)
+                news_tag_index.update_news(news)
+            if settings.RELATED_NEWS_ENABLED:
+                related_news_index.update_news(news, tag_ids)
+            if settings.TRENDING_ENABLED:
+                news_trending.update_news(news)
+
+        for news_id in set(chunk) - {news.id for news in found}:
+            if settings.NEWS_SEARCH_MODE == "bm25":
+                news_search_index.remove(news_id)
+            if settings.NEWS_TAG_INDEX_ENABLED:
+                news_tag_index.remove(news_id)
+            if settings.RELATED_NEWS_ENABLED:
+                related_news_index.remove(news_id)
+            if settings.TRENDING_ENABLED:
+                news_trending.remove(news_id)
+
+
+@celery_app.task(name="news.invalidate_caches")
+def invalidate_news_caches(news_ids: List[int], category_ids: List[int], tag_ids: List[int]) -> None:
+    """使相关的列表、订阅源（共用列表的代数计数器）和站点地图分片失效"""
+    news_list_cache.invalidate(category_ids=category_ids, tag_ids=tag_ids)
+    sitemap_cache.invalidate(news_ids)
+
+
+@celery_app.task(name="news.regenerate_feeds")
+def regenerate_feeds(category_ids: List[int], tag_ids: List[int]) -> None:
+    """
+    重新生成失效的全站、分类和标签订阅源并写回缓存，订阅者下次轮询时直接命中。
+    只处理缓存过的订阅源（没人订阅的不生成）；已是最新的跳过，重复执行没有额外开销
+    """
+    # 服务层在写入后安排任务，延迟导入避免循环依赖
+    from ..services.news_service import NewsService
+
+    if not news_feed_cache.enabled:
+        return
+    db = _session()
+    try:
+        scopes = [("all", None)]
+        if category_ids:
+            scopes += [("category", slug) for slug in db.scalars(
+                select(Category.slug).where(Category.id.in_(category_ids), Category.is_active == True)
+            )]
+        if tag_ids:
+            scopes += [("tag", slug) for slug in db.scalars(select(Tag.slug).where(Tag.id.in_(tag_ids)))]
+
+        for kind, slug in scopes:
+            formats = [feed_format for feed_format in FEED_FORMATS if news_feed_cache.stale(kind, slug, feed_format)]
+            if not formats:
+                continue
+            source = NewsFeedService.resolve(db, kind, slug)
+            generation = news_feed_cache.generation(source)
+            items = NewsService.search_news(db, source.search_params).items
+            for feed_format in formats:
+                feed = NewsFeedService.render(source, items, feed_format, feed_url(kind, slug, feed_format))
+                news_feed_cache.set(source, feed_format, generation, feed)
+    finally:
+        db.close()
+
+
+def thumbnail_path(news_id: int) -> Path:
+    """新闻封面缩略图的路径"""
+    return Path(settings.UPLOAD_DIR) / THUMBNAIL_DIR / f"{news_id}.jpg"
+
+
+def _uploaded_file(cover_image: Optional[str]) -> Optional[Path]:
+    """封面是上传目录中的文件时返回其路径；外部链接不下载"""
+    prefix = settings.UPLOAD_URL_PREFIX
+    if not cover_image or not cover_image.startswith(prefix):
+        return None
+    root = Path(settings.UPLOAD_DIR).resolve()
+    path = (root / cover_image[len(prefix):]).resolve()
+    return path if path.is_relative_to(root) and path.is_file() else None
+
+
+def _make_thumbnail(source: Path, target: Path) -> None:
+    size = (settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE)
+    with Image.open(source) as image:
+        # JPEG 解码时直接按 1/2、1/4、1/8 缩小，不必先解出原图
+        image.draft("RGB", size)
+        image.thumbnail(size)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_suffix(".tmp")
+        image.convert("RGB").save(partial, "JPEG", quality=85, optimize=True)
+    os.replace(partial, target)
+
+
+@celery_app.task(name="news.thumbnails")
+def generate_thumbnails(news_ids: List[int]) -> None:
+    """
+    为封面是上传文件的新闻生成缩略图；缩略图比原图新时跳过。
+    新闻已删除或封面不再是上传文件时删除旧的缩略图
+    """
+    news_tasks.release(generate_thumbnails.name, news_ids)
+    db = _session()
+    try:
+        covers = dict(db.execute(select(News.id, News.cover_image).where(News.id.in_(news_ids))).all())
+    finally:
+        db.close()
+
+    for news_id in news_ids:
+        target = thumbnail_path(news_id)
+        source = _uploaded_file(covers.get(news_id))
+        if source is None:
+            target.unlink(missing_ok=True)
+            continue
+        if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+            continue
+        try:
+            _make_thumbnail(source, target)
+        except (UnidentifiedImageError, OSError) as e:
+            logger.warning(f"Failed to create thumbnail for news {news_id}: {e}")
+
+
+@dataclass
+class TaskBatch:
+    """一次请求中安排的写入后任务，新闻、分类、标签ID各自去重"""
+    news_ids: Set[int] = field(default_factory=set)
+    category_ids: Set[int] = field(default_factory=set)
+    tag_ids: Set[int] = field(default_factory=set)
+    thumbnail_ids: Set[int] = field(default_factory=set)
+    bind: Optional[Engine] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.news_ids or self.category_ids or self.tag_ids or self.thumbnail_ids)
+
+
+_current_batch: contextvars.ContextVar[Optional[TaskBatch]] = contextvars.ContextVar(
+    "news_task_batch", default=None
+)
+
+
+class NewsTaskQueue:
+    """
+    新闻写入后的任务队列
+
+    服务层在提交之后调用 news_written()。在 deferred() 范围内（写接口）只记入本次请求的批次，
+    响应发送之后一并提交：每类任务一批，批量导入上千篇新闻也只有一个索引任务和一次缓存失效；
+    范围外（脚本、测试直接调用服务层）立即提交。投递到消息队列的缩略图任务按新闻登记排队标记，
+    标记存在期间同一篇新闻不再投递，任务开始执行时清除标记后再读取数据库，不会漏掉之后的写入
+    """
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_cache_client()
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+
+    @staticmethod
+    def _marker(task_name: str, news_id: int) -> str:
+        return f"tasks:queued:{task_name}:{news_id}"
+
+    def news_written(
+        self,
+        db: Session,
+        news_ids: Iterable[int],
+        category_ids: Iterable[Optional[int]] = (),
+        tag_ids: Iterable[int] = (),
+        thumbnail_ids: Iterable[int] = (),
+    ) -> None:
+        """登记新闻的写入（需在提交之后调用）；db 为写入所用的会话，thumbnail_ids 为封面可能变化的新闻"""
+        batch = _current_batch.get()
+        immediate = batch is None
+        if immediate:
+            batch = TaskBatch()
+        batch.bind = batch.bind or db.get_bind()
+        batch.news_ids.update(news_ids)
+        batch.category_ids.update(category_id for category_id in category_ids if category_id)
+        batch.tag_ids.update(tag_ids)
+        batch.thumbnail_ids.update(thumbnail_ids)
+        if immediate:
+            self.submit(batch)
+
+    @contextmanager
+    def deferred(self, background_tasks: BackgroundTasks) -> Iterator[TaskBatch]:
+        """范围内安排的任务在响应发送之后提交；出错时已提交的写入仍需处理，立即提交"""
+        batch = TaskBatch()
+        token = _current_batch.set(batch)
+        try:
+            yield batch
+        except BaseException:
+            self.submit(batch)
+            raise
+        finally:
+            _current_batch.reset(token)
+        background_tasks.add_task(self.submit, batch)
+
+    def submit(self, batch: TaskBatch) -> None:
+        """提交一批任务：进程内索引在本进程执行，其余按 CELERY_BROKER_URL 立即执行或投递给 worker"""
+        if not batch:
+            return
+        news_ids = sorted(batch.news_ids)
+        category_ids = sorted(batch.category_ids)
+        tag_ids = sorted(batch.tag_ids)
+        token = _current_bind.set(batch.bind)
+        try:
+            if news_ids and _indexes_enabled():
+                index_news.apply(args=(news_ids,))
+            chain(
+                invalidate_news_caches.si(news_ids, category_ids, tag_ids),
+                regenerate_feeds.si(category_ids, tag_ids),
+            ).delay()
+            thumbnail_ids = self._claim(generate_thumbnails.name, batch.thumbnail_ids)
+            if thumbnail_ids:
+                generate_thumbnails.delay(thumbnail_ids)
+        finally:
+            _current_bind.reset(token)
+
+    def _claim(self, task_name: str, news_ids: Iterable[int]) -> List[int]:
+        """登记排队标记，返回此前不在排队中的新闻；立即执行时不排队，缓存不可用时宁可重复投递"""
+        news_ids = sorted(news_ids)
+        if celery_app.conf.task_always_eager or not news_ids:
+            return news_ids
+        try:
+            return [
+                news_id for news_id in news_ids
+                if self.client.set(self._marker(task_name, news_id), 1, ex=settings.NEWS_TASK_DEDUP_SECONDS, nx=True)
+            ]
+        except redis.RedisError as e:
+            logger.warning(f"Task dedup markers unavailable: {e}")
+            return news_ids
+
+    def release(self, task_name: str, news_ids: Iterable[int]) -> None:
+        """任务开始执行时清除排队标记，之后的写入重新投递"""
+        news_ids = list(news_ids)
+        if celery_app.conf.task_always_eager or not news_ids:
+            return
+        try:
+            self.client.delete(*(self._marker(task_name, news_id) for news_id in news_ids))
+        except redis.RedisError as e:
+            logger.warning(f"Task dedup markers unavailable: {e}")
+
+
+# 全局任务队列实例
+news_tasks = NewsTaskQueue()
@@ -0,0 +1,21 @@
+"""
+来源抓取任务
+配置了消息队列时由 celery beat 按 CRAWLER_INTERVAL_SECONDS 定时投递，worker 执行；
+memory:// 时由 API 进程的定时任务直接抓取（见 main.py）
+"""
+from typing import List, Optional
+
+from ..core.database import SessionLocal
+from ..models.user import User  # noqa: F401  News.author 关联需要先注册用户模型
+from ..services.crawler import crawl_sources
+from .celery_app import celery_app
+
+
+@celery_app.task(name="sources.crawl")
+def crawl(source_ids: Optional[List[int]] = None) -> None:
+    """抓取启用的（或指定的）来源并写入新闻"""
+    db = SessionLocal()
+    try:
+        crawl_sources(db, source_ids)
+    finally:
+        db.close()
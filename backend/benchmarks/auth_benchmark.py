@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+认证开销微基准测试
+模拟多个会话反复携带各自的访问令牌，比较每个请求的令牌验证耗时：
+关闭缓存（每次 jwt.decode）与开启已验证令牌缓存（TOKEN_CACHE_SIZE）
+
+使用示例:
+  python benchmarks/auth_benchmark.py --sessions 1000 --requests 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.config import settings
+from app.core.security import (
+    create_access_token, get_token_expiration, is_token_expired, verified_token_cache, verify_token,
+)
+
+
+def verify_only(token: str) -> None:
+    verify_token(token)
+
+
+def verify_and_expiry(token: str) -> None:
+    """认证依赖加上过期时间检查（三个辅助函数各调用一次）"""
+    verify_token(token)
+    is_token_expired(token)
+    get_token_expiration(token)
+
+
+def run(tokens, requests: int, check, cache_size: int) -> float:
+    """返回每个请求的平均耗时（微秒）"""
+    settings.TOKEN_CACHE_SIZE = cache_size
+    verified_token_cache.clear()
+    rng = random.Random(42)
+    sequence = [rng.choice(tokens) for _ in range(requests)]
+
+    start = time.perf_counter()
+    for token in sequence:
+        check(token)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="认证开销微基准测试")
+    parser.add_argument("--sessions", type=int, default=1000, help="不同令牌（会话）数")
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    tokens = [create_access_token(subject=i) for i in range(args.sessions)]
+    cache_size = max(settings.TOKEN_CACHE_SIZE, args.sessions)
+
+    print(f"{'check':>18} {'no cache(us)':>13} {'cached(us)':>11} {'speedup':>8}")
+    for name, check in (("verify_token", verify_only), ("verify+expiry", verify_and_expiry)):
+        cold = run(tokens, args.requests, check, 0)
+        warm = run(tokens, args.requests, check, cache_size)
+        print(f"{name:>18} {cold:>13.2f} {warm:>11.2f} {cold / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+近似重复检测基准测试
+生成随机中文稿件（其中一部分为改动了标点和结尾的转载稿），测量：
+入库检查（计算签名 + LSH 查询 + 加入索引）每篇的延迟分位数，以及批量模式下
+进程池计算签名的吞吐量和聚类耗时
+
+使用示例:
+  python benchmarks/dedup_benchmark.py --articles 100000
+  python benchmarks/dedup_benchmark.py --articles 1000000 --length 1500 --workers 1 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.dedup import MinHashLSH, NUM_PERM, _signature_rows, cluster, decode, signature
+
+
+def articles(count: int, length: int, duplicate_ratio: float):
+    """(id, 标题, 正文)；duplicate_ratio 比例的稿件为之前某篇的转载"""
+    rng = random.Random(42)
+    result = []
+    for news_id in range(1, count + 1):
+        if result and rng.random() < duplicate_ratio:
+            _, title, content = result[rng.randrange(len(result))]
+            content = content.replace("的", "，的") + "（转载）"
+        else:
+            title = "快讯"
+            content = "".join(chr(rng.randrange(0x4E00, 0x4E00 + 3000)) for _ in range(length))
+        result.append((news_id, title, content))
+    return result
+
+
+def ingest(rows):
+    """逐篇入库检查，返回每篇耗时（微秒）和判为重复的篇数"""
+    index = MinHashLSH()
+    timings = []
+    duplicates = 0
+    for news_id, title, content in rows:
+        start = time.perf_counter()
+        value = signature(title, content)
+        match = index.query(value, settings.NEWS_DEDUP_THRESHOLD)
+        if match is None:
+            index.add(news_id, value)
+        timings.append((time.perf_counter() - start) * 1e6)
+        duplicates += match is not None
+    return np.array(timings), duplicates
+
+
+def batch_signatures(rows, workers: int, chunk: int = 1000):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = [rows[start:start + chunk] for start in range(0, len(rows), chunk)]
+        return [item for result in executor.map(_signature_rows, chunks) for item in result]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="近似重复检测基准测试")
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--length", type=int, default=1000, help="正文字数")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="转载稿比例")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    rows = articles(args.articles, args.length, args.duplicates)
+
+    timings, duplicates = ingest(rows)
+    print(f"{'ingest':>8} {'articles':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>8} {'duplicates':>10}")
+    print(
+        f"{'online':>8} {len(rows):>9} {np.percentile(timings, 50):>8.0f} {np.percentile(timings, 99):>8.0f} "
+        f"{timings.max():>8.0f} {duplicates:>10}"
+    )
+
+    print(f"\n{'workers':>8} {'articles':>9} {'seconds':>8} {'rows/s':>9}")
+    signatures = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        signatures = batch_signatures(rows, workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>8} {len(rows):>9} {elapsed:>8.2f} {len(rows) / elapsed:>9.0f}")
+
+    ids = np.array([news_id for news_id, _ in signatures], dtype=np.int64)
+    values = decode(b"".join(minhash for _, minhash in signatures)).reshape(-1, NUM_PERM)
+    start = time.perf_counter()
+    roots = cluster(ids, values, settings.NEWS_DEDUP_THRESHOLD)
+    print(f"\ncluster: {time.perf_counter() - start:.2f}s, duplicates {int(np.count_nonzero(roots != ids))}")
+
+
+if __name__ == "__main__":
+    main()
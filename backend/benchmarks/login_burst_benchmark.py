@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+登录高峰下的新闻读取延迟
+启动 uvicorn，若干客户端持续读取新闻详情，同时另一批客户端并发登录（bcrypt），
+比较三种情况下读请求的 p50/p99 延迟：无登录、在请求线程中计算哈希、使用密码哈希进程池
+
+使用示例:
+  python benchmarks/login_burst_benchmark.py --readers 20 --logins 100 --duration 15
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from read_load_test import free_port, seed, start_server
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from app.core.password_hasher import bcrypt_hash
+from app.models.user import User
+
+PASSWORD = "benchmark-password"
+
+
+def seed_users(url: str, users: int, rounds: int) -> None:
+    """写入可以登录的用户（共用同一个哈希）"""
+    hashed = bcrypt_hash(PASSWORD, rounds)
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": hashed,
+                "is_active": True, "is_superuser": False, "is_verified": True,
+            }
+            for i in range(users)
+        ])
+    engine.dispose()
+
+
+async def run(base_url: str, readers: int, logins: int, users: int, duration: float, rows: int) -> dict:
+    """返回读延迟列表与登录结果统计"""
+    read_timings, login_status = [], {}
+    read_errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=readers + logins)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def reader(n: int) -> None:
+            nonlocal read_errors
+            i = n
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f"/api/v1/news/{i % rows + 1}")
+                except httpx.HTTPError:
+                    read_errors += 1
+                    continue
+                if response.status_code == 200:
+                    read_timings.append((time.perf_counter() - start) * 1000)
+                i += readers
+
+        async def login(n: int) -> None:
+            i = n
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.post("/api/v1/auth/login", data={
+                        "username": f"user{i % users}@example.com", "password": PASSWORD,
+                    })
+                except httpx.HTTPError:
+                    login_status["error"] = login_status.get("error", 0) + 1
+                    continue
+                login_status[response.status_code] = login_status.get(response.status_code, 0) + 1
+                if response.status_code == 503:
+                    await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+                i += logins
+
+        await asyncio.gather(
+            *(reader(n) for n in range(readers)),
+            *(login(n) for n in range(logins)),
+        )
+    return {"reads": sorted(read_timings), "read_errors": read_errors, "logins": login_status}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="登录高峰下的新闻读取延迟")
+    parser.add_argument("--readers", type=int, default=20, help="读取新闻的并发客户端数")
+    parser.add_argument("--logins", type=int, default=100, help="并发登录的客户端数")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt 代价因子")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        seed(url, args.rows)
+        seed_users(url, args.logins, args.rounds)
+
+        modes = (
+            ("no logins", 0, {"PASSWORD_HASH_WORKERS": "0"}),
+            ("inline", args.logins, {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_QUEUE_LIMIT": "100000"}),
+            ("process pool", args.logins, {}),
+        )
+        print(
+            f"{'mode':>12} {'reads':>7} {'p50(ms)':>9} {'p99(ms)':>9} {'read err':>9} "
+            f"{'login ok':>9} {'503':>6} {'login err':>10}"
+        )
+        for mode, logins, env in modes:
+            port = free_port()
+            server = start_server(port, {
+                "DATABASE_URL": url,
+                "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/bench.db",
+                "NEWS_LIST_CACHE_TTL_SECONDS": "0",
+                "BCRYPT_ROUNDS": str(args.rounds),
+                "DEBUG": "false",
+                **env,
+            })
+            try:
+                result = asyncio.run(run(
+                    f"http://127.0.0.1:{port}", args.readers, logins, max(logins, 1), args.duration, args.rows,
+                ))
+            finally:
+                server.terminate()
+                server.wait()
+            reads = result["reads"]
+            p50 = statistics.median(reads) if reads else 0
+            p99 = reads[int(len(reads) * 0.99) - 1] if reads else 0
+            print(
+                f"{mode:>12} {len(reads):>7} {p50:>9.1f} {p99:>9.1f} {result['read_errors']:>9} "
+                f"{result['logins'].get(200, 0):>9} {result['logins'].get(503, 0):>6} "
+                f"{result['logins'].get('error', 0):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ AI-News 开发工具脚本
 import os
 import sys
 import subprocess
+from datetime import datetime
 from pathlib import Path
 
 # 项目根目录
@@ -94,6 +95,97 @@ def reset_database():
     run_migration()
 
 
+def export_news(args):
+    """流式导出新闻到文件或标准输出"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="dev_tools.py export", description="导出新闻（NDJSON/CSV）")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", "-o", help="输出文件，默认写到标准输出")
+    parser.add_argument("--category-id", type=int)
+    parser.add_argument("--published", dest="is_published", action="store_true", default=None)
+    parser.add_argument("--unpublished", dest="is_published", action="store_false")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="创建时间下限（含），ISO 格式")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="创建时间上限（不含），ISO 格式")
+    parser.add_argument("--after-id", type=int, default=0, help="从该ID之后继续导出")
+    options = parser.parse_args(args)
+    
+    from app.core.database import SessionLocal
+    from app.models.user import User  # noqa: F401  News.author 关联需要先注册用户模型
+    from app.schemas.news import NewsExportParams
+    from app.services.news_export import NewsExporter
+    
+    params = NewsExportParams(
+        category_id=options.category_id,
+        is_published=options.is_published,
+        created_from=options.since,
+        created_to=options.until,
+        after_id=options.after_id,
+    )
+    output = open(options.output, "wb") if options.output else sys.stdout.buffer
+    db = SessionLocal()
+    db.use_replica()
+    try:
+        for chunk in NewsExporter.stream(db, params, options.format):
+            output.write(chunk)
+    finally:
+        db.close()
+        if options.output:
+            output.close()
+    if options.output:
+        print(f"✅ 导出完成: {options.output}", file=sys.stderr)
+    return True
+
+
+def dedup_news(args):
+    """为已有新闻批量补签名并按近似重复聚类"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="dev_tools.py dedup", description="已有新闻的近似重复检测")
+    parser.add_argument("--workers", type=int, help="计算签名的进程数，默认为 CPU 核数")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批读取和写入的新闻数")
+    parser.add_argument("--threshold", type=float, help="Jaccard 相似度阈值，默认为 NEWS_DEDUP_THRESHOLD")
+    options = parser.parse_args(args)
+    
+    from app.core.database import SessionLocal
+    from app.models.user import User  # noqa: F401  News.author 关联需要先注册用户模型
+    from app.services.dedup import deduplicate_corpus
+    
+    db = SessionLocal()
+    try:
+        computed, duplicates = deduplicate_corpus(
+            db, workers=options.workers, batch_size=options.batch_size, threshold=options.threshold
+        )
+    finally:
+        db.close()
+    print(f"✅ 新计算签名 {computed} 条，近似重复 {duplicates} 篇（运行中的服务重启后重新加载原稿签名）")
+    return True
+
+
+def crawl_sources(args):
+    """抓取启用的（或指定的）来源"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="dev_tools.py crawl", description="抓取新闻来源")
+    parser.add_argument("--source-id", type=int, nargs="+", help="只抓取指定的来源（不论是否启用）")
+    options = parser.parse_args(args)
+    
+    from app.core.database import SessionLocal
+    from app.models.user import User  # noqa: F401  News.author 关联需要先注册用户模型
+    from app.services.crawler import crawl_sources as crawl
+    
+    db = SessionLocal()
+    try:
+        result = crawl(db, options.source_id)
+    finally:
+        db.close()
+    print(
+        f"✅ 抓取来源 {result.sources} 个（新内容 {result.fetched}，未变 {result.not_modified}，失败 {result.failed}），"
+        f"新增新闻 {result.created} 篇，用时 {result.seconds:.1f}s"
+    )
+    return result.failed == 0
+
+
 def show_help():
     """显示帮助信息"""
     help_text = """
@@ -106,6 +198,9 @@ def show_help():
   migrate     - 运行数据库迁移
   create-mig  - 创建数据库迁移
   reset-db    - 重置数据库
+  export      - 导出新闻（NDJSON/CSV，export --help 查看参数）
+  dedup       - 已有新闻的近似重复检测（dedup --help 查看参数）
+  crawl       - 抓取新闻来源（crawl --help 查看参数）
   help        - 显示此帮助信息
 
 使用示例:
@@ -113,6 +208,9 @@ def show_help():
   python dev_tools.py test
   python dev_tools.py create-mig "add user table"
   python dev_tools.py migrate
+  python dev_tools.py export --format csv --published -o news.csv
+  python dev_tools.py dedup --workers 8
+  python dev_tools.py crawl --source-id 1 2
 """
     print(help_text)
 
@@ -138,6 +236,12 @@ def main():
         create_migration(message)
     elif command == "reset-db":
         reset_database()
+    elif command == "export":
+        export_news(sys.argv[2:])
+    elif command == "dedup":
+        dedup_news(sys.argv[2:])
+    elif command == "crawl":
+        crawl_sources(sys.argv[2:])
     elif command == "help":
         show_help()
     else:
@@ -8,9 +8,21 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.database import get_db
+from app.core.cache import MemoryCache
+from app.core.database import get_db, get_read_db, count_queries as _count_queries
 from app.main import app
 from app.models.base import Base
+from app.models.news import Category
+from app.models.user import User
+from app.services.news_cache import news_list_cache
+from app.services.news_feed import news_feed_cache
+from app.services.principal_cache import user_principal_cache
+from app.services.dedup import news_deduplicator
+from app.services.related_news import related_news_index
+from app.services.trending import news_trending
+from app.services.sitemap import sitemap_cache
+from app.services.view_counter import news_view_counter
+from app.tasks import news as news_task_module
 
 
 # 创建测试数据库引擎
@@ -33,8 +45,18 @@ def override_get_db():
         db.close()
 
 
+async def override_get_read_db():
+    """覆盖读接口的数据库依赖（同步模式）"""
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 # 覆盖应用依赖
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
 
 
 @pytest.fixture(scope="function")
@@ -53,6 +75,69 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def list_cache(monkeypatch):
+    """每个测试使用独立的进程内缓存替身，无需 Redis 服务"""
+    cache = MemoryCache()
+    monkeypatch.setattr(news_list_cache, "_client", cache)
+    monkeypatch.setattr(news_feed_cache, "_client", cache)
+    monkeypatch.setattr(sitemap_cache, "_client", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def view_counter(monkeypatch, list_cache):
+    """每个测试使用空的浏览次数缓冲"""
+    monkeypatch.setattr(news_view_counter, "_pending", {})
+    monkeypatch.setattr(news_view_counter, "_client", list_cache)
+    return news_view_counter
+
+
+@pytest.fixture(autouse=True)
+def news_tasks(monkeypatch, list_cache):
+    """写入后任务的排队标记使用进程内缓存"""
+    monkeypatch.setattr(news_task_module.news_tasks, "_client", list_cache)
+    return news_task_module.news_tasks
+
+
+@pytest.fixture(autouse=True)
+def principal_cache():
+    """测试之间数据库重建、用户ID重复，清空身份缓存"""
+    user_principal_cache.clear()
+    yield user_principal_cache
+    user_principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def related_index():
+    """测试之间数据库重建、新闻ID重复，清空相关新闻索引"""
+    related_news_index.clear()
+    yield related_news_index
+    related_news_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def dedup_index():
+    """测试之间数据库重建、新闻ID重复，清空近似重复索引"""
+    news_deduplicator.clear()
+    yield news_deduplicator
+    news_deduplicator.clear()
+
+
+@pytest.fixture(autouse=True)
+def trending():
+    """测试之间数据库重建、新闻ID重复，清空热门新闻"""
+    news_trending.clear()
+    yield news_trending
+    news_trending.clear()
+
+
+@pytest.fixture
+def count_queries():
+    """统计测试数据库上执行的 SQL 条数：with count_queries() as counter: ..."""
+    return lambda: _count_queries(engine)
+
+
 @pytest.fixture(scope="function")
 def client():
     """测试客户端夹具"""
@@ -83,3 +168,30 @@ def test_news_data():
         "is_published": True,
         "tag_ids": [1, 2]
     }
+
+
+@pytest.fixture
+def test_user(db):
+    """测试用户（直接写入数据库）"""
+    user = User(
+        email="author@example.com",
+        username="author",
+        hashed_password="not-a-real-hash",
+        is_active=True,
+        is_superuser=False,
+        is_verified=True,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def test_category(db):
+    """测试分类（直接写入数据库）"""
+    category = Category(name="科技", slug="tech", is_active=True)
+    db.add(category)
+    db.commit()
+    db.refresh(category)
+    return category
@@ -0,0 +1,133 @@
+"""
+异步读路径测试
+ASYNC_READ_PATH 开启时读接口经 aiosqlite 使用异步会话，结果与同步模式一致
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import count_queries, get_db, get_read_db
+from app.core.security import create_access_token
+from app.main import app
+from app.models.base import Base
+from app.models.news import Category, Tag
+from app.models.user import User
+from app.schemas.news import NewsCreate
+from app.services.news_service import NewsService
+
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    """同一个 SQLite 文件上的同步引擎（写入）与 aiosqlite 引擎（读取）"""
+    path = tmp_path / "news.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine)
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(settings, "ASYNC_READ_PATH", True)
+    monkeypatch.setattr(
+        database, "AsyncSessionLocal",
+        async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.delitem(app.dependency_overrides, get_read_db)
+    yield sync_engine, async_engine, SyncSession
+    sync_engine.dispose()
+    async_engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def seeded(engines):
+    """作者、分类、标签与三篇新闻"""
+    _, _, SyncSession = engines
+    with SyncSession() as db:
+        author = User(
+            email="author@example.com", username="author", hashed_password="x",
+            is_active=True, is_superuser=False, is_verified=True,
+        )
+        category = Category(name="科技", slug="tech", is_active=True)
+        tag = Tag(name="ai", slug="ai")
+        db.add_all([author, category, tag])
+        db.commit()
+        news_ids = [
+            NewsService.create(db, NewsCreate(
+                title=f"Rust release {i}", slug=f"news-{i}", content=f"content {i}",
+                category_id=category.id, is_published=True, tag_ids=[tag.id],
+            ), author_id=author.id).id
+            for i in range(3)
+        ]
+        return {"author": author.id, "tag": tag.id, "news": news_ids}
+
+
+@pytest.mark.news
+def test_reads_use_async_engine(client: TestClient, engines, seeded):
+    """读接口只在异步引擎上查询"""
+    sync_engine, async_engine, _ = engines
+
+    with count_queries(sync_engine) as sync_counter, count_queries(async_engine.sync_engine) as async_counter:
+        listing = client.get("/api/v1/news/", params={"size": 2})
+        detail = client.get(f"/api/v1/news/{seeded['news'][0]}")
+        categories = client.get("/api/v1/news/categories/")
+        tags = client.get("/api/v1/news/tags/")
+
+    assert [item["slug"] for item in listing.json()["items"]] == ["news-2", "news-1"]
+    assert listing.json()["total"] == 3
+    assert detail.json()["content"] == "content 0"
+    assert detail.json()["tags"][0]["slug"] == "ai"
+    assert [category["slug"] for category in categories.json()] == ["tech"]
+    assert [tag["slug"] for tag in tags.json()] == ["ai"]
+    assert sync_counter.count == 0
+    assert async_counter.count > 0
+
+
+@pytest.mark.news
+@pytest.mark.parametrize("params", [
+    {"q": "rust"},
+    {"tag_ids": "TAG", "size": 1},
+    {"cursor": "FIRST"},
+])
+def test_search_in_async_mode(client: TestClient, seeded, params):
+    """关键词、标签过滤与游标分页在异步模式下可用"""
+    if params.get("tag_ids") == "TAG":
+        params = {**params, "tag_ids": seeded["tag"]}
+    if params.get("cursor") == "FIRST":
+        first = client.get("/api/v1/news/", params={"size": 1}).json()
+        params = {"cursor": first["next_cursor"], "size": 5}
+
+    response = client.get("/api/v1/news/", params=params)
+
+    assert response.status_code == 200
+    assert response.json()["items"]
+
+
+@pytest.mark.news
+def test_not_found_and_conditional_in_async_mode(client: TestClient, seeded):
+    """异步模式下 404 与 304 行为不变"""
+    url = f"/api/v1/news/{seeded['news'][0]}"
+    etag = client.get(url).headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/v1/news/999").status_code == 404
+
+
+@pytest.mark.auth
+def test_current_user_in_async_mode(client: TestClient, seeded):
+    """/auth/me 在异步模式下读取当前用户"""
+    token = create_access_token(subject=seeded["author"])
+
+    response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["username"] == "author"
@@ -0,0 +1,57 @@
+"""
+压缩位图测试
+与 Python 集合对照验证稀疏桶和稠密桶上的集合运算
+"""
+import random
+
+from app.core.bitmap import RoaringBitmap
+
+
+def _sample(seed, size, upper):
+    rng = random.Random(seed)
+    return {rng.randrange(upper) for _ in range(size)}
+
+
+def test_add_discard_and_iterate_in_order():
+    """增删元素后按升序遍历"""
+    bitmap = RoaringBitmap([70000, 3, 65536, 3, 1])
+    bitmap.discard(65536)
+    bitmap.discard(12345)
+
+    assert list(bitmap) == [1, 3, 70000]
+    assert len(bitmap) == 3
+    assert 3 in bitmap and 65536 not in bitmap
+
+
+def test_set_operations_match_python_sets():
+    """稀疏与稠密桶混合时，交、并、差集结果与集合一致"""
+    # 前两个桶元素多于 4096，会转为位集；第三个桶保持稀疏
+    left = _sample(1, 20000, 3 * 65536)
+    right = _sample(2, 6000, 2 * 65536) | _sample(3, 50, 1 << 20)
+    a, b = RoaringBitmap(left), RoaringBitmap(right)
+
+    assert list(a & b) == sorted(left & right)
+    assert list(a | b) == sorted(left | right)
+    assert list(a - b) == sorted(left - right)
+    assert list(b - a) == sorted(right - left)
+
+
+def test_dense_bucket_shrinks_back_to_array():
+    """稠密桶删除到阈值以下后转回数组，结果不受影响"""
+    bitmap = RoaringBitmap(range(5000))
+    for value in range(10, 5000):
+        bitmap.discard(value)
+
+    assert list(bitmap) == list(range(10))
+    assert bitmap == RoaringBitmap(range(10))
+
+
+def test_operations_do_not_mutate_operands():
+    """运算返回新位图，操作数保持不变"""
+    a, b = RoaringBitmap([1, 2, 3]), RoaringBitmap([3, 4])
+    union = a | b
+    union.add(99)
+    (a - b).add(100)
+
+    assert list(a) == [1, 2, 3]
+    assert list(b) == [3, 4]
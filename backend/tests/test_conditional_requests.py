@@ -0,0 +1,125 @@
+"""
+条件请求测试
+测试 ETag / Last-Modified 验证器以及 If-None-Match / If-Modified-Since 返回 304
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.models.news import Category, News, Tag
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services.news_service import NewsService
+
+
+@pytest.fixture
+def news(db, test_user, test_category):
+    """一篇已发布新闻，更新时间固定为过去的时刻"""
+    news_in = NewsCreate(
+        title="Title", slug="title", content="content",
+        category_id=test_category.id, is_published=True,
+    )
+    news_id = NewsService.create(db, news_in=news_in, author_id=test_user.id).id
+    db.execute(update(News).where(News.id == news_id).values(updated_at=datetime(2026, 1, 1, 8, 30)))
+    db.commit()
+    return news_id
+
+
+@pytest.mark.news
+def test_detail_validators(client: TestClient, news):
+    """详情响应携带 ETag 和 Last-Modified"""
+    response = client.get(f"/api/v1/news/{news}")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["last-modified"] == "Thu, 01 Jan 2026 08:30:00 GMT"
+
+
+@pytest.mark.news
+def test_detail_not_modified_skips_loading(client: TestClient, news, count_queries, view_counter):
+    """If-None-Match 命中时返回 304，不加载新闻，浏览次数照常增加"""
+    etag = client.get(f"/api/v1/news/{news}").headers["etag"]
+
+    with count_queries() as counter:
+        response = client.get(f"/api/v1/news/{news}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert not any("news.content" in sql for sql in counter.statements)
+    assert view_counter.pending(news) == 2
+
+
+@pytest.mark.news
+def test_detail_if_modified_since(client: TestClient, news):
+    """If-Modified-Since 不早于最后修改时间时返回 304"""
+    url = f"/api/v1/news/{news}"
+
+    assert client.get(url, headers={"If-Modified-Since": "Thu, 01 Jan 2026 08:30:00 GMT"}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": "Thu, 01 Jan 2026 08:29:59 GMT"}).status_code == 200
+    assert client.get(url, headers={"If-Modified-Since": "not a date"}).status_code == 200
+    # 同时存在时以 If-None-Match 为准
+    assert client.get(url, headers={
+        "If-None-Match": '"other"', "If-Modified-Since": "Thu, 01 Jan 2026 08:30:00 GMT",
+    }).status_code == 200
+
+
+@pytest.mark.news
+def test_detail_etag_follows_edits_not_views(client: TestClient, db, news):
+    """浏览不改变 ETag，编辑正文或标签后 ETag 改变"""
+    first = client.get(f"/api/v1/news/{news}").headers["etag"]
+    assert client.get(f"/api/v1/news/{news}").headers["etag"] == first
+
+    NewsService.update(db, news, NewsUpdate(title="Edited"))
+    edited = client.get(f"/api/v1/news/{news}").headers["etag"]
+    assert edited != first
+
+    db.execute(update(News).where(News.id == news).values(updated_at=datetime(2026, 1, 2)))
+    db.commit()
+    dated = client.get(f"/api/v1/news/{news}").headers["etag"]
+    tag = Tag(name="ai", slug="ai")
+    db.add(tag)
+    db.commit()
+    NewsService.add_tags_to_news(db, news, [tag.id])
+    assert client.get(f"/api/v1/news/{news}").headers["etag"] != dated
+
+
+@pytest.mark.news
+def test_missing_news_is_not_found(client: TestClient, db):
+    """不存在的新闻即使带有 If-None-Match 也返回 404"""
+    response = client.get("/api/v1/news/999", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.news
+def test_list_not_modified(client: TestClient, db, test_user, test_category, news):
+    """列表 ETag 命中时返回 304，内容变化后 ETag 改变"""
+    etag = client.get("/api/v1/news/").headers["etag"]
+
+    assert client.get("/api/v1/news/", headers={"If-None-Match": etag}).status_code == 304
+
+    news_in = NewsCreate(title="New", slug="new", content="content", category_id=test_category.id, is_published=True)
+    NewsService.create(db, news_in=news_in, author_id=test_user.id)
+    response = client.get("/api/v1/news/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.news
+@pytest.mark.parametrize("path", ["/api/v1/news/categories/", "/api/v1/news/tags/"])
+def test_categories_and_tags_not_modified(client: TestClient, db, test_category, path):
+    """分类与标签列表支持条件请求，新增后验证器改变"""
+    db.add(Tag(name="ai", slug="ai"))
+    db.commit()
+    first = client.get(path)
+    etag = first.headers["etag"]
+    assert "last-modified" in first.headers
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    db.add(Tag(name="chip", slug="chip"))
+    db.add(Category(name="体育", slug="sports", is_active=True))
+    db.commit()
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
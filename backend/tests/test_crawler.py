@@ -0,0 +1,260 @@
+"""
+来源抓取测试
+用本地 HTTP 服务器（HTTP/1.1 keep-alive）代替外部来源：增量解析、首次抓取写入新闻、
+条件请求得到 304 时不再写入、新条目单独写入、错误来源记录状态、每主机并发上限与连接复用，
+以及来源管理接口
+"""
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.security import create_access_token
+from app.models.news import News
+from app.models.source import Source
+from app.models.user import User
+from app.services.crawler import CrawlSource, FeedParser, crawl_sources, entry_slug
+
+
+def rss(items) -> bytes:
+    entries = "".join(
+        f"<item><title>{title}</title><link>https://example.com/{guid}</link><guid>{guid}</guid>"
+        f"<description>&lt;p&gt;{title} 摘要&lt;/p&gt;</description>"
+        f'<enclosure url="https://example.com/{guid}.jpg" type="image/jpeg"/></item>'
+        for guid, title in items
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'.encode()
+
+
+def atom(items) -> bytes:
+    entries = "".join(
+        f'<entry><id>urn:{guid}</id><title>{title}</title><link href="https://example.com/{guid}"/>'
+        f'<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>{title} 正文</p></div></content></entry>'
+        for guid, title in items
+    )
+    return f'<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>{entries}</feed>'.encode()
+
+
+class FeedServer(ThreadingHTTPServer):
+    """
+    本地订阅源服务器：feeds 为 路径 -> 响应体，内容变化时 ETag / Last-Modified 随之变化；
+    记录收到的请求、同时处理中的最大请求数和客户端连接数
+    """
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.feeds = {}
+        self.versions = {}
+        self.delay = delay
+        self.requests = []
+        self.connections = set()
+        self.active = self.max_active = 0
+        self.lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+    def publish(self, path: str, body: bytes) -> None:
+        self.feeds[path] = body
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+            server.connections.add(self.client_address)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            body = server.feeds.get(self.path)
+            if body is None:
+                self._send(404, b"")
+                return
+            version = server.versions[self.path]
+            etag = f'"v{version}"'
+            last_modified = formatdate(1_700_000_000 + version, usegmt=True)
+            if self.path.endswith(".atom"):
+                # Atom 来源只提供 Last-Modified
+                headers = {"Last-Modified": last_modified}
+                fresh = self.headers.get("If-Modified-Since") == last_modified
+            else:
+                headers = {"ETag": etag}
+                fresh = self.headers.get("If-None-Match") == etag
+            if fresh:
+                self._send(304, b"", headers)
+            else:
+                self._send(200, body, {"Content-Type": "application/xml", **headers})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, code: int, body: bytes, headers=None) -> None:
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def admin(db):
+    user = User(
+        email="admin@example.com", username="admin", hashed_password="x",
+        is_active=True, is_superuser=True, is_verified=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _add_sources(db, server, author, category, paths):
+    sources = [
+        Source(name=path, url=server.url(path), category_id=category.id, author_id=author.id)
+        for path in paths
+    ]
+    db.add_all(sources)
+    db.commit()
+    return sources
+
+
+def _news_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(News))
+
+
+def test_parser_is_incremental():
+    """逐字节喂入与一次喂入结果相同；条目字段来自 RSS 和 Atom 的对应元素"""
+    source = CrawlSource(id=7, url="", category_id=3, author_id=1, etag=None, last_modified=None, error_count=0)
+    document = rss([("a", "第一条"), ("b", "第二条")])
+
+    whole = FeedParser(source)
+    rows = whole.feed(document) + whole.close()
+    chunked = FeedParser(source)
+    pieces = [row for byte in document for row in chunked.feed(bytes([byte]))] + chunked.close()
+
+    assert pieces == rows
+    assert rows[0] == {
+        "title": "第一条",
+        "slug": entry_slug(7, "a"),
+        "summary": "第一条 摘要",
+        "content": "<p>第一条 摘要</p>",
+        "cover_image": "https://example.com/a.jpg",
+        "category_id": 3,
+        "is_published": True,
+    }
+
+    parser = FeedParser(source)
+    [entry] = parser.feed(atom([("c", "第三条")])) + parser.close()
+    assert entry["slug"] == entry_slug(7, "urn:c")
+    assert entry["content"] == "<p>第三条 正文</p>"
+
+
+@pytest.mark.news
+def test_conditional_crawl(db, feed_server, test_user, test_category):
+    """首次抓取写入所有条目；内容未变时得到 304，不再写入；新增条目后只写入新条目"""
+    feed_server.publish("/news.rss", rss([("a", "第一条"), ("b", "第二条")]))
+    feed_server.publish("/news.atom", atom([("c", "第三条")]))
+    rss_source, atom_source = _add_sources(db, feed_server, test_user, test_category, ["/news.rss", "/news.atom"])
+
+    first = crawl_sources(db)
+    assert (first.sources, first.fetched, first.created, first.failed) == (2, 2, 3, 0)
+    assert _news_count(db) == 3
+    db.refresh(rss_source)
+    assert (rss_source.etag, rss_source.last_status) == ('"v1"', 200)
+
+    second = crawl_sources(db)
+    assert (second.not_modified, second.entries, second.created) == (2, 0, 0)
+    assert ("/news.rss", '"v1"', None) in feed_server.requests
+    assert any(path == "/news.atom" and since for path, _, since in feed_server.requests)
+
+    feed_server.publish("/news.rss", rss([("d", "第四条"), ("a", "第一条"), ("b", "第二条")]))
+    third = crawl_sources(db)
+    assert (third.fetched, third.not_modified, third.entries, third.created, third.skipped) == (1, 1, 3, 1, 2)
+    news = db.scalar(select(News).where(News.slug == entry_slug(rss_source.id, "d")))
+    assert (news.title, news.author_id, news.category_id, news.is_published) == ("第四条", test_user.id, test_category.id, True)
+
+
+@pytest.mark.news
+def test_failed_sources_keep_validators(db, feed_server, test_user, test_category):
+    """无法解析或 HTTP 错误的来源记录错误、累计失败次数，其他来源照常写入"""
+    feed_server.publish("/ok.rss", rss([("a", "第一条")]))
+    feed_server.publish("/broken.rss", b"<rss><channel><item><title>x</title>")
+    ok, broken, missing = _add_sources(db, feed_server, test_user, test_category, ["/ok.rss", "/broken.rss", "/missing.rss"])
+
+    crawl_sources(db)
+    result = crawl_sources(db)
+
+    assert (result.failed, result.not_modified) == (2, 1)
+    db.expire_all()
+    assert (broken.error_count, broken.etag) == (2, None)
+    assert "解析" in broken.last_error
+    assert (missing.last_status, missing.error_count) == (404, 2)
+    assert (ok.error_count, ok.last_error) == (0, None)
+    assert _news_count(db) == 1
+
+
+@pytest.mark.news
+def test_per_host_limit_and_connection_reuse(db, feed_server, test_user, test_category, monkeypatch):
+    """同一主机同时最多 CRAWLER_PER_HOST_CONNECTIONS 个请求，连接保持并复用"""
+    monkeypatch.setattr("app.core.config.settings.CRAWLER_PER_HOST_CONNECTIONS", 2)
+    feed_server.delay = 0.05
+    paths = [f"/{i}.rss" for i in range(10)]
+    for i, path in enumerate(paths):
+        feed_server.publish(path, rss([(f"{i}", f"条目{i}")]))
+    _add_sources(db, feed_server, test_user, test_category, paths)
+
+    result = crawl_sources(db)
+
+    assert (result.fetched, result.created) == (10, 10)
+    assert feed_server.max_active == 2
+    assert len(feed_server.connections) <= 2
+
+
+@pytest.mark.news
+def test_source_api(client: TestClient, db, admin, test_user, test_category, feed_server):
+    """管理员管理来源并手动触发抓取；其他用户 403"""
+    feed_server.publish("/news.rss", rss([("a", "第一条")]))
+    headers = {"Authorization": f"Bearer {create_access_token(subject=admin.id)}"}
+    payload = {"name": "示例", "url": feed_server.url("/news.rss"), "category_id": test_category.id}
+
+    created = client.post("/api/v1/sources/", headers=headers, json=payload)
+    assert created.status_code == 200
+    assert created.json()["author_id"] == admin.id
+    assert client.post("/api/v1/sources/", headers=headers, json=payload).status_code == 400
+
+    crawled = client.post("/api/v1/sources/crawl", headers=headers)
+    assert crawled.json()["created"] == 1
+    [source] = client.get("/api/v1/sources/", headers=headers).json()
+    assert (source["last_status"], source["etag"]) == (200, '"v1"')
+
+    updated = client.put(f"/api/v1/sources/{source['id']}", headers=headers, json={"url": feed_server.url("/other.rss")})
+    assert (updated.json()["etag"], updated.json()["url"]) == (None, feed_server.url("/other.rss"))
+    assert client.delete(f"/api/v1/sources/{source['id']}", headers=headers).status_code == 200
+    assert client.get("/api/v1/sources/", headers=headers).json() == []
+
+    user_headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.id)}"}
+    assert client.get("/api/v1/sources/", headers=user_headers).status_code == 403
+    assert client.post("/api/v1/sources/crawl", headers=user_headers).status_code == 403
@@ -0,0 +1,182 @@
+"""
+近似重复检测测试
+签名相似度、入库时标记或拒绝、批量导入（含批次内重复）、删除原稿后的改指向、
+以及已有数据的批量聚类（进程池）
+"""
+import random
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.news import News, NewsSignature
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services.dedup import cluster, deduplicate_corpus, signature, similarity
+from app.services.news_service import NewsService
+
+
+def _text(seed: int, length: int = 400) -> str:
+    rng = random.Random(seed)
+    return "".join(chr(rng.randrange(0x4E00, 0x4E00 + 3000)) for _ in range(length))
+
+
+STORY = _text(1)
+# 转载稿：标点、空白不同，结尾多一句编者按
+REPRINT = "，".join(STORY[i:i + 50] for i in range(0, len(STORY), 50)) + "（来源：通讯社）"
+
+
+def _create(db, user, category, slug, content, title="快讯"):
+    return NewsService.create(db, NewsCreate(
+        title=title, slug=slug, content=content, category_id=category.id, is_published=True,
+    ), author_id=user.id)
+
+
+def test_signature_similarity():
+    """转载稿的相似度高，无关稿件接近 0；没有文字时不计算签名"""
+    story = signature("快讯", STORY)
+
+    assert similarity(story, signature("快讯", REPRINT)) >= settings.NEWS_DEDUP_THRESHOLD
+    assert similarity(story, signature("快讯", " \n".join(STORY))) == 1
+    assert similarity(story, signature("快讯", _text(2))) < 0.2
+    assert signature("……", "  ！") is None
+
+
+@pytest.mark.news
+def test_flag_on_create(client: TestClient, db, test_user, test_category):
+    """flag 模式：近似重复照常保存，duplicate_of_id 指向原稿"""
+    original = _create(db, test_user, test_category, "original", STORY)
+    reprint = _create(db, test_user, test_category, "reprint", REPRINT, title="转载")
+    other = _create(db, test_user, test_category, "other", _text(2))
+
+    assert original.duplicate_of_id is None
+    assert reprint.duplicate_of_id == original.id
+    assert other.duplicate_of_id is None
+    assert db.scalar(select(func.count()).select_from(NewsSignature)) == 3
+    assert client.get(f"/api/v1/news/{reprint.id}").json()["duplicate_of_id"] == original.id
+
+
+@pytest.mark.news
+def test_reject_on_create(db, test_user, test_category, monkeypatch):
+    """reject 模式：近似重复返回 409，不写入"""
+    monkeypatch.setattr(settings, "NEWS_DEDUP_MODE", "reject")
+    original = _create(db, test_user, test_category, "original", STORY)
+
+    with pytest.raises(HTTPException) as error:
+        _create(db, test_user, test_category, "reprint", REPRINT)
+
+    assert error.value.status_code == 409
+    assert str(original.id) in error.value.detail
+    assert NewsService.get_by_slug(db, "reprint") is None
+
+
+@pytest.mark.news
+def test_bulk_flags_existing_and_in_batch_duplicates(db, test_user, test_category):
+    """批量导入：与已有原稿或批次内先出现的原稿近似重复的条目都被标记"""
+    original = _create(db, test_user, test_category, "original", STORY)
+    other = _text(3)
+
+    results = NewsService.bulk_create(db, [
+        {"title": "转载", "slug": "reprint", "content": REPRINT, "category_id": test_category.id},
+        {"title": "新稿", "slug": "new", "content": other, "category_id": test_category.id},
+        {"title": "新稿", "slug": "new-copy", "content": other + "。", "category_id": test_category.id},
+    ], author_id=test_user.id)
+
+    assert [result.status for result in results] == ["created"] * 3
+    duplicate_of = dict(db.execute(select(News.slug, News.duplicate_of_id)).all())
+    assert duplicate_of == {"original": None, "reprint": original.id, "new": None, "new-copy": results[1].id}
+
+
+@pytest.mark.news
+def test_bulk_reject(db, test_user, test_category, monkeypatch):
+    """reject 模式下批量导入的重复条目返回 duplicate"""
+    monkeypatch.setattr(settings, "NEWS_DEDUP_MODE", "reject")
+    original = _create(db, test_user, test_category, "original", STORY)
+    other = _text(3)
+
+    results = NewsService.bulk_create(db, [
+        {"title": "转载", "slug": "reprint", "content": REPRINT, "category_id": test_category.id},
+        {"title": "新稿", "slug": "new", "content": other, "category_id": test_category.id},
+        {"title": "新稿", "slug": "new-copy", "content": other, "category_id": test_category.id},
+    ], author_id=test_user.id)
+
+    assert [(result.status, result.id) for result in results] == [
+        ("duplicate", original.id), ("created", results[1].id), ("duplicate", None),
+    ]
+    assert "new" in results[2].detail
+
+
+@pytest.mark.news
+def test_delete_original_promotes_earliest_duplicate(db, test_user, test_category, dedup_index):
+    """删除原稿后，最早的重复稿成为原稿，其余改为指向它，后续转载与新原稿比较"""
+    original = _create(db, test_user, test_category, "original", STORY)
+    first = _create(db, test_user, test_category, "first", REPRINT)
+    second = _create(db, test_user, test_category, "second", STORY + "。")
+
+    NewsService.delete(db, original.id)
+
+    db.expire_all()
+    assert db.get(News, first.id).duplicate_of_id is None
+    assert db.get(News, second.id).duplicate_of_id == first.id
+    assert original.id not in dedup_index._index
+    assert _create(db, test_user, test_category, "third", STORY).duplicate_of_id == first.id
+
+
+@pytest.mark.news
+def test_update_resigns_original(db, test_user, test_category):
+    """原稿正文修改后按新正文比较"""
+    original = _create(db, test_user, test_category, "original", STORY)
+    NewsService.update(db, original.id, NewsUpdate(content=_text(4)))
+
+    assert _create(db, test_user, test_category, "old-story", STORY).duplicate_of_id is None
+    assert _create(db, test_user, test_category, "new-story", _text(4)).duplicate_of_id == original.id
+
+
+@pytest.mark.news
+def test_rebuild_loads_originals_only(db, test_user, test_category, dedup_index):
+    """重建时只加载原稿；catch_up 加载之后写入的原稿"""
+    original = _create(db, test_user, test_category, "original", STORY)
+    _create(db, test_user, test_category, "reprint", REPRINT)
+
+    dedup_index.rebuild(db)
+    assert len(dedup_index) == 1
+    assert dedup_index.check(signature("快讯", STORY))[0] == original.id
+
+    dedup_index.clear()
+    dedup_index.rebuild(db)
+    other = _create(db, test_user, test_category, "other", _text(2))
+    dedup_index.clear()
+    dedup_index.catch_up(db)
+    assert len(dedup_index) == 2
+    assert dedup_index.check(signature("快讯", _text(2)))[0] == other.id
+
+
+def test_cluster_uses_connected_components():
+    """批量聚类：同一连通分量的新闻指向分量内最小的ID"""
+    values = np.stack([signature("", _text(seed)) for seed in range(5)])
+    values[3] = values[1]
+    values[4] = values[3]
+    roots = cluster(np.array([50, 10, 30, 40, 20]), values, 0.8)
+
+    assert roots.tolist() == [50, 10, 30, 10, 10]
+
+
+@pytest.mark.news
+def test_deduplicate_existing_corpus(db, test_user, test_category, monkeypatch):
+    """批量去重：为没有签名的新闻计算签名（进程池），再按聚类结果写回 duplicate_of_id"""
+    monkeypatch.setattr(settings, "NEWS_DEDUP_MODE", "off")
+    ids = [
+        _create(db, test_user, test_category, slug, content).id
+        for slug, content in [("a", STORY), ("b", _text(2)), ("c", REPRINT), ("d", "……"), ("e", _text(2) + "。")]
+    ]
+    assert db.scalar(select(func.count()).select_from(NewsSignature)) == 0
+
+    computed, duplicates = deduplicate_corpus(db, workers=2, batch_size=2)
+
+    assert (computed, duplicates) == (5, 2)
+    duplicate_of = dict(db.execute(select(News.id, News.duplicate_of_id)).all())
+    assert duplicate_of == {ids[0]: None, ids[1]: None, ids[2]: ids[0], ids[3]: None, ids[4]: ids[1]}
+    # 再次运行只补算缺失的签名，结果不变
+    assert deduplicate_corpus(db, workers=1) == (0, 2)
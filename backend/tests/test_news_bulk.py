@@ -0,0 +1,162 @@
+"""
+批量导入测试
+逐条结果、批次内与已有 slug 冲突、NDJSON 分批、索引与列表同步；
+设置 TEST_POSTGRES_URL 后同时验证 PostgreSQL 的 COPY 写入
+"""
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.base import Base
+from app.models.news import Category, News, NewsTag, Tag
+from app.models.user import User
+from app.schemas.news import NewsCreate
+from app.services.news_service import NewsService
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.fixture
+def admin(db):
+    user = User(
+        email="admin@example.com", username="admin", hashed_password="x",
+        is_active=True, is_superuser=True, is_verified=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def headers(admin):
+    return {"Authorization": f"Bearer {create_access_token(subject=admin.id)}"}
+
+
+@pytest.fixture
+def tag(db):
+    tag = Tag(name="ai", slug="ai")
+    db.add(tag)
+    db.commit()
+    return tag
+
+
+def _item(slug, category_id, **extra):
+    return {
+        "title": f"Rust {slug}", "slug": slug, "content": "content",
+        "category_id": category_id, "is_published": True, **extra,
+    }
+
+
+@pytest.mark.news
+def test_bulk_results_per_item(client: TestClient, db, headers, admin, test_category, tag):
+    """每一条返回结果，失败的条目不影响其他条目"""
+    NewsService.create(db, NewsCreate(**_item("existing", test_category.id)), author_id=admin.id)
+    payload = [
+        _item("a", test_category.id, tag_ids=[tag.id, tag.id]),
+        _item("a", test_category.id),
+        _item("existing", test_category.id),
+        {"title": "missing content", "slug": "b", "category_id": test_category.id},
+        _item("c", 999),
+        _item("d", test_category.id, tag_ids=[999]),
+        _item("e", test_category.id),
+    ]
+
+    response = client.post("/api/v1/news/bulk", headers=headers, json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(item["index"], item["status"]) for item in body["items"]] == [
+        (0, "created"), (1, "conflict"), (2, "conflict"), (3, "invalid"),
+        (4, "invalid"), (5, "invalid"), (6, "created"),
+    ]
+    assert body["created"] == 2 and body["failed"] == 5
+    assert body["items"][3]["detail"].startswith("content")
+
+    created = db.get(News, body["items"][0]["id"])
+    assert created.author_id == admin.id
+    assert [t.slug for t in created.tags] == ["ai"]
+    assert db.scalar(select(func.count()).select_from(News)) == 3
+
+
+@pytest.mark.news
+def test_bulk_is_visible_to_reads(client: TestClient, headers, test_category, tag):
+    """导入后列表总数、标签过滤与全文检索都能看到新条目"""
+    listing = client.get("/api/v1/news/")
+    assert listing.json()["total"] == 0
+
+    client.post("/api/v1/news/bulk", headers=headers, json=[
+        _item(f"news-{i}", test_category.id, tag_ids=[tag.id] if i % 2 else []) for i in range(4)
+    ])
+
+    assert client.get("/api/v1/news/").json()["total"] == 4
+    assert client.get("/api/v1/news/", params={"tag_ids": tag.id}).json()["total"] == 2
+    assert client.get("/api/v1/news/", params={"q": "news-3"}).json()["items"][0]["slug"] == "news-3"
+
+
+@pytest.mark.news
+def test_bulk_ndjson_batches(client: TestClient, db, headers, test_category, monkeypatch, count_queries):
+    """NDJSON 按批写入，每批只做一次 slug 查询，无法解析的行作为失败条目返回"""
+    monkeypatch.setattr(settings, "NEWS_BULK_BATCH_SIZE", 2)
+    lines = [json.dumps(_item(f"n{i}", test_category.id)) for i in range(4)]
+    lines.insert(2, "{not json")
+    body = "\n".join(lines) + "\n\n"
+
+    with count_queries() as counter:
+        response = client.post(
+            "/api/v1/news/bulk", headers={**headers, "Content-Type": "application/x-ndjson"}, content=body,
+        )
+
+    items = response.json()["items"]
+    assert [item["index"] for item in items] == [0, 1, 2, 3, 4]
+    assert [item["status"] for item in items] == ["created", "created", "invalid", "created", "created"]
+    slug_checks = [sql for sql in counter.statements if sql.startswith("SELECT news.slug")]
+    assert len(slug_checks) == 3
+    assert db.scalar(select(func.count()).select_from(News)) == 4
+
+
+@pytest.mark.news
+def test_bulk_requires_superuser_and_array(client: TestClient, headers, test_user, test_category):
+    """普通用户无权导入；请求体不是数组时返回 400"""
+    user_headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.id)}"}
+
+    assert client.post("/api/v1/news/bulk", headers=user_headers, json=[]).status_code == 403
+    assert client.post("/api/v1/news/bulk", headers=headers, json={"slug": "x"}).status_code == 400
+    assert client.post("/api/v1/news/bulk", headers=headers, json=[]).json() == {
+        "created": 0, "failed": 0, "items": [],
+    }
+
+
+@pytest.mark.news
+def test_bulk_copy_on_postgresql():
+    """PostgreSQL 使用 COPY 写入，触发器照常维护全文向量"""
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL 未设置")
+    engine = create_engine(TEST_POSTGRES_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        with sessionmaker(bind=engine)() as db:
+            db.add_all([
+                User(id=1, email="a@example.com", username="a", hashed_password="x",
+                     is_active=True, is_superuser=True, is_verified=True),
+                Category(id=1, name="tech", slug="tech", is_active=True),
+                Tag(id=1, name="ai", slug="ai"),
+            ])
+            db.commit()
+
+            results = NewsService.bulk_create(db, [
+                _item("a", 1, tag_ids=[1]), _item("b", 1), _item("a", 1),
+            ], author_id=1)
+
+            assert [item.status for item in results] == ["created", "created", "conflict"]
+            assert db.scalars(select(NewsTag.news_id)).all() == [results[0].id]
+            assert db.scalar(text("SELECT count(*) FROM news WHERE search_vector IS NOT NULL")) == 2
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
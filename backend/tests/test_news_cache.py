@@ -0,0 +1,139 @@
+"""
+新闻列表缓存测试
+使用进程内缓存替身测试命中、键规范化以及按全局/分类/标签代数失效
+"""
+import pytest
+import redis
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.news import Category, Tag
+from app.schemas.news import NewsCreate, NewsUpdate, NewsSearch
+from app.services.news_cache import news_list_cache
+from app.services.news_service import NewsService
+
+
+def _create_news(db, author, category, slug, tag_ids=()):
+    news_in = NewsCreate(
+        title=f"News {slug}", slug=slug, content="content",
+        category_id=category.id, is_published=True, tag_ids=list(tag_ids),
+    )
+    return NewsService.create(db, news_in=news_in, author_id=author.id)
+
+
+def _slugs(client, **params):
+    response = client.get("/api/v1/news/", params=params)
+    assert response.status_code == 200
+    return [item["slug"] for item in response.json()["items"]]
+
+
+@pytest.fixture
+def sports(db):
+    """第二个分类"""
+    category = Category(name="体育", slug="sports", is_active=True)
+    db.add(category)
+    db.commit()
+    return category
+
+
+@pytest.mark.news
+def test_cache_hit_skips_database(client: TestClient, db, test_user, test_category, count_queries):
+    """相同查询第二次直接返回缓存的响应体"""
+    _create_news(db, test_user, test_category, "a")
+    first = client.get("/api/v1/news/", params={"size": 5})
+
+    with count_queries() as counter:
+        second = client.get("/api/v1/news/", params={"size": 5})
+
+    assert counter.count == 0
+    assert second.content == first.content
+    assert second.headers["content-type"] == "application/json"
+
+
+@pytest.mark.news
+def test_equivalent_queries_share_key():
+    """关键词大小写与空白、标签顺序不影响缓存键"""
+    key, _ = news_list_cache.get(NewsSearch(q="  Rust  News", tag_ids=[3, 1]))
+    same, _ = news_list_cache.get(NewsSearch(q="rust news", tag_ids=[1, 3, 3]))
+    other, _ = news_list_cache.get(NewsSearch(q="rust news", tag_ids=[1, 3], tag_match="all"))
+
+    assert key == same
+    assert key != other
+
+
+@pytest.mark.news
+def test_writes_invalidate_listing(client: TestClient, db, test_user, test_category):
+    """新增、修改、删除后列表立即反映变化"""
+    first = _create_news(db, test_user, test_category, "a")
+    assert _slugs(client) == ["a"]
+
+    second = _create_news(db, test_user, test_category, "b")
+    assert _slugs(client) == ["b", "a"]
+
+    NewsService.update(db, second.id, NewsUpdate(is_published=False))
+    assert _slugs(client) == ["a"]
+
+    NewsService.delete(db, first.id)
+    assert _slugs(client) == []
+
+
+@pytest.mark.news
+def test_category_invalidation_is_scoped(client: TestClient, db, test_user, test_category, sports):
+    """写入一个分类不会使其他分类的列表失效；移出分类时原分类失效"""
+    _create_news(db, test_user, test_category, "tech")
+    moved = _create_news(db, test_user, sports, "sports")
+    _slugs(client, category_id=test_category.id)
+    _slugs(client, category_id=sports.id)
+    sports_key, _ = news_list_cache.get(NewsSearch(category_id=sports.id))
+
+    _create_news(db, test_user, test_category, "tech-2")
+
+    key, body = news_list_cache.get(NewsSearch(category_id=sports.id))
+    assert key == sports_key
+    assert body is not None
+    assert _slugs(client, category_id=test_category.id) == ["tech-2", "tech"]
+
+    NewsService.update(db, moved.id, NewsUpdate(category_id=test_category.id))
+    assert _slugs(client, category_id=sports.id) == []
+
+
+@pytest.mark.news
+def test_tag_invalidation(client: TestClient, db, test_user, test_category):
+    """标签变更使新旧标签的列表失效"""
+    ai, chip = Tag(name="ai", slug="ai"), Tag(name="chip", slug="chip")
+    db.add_all([ai, chip])
+    db.commit()
+    news = _create_news(db, test_user, test_category, "a", tag_ids=[ai.id])
+    assert _slugs(client, tag_ids=ai.id) == ["a"]
+    assert _slugs(client, tag_ids=chip.id) == []
+
+    NewsService.update(db, news.id, NewsUpdate(tag_ids=[chip.id]))
+
+    assert _slugs(client, tag_ids=ai.id) == []
+    assert _slugs(client, tag_ids=chip.id) == ["a"]
+
+
+@pytest.mark.news
+def test_cache_can_be_disabled(client: TestClient, db, test_user, test_category, list_cache, monkeypatch):
+    """过期时间为 0 时不缓存"""
+    monkeypatch.setattr(settings, "NEWS_LIST_CACHE_TTL_SECONDS", 0)
+    _create_news(db, test_user, test_category, "a")
+
+    _slugs(client)
+
+    assert not any(key.startswith("news:list:") for key in list_cache._data)
+
+
+@pytest.mark.news
+def test_unavailable_cache_falls_back_to_database(client: TestClient, db, test_user, test_category, monkeypatch):
+    """缓存服务不可用时直接查询数据库"""
+    class BrokenCache:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise redis.ConnectionError("down")
+            return fail
+
+    monkeypatch.setattr(news_list_cache, "_client", BrokenCache())
+    _create_news(db, test_user, test_category, "a")
+
+    assert _slugs(client) == ["a"]
@@ -0,0 +1,135 @@
+"""
+新闻导出测试
+NDJSON/CSV 流式输出、过滤条件与断点续传、按批读取；
+设置 TEST_POSTGRES_URL 后同时验证 PostgreSQL 服务端游标
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token
+from app.models.base import Base
+from app.models.news import Category, News, Tag
+from app.models.user import User
+from app.schemas.news import NewsExportParams
+from app.services.news_export import EXPORT_FIELDS, NewsExporter
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def _seed(db, count=5):
+    """写入管理员、两个分类和若干新闻（奇数 id 已发布，id 1 带标签）"""
+    db.add_all([
+        User(id=1, email="admin@example.com", username="admin", hashed_password="x",
+             is_active=True, is_superuser=True, is_verified=True),
+        Category(id=1, name="tech", slug="tech", is_active=True),
+        Category(id=2, name="biz", slug="biz", is_active=True),
+    ])
+    tags = [Tag(name="ml", slug="ml"), Tag(name="ai", slug="ai")]
+    db.add_all(tags)
+    db.flush()
+    for i in range(1, count + 1):
+        db.add(News(
+            id=i, title=f"新闻 {i}", slug=f"news-{i}", content=f"content, \"{i}\"\nline",
+            is_published=bool(i % 2), author_id=1, category_id=1 if i <= 3 else 2,
+            tags=tags if i == 1 else [],
+        ))
+    db.commit()
+    db.execute(update(News).values(created_at=datetime(2026, 1, 1)).where(News.id <= 2))
+    db.execute(update(News).values(created_at=datetime(2026, 3, 1)).where(News.id > 2))
+    db.commit()
+
+
+@pytest.fixture
+def headers(db):
+    _seed(db)
+    return {"Authorization": f"Bearer {create_access_token(subject=1)}"}
+
+
+@pytest.mark.news
+def test_export_ndjson(client: TestClient, headers):
+    """NDJSON 每行一条新闻，按 id 升序，包含标签"""
+    response = client.get("/api/v1/news/export", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert rows[0]["title"] == "新闻 1" and rows[0]["tags"] == ["ai", "ml"]
+    assert rows[1]["tags"] == []
+    assert rows[0]["created_at"].startswith("2026-01-01")
+
+
+@pytest.mark.news
+def test_export_filters_and_resume(client: TestClient, headers):
+    """分类、发布状态、时间范围过滤，after_id 从断点继续"""
+    def ids(**params):
+        response = client.get("/api/v1/news/export", headers=headers, params=params)
+        return [json.loads(line)["id"] for line in response.text.splitlines()]
+
+    assert ids(category_id=2) == [4, 5]
+    assert ids(is_published=True) == [1, 3, 5]
+    assert ids(created_from="2026-02-01T00:00:00") == [3, 4, 5]
+    assert ids(created_to="2026-02-01T00:00:00") == [1, 2]
+    assert ids(after_id=3) == [4, 5]
+    assert ids(after_id=2, is_published=True) == [3, 5]
+
+
+@pytest.mark.news
+def test_export_csv(client: TestClient, headers):
+    """CSV 带表头，字段中的逗号、引号和换行正确转义，标签以 | 分隔"""
+    response = client.get("/api/v1/news/export", headers=headers, params={"format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="news.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert rows[0]["content"] == 'content, "1"\nline'
+    assert rows[0]["tags"] == "ai|ml"
+
+
+@pytest.mark.news
+def test_export_requires_superuser(client: TestClient, db, test_user):
+    user_headers = {"Authorization": f"Bearer {create_access_token(subject=test_user.id)}"}
+
+    assert client.get("/api/v1/news/export", headers=user_headers).status_code == 403
+    assert client.get("/api/v1/news/export").status_code == 401
+
+
+@pytest.mark.news
+def test_export_reads_in_batches(db, count_queries):
+    """每批只查询一次标签，批大小决定每段输出的条数"""
+    _seed(db, count=7)
+
+    with count_queries() as counter:
+        chunks = list(NewsExporter.stream(db, NewsExportParams(), batch_size=3))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [3, 3, 1]
+    assert counter.count == 4
+
+
+@pytest.mark.news
+def test_export_server_side_cursor_on_postgresql():
+    """PostgreSQL 上游标未读完时在同一事务中查询标签"""
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL 未设置")
+    engine = create_engine(TEST_POSTGRES_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        with sessionmaker(bind=engine)() as db:
+            _seed(db, count=7)
+            batches = list(NewsExporter.iter_batches(db, NewsExportParams(after_id=1), batch_size=2))
+
+            assert [[item["id"] for item in batch] for batch in batches] == [[2, 3], [4, 5], [6, 7]]
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
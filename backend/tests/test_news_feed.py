@@ -0,0 +1,128 @@
+"""
+订阅源测试
+RSS/Atom 内容、分类与标签范围、缓存命中时不查询数据库、相关新闻写入后重新生成
+"""
+from xml.etree import ElementTree
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.news import Category, Tag
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services.news_service import NewsService
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def news(db, test_user, test_category):
+    """科技分类两篇（一篇带 ai 标签）、财经分类一篇、一篇未发布"""
+    finance = Category(name="财经", slug="finance", is_active=True)
+    tag = Tag(name="人工智能", slug="ai")
+    db.add_all([finance, tag])
+    db.commit()
+
+    def create(slug, category_id, published=True, tag_ids=()):
+        return NewsService.create(db, NewsCreate(
+            title=f"标题 {slug}", slug=slug, summary=f"摘要 <{slug}>", content="正文",
+            category_id=category_id, is_published=published, tag_ids=list(tag_ids),
+        ), author_id=test_user.id)
+
+    create("tech-1", test_category.id, tag_ids=[tag.id])
+    create("tech-2", test_category.id)
+    create("finance-1", finance.id)
+    create("draft", test_category.id, published=False)
+    return {"finance": finance, "tag": tag}
+
+
+def _rss_links(response):
+    return [item.findtext("link") for item in ElementTree.fromstring(response.content).iter("item")]
+
+
+@pytest.mark.news
+def test_rss_feed(client: TestClient, news):
+    """全站 RSS 包含已发布新闻，按发布时间倒序，摘要经 XML 转义"""
+    response = client.get("/api/v1/feeds/rss")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/rss+xml; charset=utf-8"
+    channel = ElementTree.fromstring(response.content).find("channel")
+    assert channel.findtext("title") == settings.APP_NAME
+    items = channel.findall("item")
+    assert [item.findtext("title") for item in items] == ["标题 finance-1", "标题 tech-2", "标题 tech-1"]
+    assert items[2].findtext("link") == f"{settings.SITE_URL}/news/tech-1"
+    assert items[2].findtext("description") == "摘要 <tech-1>"
+    assert [c.text for c in items[2].findall("category")] == ["科技", "人工智能"]
+    assert b"&lt;tech-1&gt;" in response.content
+
+
+@pytest.mark.news
+def test_category_and_tag_feeds(client: TestClient, news):
+    """分类与标签订阅源按 slug 取范围，Atom 格式；不存在的 slug 返回 404"""
+    category = client.get("/api/v1/feeds/categories/tech/atom")
+    assert category.headers["content-type"] == "application/atom+xml; charset=utf-8"
+    feed = ElementTree.fromstring(category.content)
+    assert feed.findtext(f"{ATOM}title") == f"{settings.APP_NAME} - 科技"
+    assert [entry.findtext(f"{ATOM}id") for entry in feed.iter(f"{ATOM}entry")] == [
+        f"{settings.SITE_URL}/news/tech-2", f"{settings.SITE_URL}/news/tech-1",
+    ]
+    assert feed.find(f"{ATOM}entry/{ATOM}author").findtext(f"{ATOM}name") == "author"
+
+    assert _rss_links(client.get("/api/v1/feeds/tags/ai/rss")) == [f"{settings.SITE_URL}/news/tech-1"]
+    assert client.get("/api/v1/feeds/categories/missing/rss").status_code == 404
+    assert client.get("/api/v1/feeds/tags/missing/atom").status_code == 404
+    assert client.get("/api/v1/feeds/json").status_code == 422
+
+
+@pytest.mark.news
+def test_cached_feed_costs_no_queries(client: TestClient, news, count_queries):
+    """生成后的轮询不查询数据库，携带验证器时返回 304"""
+    first = client.get("/api/v1/feeds/categories/tech/rss")
+
+    with count_queries() as counter:
+        again = client.get("/api/v1/feeds/categories/tech/rss")
+        by_etag = client.get("/api/v1/feeds/categories/tech/rss", headers={"If-None-Match": first.headers["etag"]})
+        by_date = client.get(
+            "/api/v1/feeds/categories/tech/rss", headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+
+    assert counter.count == 0
+    assert again.content == first.content
+    assert by_etag.status_code == 304 and by_date.status_code == 304
+
+
+@pytest.mark.news
+def test_feed_regenerated_only_when_its_news_change(client: TestClient, db, news, test_category):
+    """其他分类的新闻写入不影响分类订阅源；本分类或标签的新闻变更后重新生成"""
+    tech = client.get("/api/v1/feeds/categories/tech/rss")
+    tag = client.get("/api/v1/feeds/tags/ai/rss")
+    everything = client.get("/api/v1/feeds/rss")
+
+    NewsService.update(db, 3, NewsUpdate(title="财经新标题"))
+
+    assert client.get("/api/v1/feeds/categories/tech/rss").headers["etag"] == tech.headers["etag"]
+    assert client.get("/api/v1/feeds/tags/ai/rss").headers["etag"] == tag.headers["etag"]
+    assert client.get("/api/v1/feeds/rss").headers["etag"] != everything.headers["etag"]
+
+    NewsService.update(db, 1, NewsUpdate(title="科技新标题"))
+
+    tech_items = ElementTree.fromstring(client.get("/api/v1/feeds/categories/tech/rss").content).iter("item")
+    assert "科技新标题" in [item.findtext("title") for item in tech_items]
+    assert client.get("/api/v1/feeds/tags/ai/rss").headers["etag"] != tag.headers["etag"]
+
+    NewsService.update(db, 4, NewsUpdate(is_published=True))
+
+    assert f"{settings.SITE_URL}/news/draft" in _rss_links(client.get("/api/v1/feeds/categories/tech/rss"))
+
+
+@pytest.mark.news
+def test_feed_without_cache(client: TestClient, news, monkeypatch, count_queries):
+    """关闭缓存时每次请求重新生成"""
+    monkeypatch.setattr(settings, "NEWS_FEED_CACHE_TTL_SECONDS", 0)
+    client.get("/api/v1/feeds/rss")
+
+    with count_queries() as counter:
+        response = client.get("/api/v1/feeds/rss")
+
+    assert response.status_code == 200 and counter.count > 0
@@ -0,0 +1,117 @@
+"""
+新闻分页测试
+测试游标分页与页码分页
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+
+from app.core.pagination import encode_cursor
+from app.models.news import News
+from app.schemas.news import NewsCreate, NewsSearch
+from app.services.news_service import NewsService
+
+
+def _create_news(db, author, category, index):
+    news_in = NewsCreate(
+        title=f"News {index}",
+        slug=f"news-{index}",
+        content="content",
+        category_id=category.id,
+        is_published=True,
+    )
+    return NewsService.create(db, news_in=news_in, author_id=author.id)
+
+
+def _explain(db, stmt):
+    """执行语句并返回 SQLite 实际执行的 SQL 的查询计划"""
+    captured = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured["sql"], captured["params"] = statement, parameters
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        db.execute(stmt).all()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    rows = db.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {captured['sql']}", captured["params"]
+    )
+    return " ".join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def feed(db, test_user, test_category):
+    """25 篇已发布新闻（创建时间相同，依靠 id 区分顺序）"""
+    return [_create_news(db, test_user, test_category, i) for i in range(25)]
+
+
+@pytest.mark.news
+def test_cursor_walk_returns_every_item_once(db, feed):
+    """沿游标翻页可以完整且不重复地遍历全部新闻"""
+    seen = []
+    result = NewsService.search_news(db, NewsSearch(size=10))
+    seen.extend(item.id for item in result.items)
+    for _ in range(10):
+        if not result.next_cursor:
+            break
+        result = NewsService.search_news(db, NewsSearch(size=10, cursor=result.next_cursor))
+        seen.extend(item.id for item in result.items)
+
+    assert seen == sorted((news.id for news in feed), reverse=True)
+
+
+@pytest.mark.news
+def test_cursor_is_stable_under_concurrent_inserts(db, feed, test_user, test_category):
+    """翻页过程中插入新文章不会造成重复或遗漏"""
+    first = NewsService.search_news(db, NewsSearch(size=10))
+    _create_news(db, test_user, test_category, "late")
+
+    second = NewsService.search_news(db, NewsSearch(size=10, cursor=first.next_cursor))
+
+    assert [item.id for item in second.items] == [news.id for news in reversed(feed)][10:20]
+
+
+@pytest.mark.news
+def test_page_mode_still_supported(db, feed):
+    """页码分页保持原有行为"""
+    result = NewsService.search_news(db, NewsSearch(page=3, size=10))
+
+    assert result.total == 25
+    assert result.pages == 3
+    assert [item.id for item in result.items] == [news.id for news in reversed(feed)][20:]
+    assert result.next_cursor is None
+
+
+@pytest.mark.news
+def test_get_multi_accepts_cursor(db, feed):
+    """get_multi 同样支持游标"""
+    page = NewsService.search_news(db, NewsSearch(size=5))
+
+    items = NewsService.get_multi(db, limit=5, cursor=page.next_cursor)
+
+    assert [item.id for item in items] == [news.id for news in reversed(feed)][5:10]
+
+
+@pytest.mark.news
+def test_invalid_cursor_is_rejected(client: TestClient, feed):
+    """无效游标返回400"""
+    response = client.get("/api/v1/news/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.news
+def test_cursor_seek_uses_keyset_index(db, feed):
+    """游标定位走 (is_published, created_at, id) 索引，无需排序或全表扫描"""
+    cursor = encode_cursor(feed[10].created_at, feed[10].id)
+    stmt = NewsService._apply_cursor(db, select(News).where(News.is_published == True), cursor)
+    stmt = stmt.order_by(News.created_at.desc(), News.id.desc()).limit(10)
+
+    plan = _explain(db, stmt)
+
+    assert "ix_news_published_created_at_id" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,129 @@
+"""
+新闻查询数量测试
+响应内嵌作者、分类和标签，查询条数应与页大小无关（无 N+1）
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.news import Tag
+from app.schemas.news import NewsCreate, NewsSearch
+from app.services.news_service import NewsService
+
+
+@pytest.fixture
+def feed(db, test_user, test_category):
+    """30 篇带两个标签的已发布新闻"""
+    tags = [Tag(name=name, slug=name) for name in ("ai", "chip")]
+    db.add_all(tags)
+    db.commit()
+    tag_ids = [tag.id for tag in tags]
+    news_ids = []
+    for i in range(30):
+        news_in = NewsCreate(
+            title=f"Rust news {i}", slug=f"news-{i}", content="content",
+            category_id=test_category.id, is_published=True, tag_ids=tag_ids,
+        )
+        news_ids.append(NewsService.create(db, news_in=news_in, author_id=test_user.id).id)
+    # 清空会话，确保后续读取不会命中已加载的对象
+    db.expunge_all()
+    return {"news_ids": news_ids, "tags": tag_ids}
+
+
+@pytest.mark.news
+@pytest.mark.parametrize("params", [
+    {},
+    {"q": "rust"},
+    {"tag_ids": "TAGS"},
+])
+def test_list_query_count_is_independent_of_page_size(client: TestClient, feed, count_queries, params):
+    """列表接口的查询条数不随页大小增长"""
+    if params.get("tag_ids") == "TAGS":
+        params = {"tag_ids": feed["tags"]}
+
+    counts = []
+    for size in (2, 20):
+        with count_queries() as counter:
+            response = client.get("/api/v1/news/", params={**params, "size": size})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == size
+        counts.append(counter.count)
+
+    assert counts[0] == counts[1]
+    # 总数 + 当前页（JOIN 作者与分类）+ 标签
+    assert counts[1] <= 3
+
+
+@pytest.mark.news
+def test_list_response_embeds_relations(client: TestClient, feed):
+    """列表项包含作者、分类和标签"""
+    item = client.get("/api/v1/news/", params={"size": 1}).json()["items"][0]
+
+    assert item["author"]["username"] == "author"
+    assert item["category"]["slug"] == "tech"
+    assert {tag["slug"] for tag in item["tags"]} == {"ai", "chip"}
+
+
+@pytest.mark.news
+def test_detail_query_count(client: TestClient, feed, count_queries):
+    """详情接口：读取版本一条，加载新闻及关联两条查询，浏览计数不写数据库"""
+    news_id = feed["news_ids"][0]
+
+    with count_queries() as counter:
+        response = client.get(f"/api/v1/news/{news_id}")
+
+    assert response.status_code == 200
+    assert response.json()["view_count"] == 1
+    assert len(response.json()["tags"]) == 2
+    assert counter.count <= 3
+    assert not any(sql.lstrip().upper().startswith("UPDATE") for sql in counter.statements)
+
+
+@pytest.mark.news
+def test_service_read_paths_load_relations_eagerly(db, feed, count_queries):
+    """服务层读取方法返回的新闻访问关联时不再发出查询"""
+    with count_queries() as counter:
+        pages = [
+            NewsService.get_multi(db, limit=10),
+            NewsService.search_news(db, NewsSearch(size=10)).items,
+            [NewsService.get_by_slug(db, "news-3")],
+        ]
+    loaded = counter.count
+
+    with count_queries() as counter:
+        for items in pages:
+            for news in items:
+                news.author.username, news.category.name, list(news.tags)
+
+    assert loaded <= 7
+    assert counter.count == 0
+
+
+@pytest.mark.news
+@pytest.mark.parametrize("params", [
+    {},
+    {"q": "rust"},
+    {"tag_ids": "TAGS"},
+])
+def test_list_never_reads_content(client: TestClient, feed, count_queries, params):
+    """列表接口不读取也不返回正文，详情接口返回正文"""
+    if params.get("tag_ids") == "TAGS":
+        params = {"tag_ids": feed["tags"]}
+
+    with count_queries() as counter:
+        response = client.get("/api/v1/news/", params={**params, "size": 5})
+    detail = client.get(f"/api/v1/news/{feed['news_ids'][0]}")
+
+    assert response.status_code == 200
+    assert all("content" not in item for item in response.json()["items"])
+    assert not any("news.content" in sql for sql in counter.statements), counter.statements
+    assert detail.json()["content"] == "content"
+
+
+@pytest.mark.news
+def test_get_multi_defers_content(db, feed, count_queries):
+    """get_multi 不加载正文，访问时才单独查询"""
+    with count_queries() as counter:
+        items = NewsService.get_multi(db, limit=5)
+
+    assert not any("news.content" in sql for sql in counter.statements)
+    assert "content" not in items[0].__dict__
@@ -0,0 +1,111 @@
+"""
+新闻搜索测试
+测试全文检索（SQLite FTS5）与 ILIKE 兜底路径
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.schemas.news import NewsCreate, NewsUpdate, NewsSearch
+from app.services.news_service import NewsService
+
+
+def _create_news(db, author, category, slug, title, content, summary=None):
+    news_in = NewsCreate(
+        title=title,
+        slug=slug,
+        summary=summary,
+        content=content,
+        category_id=category.id,
+        is_published=True,
+    )
+    return NewsService.create(db, news_in=news_in, author_id=author.id)
+
+
+@pytest.fixture
+def search_corpus(db, test_user, test_category):
+    """搜索语料"""
+    return [
+        _create_news(db, test_user, test_category, "rust", "Rust release notes", "Compiler improvements"),
+        _create_news(db, test_user, test_category, "python", "Weekly roundup", "Python packaging and rust bindings"),
+        _create_news(db, test_user, test_category, "go", "Go generics", "Nothing related here", summary="rust mentioned in summary"),
+        _create_news(db, test_user, test_category, "misc", "Unrelated", "Completely different topic"),
+    ]
+
+
+@pytest.mark.news
+def test_fulltext_ranks_title_matches_first(db, search_corpus):
+    """标题命中的文章排在正文命中之前"""
+    result = NewsService.search_news(db, NewsSearch(q="rust"))
+
+    assert result.total == 3
+    assert [item.slug for item in result.items][0] == "rust"
+    assert {item.slug for item in result.items} == {"rust", "python", "go"}
+
+
+@pytest.mark.news
+def test_fulltext_requires_all_terms(db, search_corpus):
+    """多个关键词之间为AND关系"""
+    result = NewsService.search_news(db, NewsSearch(q="python rust"))
+
+    assert [item.slug for item in result.items] == ["python"]
+
+
+@pytest.mark.news
+def test_fulltext_index_follows_updates_and_deletes(db, search_corpus):
+    """更新和删除后索引保持同步"""
+    rust, python, go, misc = search_corpus
+    NewsService.update(db, misc.id, NewsUpdate(title="Rust in production"))
+    NewsService.delete(db, python.id)
+
+    result = NewsService.search_news(db, NewsSearch(q="rust"))
+
+    assert {item.slug for item in result.items} == {"rust", "go", "misc"}
+
+
+@pytest.mark.news
+def test_fulltext_escapes_query_syntax(db, search_corpus):
+    """用户输入中的FTS5语法字符不会导致查询报错"""
+    result = NewsService.search_news(db, NewsSearch(q='rust" OR "'))
+
+    assert result.total == 0
+
+
+@pytest.mark.news
+@pytest.mark.parametrize("q, expected", [
+    ("人工智能", {"ai-breakthrough", "ai-sports"}),
+    ("智能", {"ai-breakthrough", "ai-sports"}),
+    ("新", {"ai-breakthrough"}),
+    ("人工智能 突破", {"ai-breakthrough"}),
+])
+def test_fulltext_matches_chinese_text(db, test_user, test_category, q, expected):
+    """中文连续文本可以按子串检索（包括少于3个字的词）"""
+    _create_news(db, test_user, test_category, "ai-breakthrough", "人工智能新突破", "研究人员发布模型")
+    _create_news(db, test_user, test_category, "ai-sports", "体育快讯", "人工智能在比赛中的应用")
+    _create_news(db, test_user, test_category, "economy", "经济观察", "市场平稳")
+
+    result = NewsService.search_news(db, NewsSearch(q=q))
+
+    assert {item.slug for item in result.items} == expected
+    assert result.total == len(expected)
+
+
+@pytest.mark.news
+def test_like_mode_matches_substrings(db, search_corpus, monkeypatch):
+    """like 模式保留原有的子串匹配行为"""
+    monkeypatch.setattr(settings, "NEWS_SEARCH_MODE", "like")
+
+    result = NewsService.search_news(db, NewsSearch(q="ust"))
+
+    assert result.total == 3
+
+
+@pytest.mark.news
+def test_get_news_endpoint_returns_ranked_results(client: TestClient, search_corpus):
+    """列表接口返回按相关度排序的结果"""
+    response = client.get("/api/v1/news/", params={"q": "rust"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert data["items"][0]["slug"] == "rust"
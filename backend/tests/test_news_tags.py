@@ -0,0 +1,105 @@
+"""
+新闻标签过滤测试
+测试数据库过滤路径、位图索引路径及其增量更新
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.news import Tag
+from app.schemas.news import NewsCreate, NewsUpdate, NewsSearch
+from app.services import news_service
+from app.services.news_service import NewsService
+from app.services.tag_index import NewsTagIndex
+from app.tasks import news as news_task_module
+
+
+@pytest.fixture
+def tags(db):
+    """三个标签"""
+    tags = [Tag(name=name, slug=name) for name in ("ai", "chip", "space")]
+    db.add_all(tags)
+    db.commit()
+    return {tag.slug: tag.id for tag in tags}
+
+
+@pytest.fixture
+def tagged_news(db, test_user, test_category, tags):
+    """带标签的新闻：a[ai] b[ai, chip] c[chip] d[space, 精选] e[ai, 未发布]"""
+    def create(slug, tag_slugs, **fields):
+        news_in = NewsCreate(
+            title=slug, slug=slug, content="content", category_id=test_category.id,
+            is_published=fields.pop("is_published", True),
+            tag_ids=[tags[name] for name in tag_slugs], **fields,
+        )
+        return NewsService.create(db, news_in=news_in, author_id=test_user.id)
+
+    return {
+        "a": create("a", ["ai"]),
+        "b": create("b", ["ai", "chip"]),
+        "c": create("c", ["chip"]),
+        "d": create("d", ["space"], is_featured=True),
+        "e": create("e", ["ai"], is_published=False),
+    }
+
+
+@pytest.fixture(params=["database", "bitmap"])
+def tag_index(request, db, monkeypatch):
+    """分别在数据库过滤和位图索引两条路径上运行"""
+    index = NewsTagIndex()
+    monkeypatch.setattr(news_service, "news_tag_index", index)
+    monkeypatch.setattr(news_task_module, "news_tag_index", index)
+    if request.param == "bitmap":
+        index.rebuild(db)
+    return index
+
+
+def _slugs(db, **params):
+    return [item.slug for item in NewsService.search_news(db, NewsSearch(**params)).items]
+
+
+@pytest.mark.news
+def test_tag_filter_any_and_all(db, tags, tagged_news, tag_index):
+    """多个标签支持任一/全部两种匹配方式，结果按时间倒序"""
+    assert _slugs(db, tag_ids=[tags["ai"]]) == ["b", "a"]
+    assert _slugs(db, tag_ids=[tags["ai"], tags["chip"]]) == ["c", "b", "a"]
+    assert _slugs(db, tag_ids=[tags["ai"], tags["chip"]], tag_match="all") == ["b"]
+    assert _slugs(db, tag_ids=[tags["chip"], tags["space"]], is_featured=True) == ["d"]
+    assert _slugs(db, tag_ids=[tags["chip"], tags["space"]], is_featured=False) == ["c", "b"]
+
+
+@pytest.mark.news
+def test_tag_filter_follows_writes(db, tags, tagged_news, tag_index):
+    """修改标签、发布状态和删除后过滤结果随之更新"""
+    news = tagged_news
+    NewsService.update(db, news["c"].id, NewsUpdate(tag_ids=[tags["ai"]]))
+    NewsService.update(db, news["e"].id, NewsUpdate(is_published=True))
+    NewsService.delete(db, news["a"].id)
+
+    assert _slugs(db, tag_ids=[tags["ai"]]) == ["e", "c", "b"]
+    assert _slugs(db, tag_ids=[tags["chip"]]) == ["b"]
+
+
+@pytest.mark.news
+def test_tag_filter_pages_with_cursor(db, tags, tagged_news, tag_index):
+    """标签过滤同样支持游标翻页"""
+    first = NewsService.search_news(db, NewsSearch(tag_ids=[tags["ai"], tags["chip"]], size=2))
+    second = NewsService.search_news(
+        db, NewsSearch(tag_ids=[tags["ai"], tags["chip"]], size=2, cursor=first.next_cursor)
+    )
+
+    assert [item.slug for item in first.items] == ["c", "b"]
+    assert first.total == 3
+    assert [item.slug for item in second.items] == ["a"]
+    assert second.next_cursor is None
+
+
+@pytest.mark.news
+def test_tag_filter_endpoint(client: TestClient, tags, tagged_news):
+    """列表接口按标签过滤"""
+    response = client.get(
+        "/api/v1/news/",
+        params={"tag_ids": [tags["ai"], tags["chip"]], "tag_match": "all"},
+    )
+
+    assert response.status_code == 200
+    assert [item["slug"] for item in response.json()["items"]] == ["b"]
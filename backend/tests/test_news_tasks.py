@@ -0,0 +1,162 @@
+"""
+写入后任务测试
+写接口在响应之后合并执行任务、批量导入只有一个索引任务、订阅源提前重新生成、
+封面缩略图，以及投递到队列的任务按新闻去重
+"""
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import User
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services.news_cache import GLOBAL_GENERATION
+from app.services.news_feed import news_feed_cache
+from app.services.news_service import NewsService
+from app.tasks import news as news_task_module
+from app.tasks.celery_app import celery_app
+from app.tasks.news import generate_thumbnails, thumbnail_path
+
+
+@pytest.fixture
+def headers(db):
+    admin = User(
+        email="admin@example.com", username="admin", hashed_password="x",
+        is_active=True, is_superuser=True, is_verified=True,
+    )
+    db.add(admin)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token(subject=admin.id)}"}
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    """记录每次索引任务处理的新闻ID"""
+    calls = []
+    apply = news_task_module.index_news.apply
+
+    def spy(args=None, **options):
+        calls.append(list(args[0]))
+        return apply(args=args, **options)
+
+    monkeypatch.setattr(news_task_module.index_news, "apply", spy)
+    return calls
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """临时上传目录，其中有一张 1000x500 的封面"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    (tmp_path / "covers").mkdir()
+    Image.new("RGB", (1000, 500), "red").save(tmp_path / "covers" / "a.jpg")
+    return tmp_path
+
+
+def _create(db, user, category, slug, **fields):
+    return NewsService.create(db, NewsCreate(
+        title=slug, slug=slug, content="正文", category_id=category.id, is_published=True, **fields,
+    ), author_id=user.id)
+
+
+@pytest.mark.news
+def test_deferred_tasks_run_after_response(db, test_user, test_category, list_cache, trending, indexed):
+    """deferred 范围内的写入只登记任务，响应发送之后（后台任务）合并为一批执行"""
+    background = BackgroundTasks()
+    with news_task_module.news_tasks.deferred(background):
+        first = _create(db, test_user, test_category, "first")
+        second = _create(db, test_user, test_category, "second")
+        NewsService.update(db, first.id, NewsUpdate(title="改过的标题"))
+
+    assert indexed == []
+    assert list_cache.get(GLOBAL_GENERATION) is None
+    assert len(trending) == 0
+
+    asyncio.run(background())
+
+    assert indexed == [[first.id, second.id]]
+    assert int(list_cache.get(GLOBAL_GENERATION)) == 1
+    assert {article.title for article, _ in trending.top()} == {"改过的标题", "second"}
+
+
+@pytest.mark.news
+def test_service_calls_outside_request_run_immediately(db, test_user, test_category, trending, indexed):
+    """脚本或测试直接调用服务层时任务立即执行"""
+    news = _create(db, test_user, test_category, "news")
+    NewsService.delete(db, news.id)
+
+    assert indexed == [[news.id], [news.id]]
+    assert len(trending) == 0
+
+
+@pytest.mark.news
+def test_bulk_import_submits_one_batch(client: TestClient, headers, test_category, indexed, monkeypatch):
+    """批量导入的多个事务共用一批任务"""
+    monkeypatch.setattr(settings, "NEWS_BULK_BATCH_SIZE", 2)
+    payload = [
+        {"title": f"t{i}", "slug": f"s{i}", "content": "正文", "category_id": test_category.id}
+        for i in range(5)
+    ]
+
+    response = client.post("/api/v1/news/bulk", headers=headers, json=payload)
+
+    assert response.json()["created"] == 5
+    assert indexed == [sorted(item["id"] for item in response.json()["items"])]
+
+
+@pytest.mark.news
+def test_stale_feeds_are_regenerated(client: TestClient, db, test_user, test_category, monkeypatch):
+    """写入后重新生成订阅过的订阅源，self 链接使用 API_BASE_URL；没人订阅的不生成"""
+    monkeypatch.setattr(settings, "API_BASE_URL", "https://api.example.com")
+    _create(db, test_user, test_category, "old")
+    client.get("/api/v1/feeds/rss")
+
+    _create(db, test_user, test_category, "new")
+
+    feed = news_feed_cache.get("all", None, "rss")
+    assert feed is not None
+    assert b"/news/new</link>" in feed.body
+    assert b'href="https://api.example.com/api/v1/feeds/rss"' in feed.body
+    assert news_feed_cache.get("all", None, "atom") is None
+    assert news_feed_cache.get("category", test_category.slug, "rss") is None
+
+
+@pytest.mark.news
+def test_thumbnails_follow_cover(db, test_user, test_category, uploads):
+    """封面是上传文件时生成缩略图，换成外部链接或删除新闻后删除缩略图；上传目录之外的路径忽略"""
+    news = _create(db, test_user, test_category, "news", cover_image="/uploads/covers/a.jpg")
+    with Image.open(thumbnail_path(news.id)) as image:
+        assert image.size == (320, 160)
+
+    NewsService.update(db, news.id, NewsUpdate(cover_image="https://cdn.example.com/a.jpg"))
+    assert not thumbnail_path(news.id).exists()
+
+    NewsService.update(db, news.id, NewsUpdate(cover_image="/uploads/../covers/a.jpg"))
+    assert not thumbnail_path(news.id).exists()
+
+    other = _create(db, test_user, test_category, "other", cover_image="/uploads/covers/a.jpg")
+    NewsService.delete(db, other.id)
+    assert not thumbnail_path(other.id).exists()
+
+
+@pytest.mark.news
+def test_queued_thumbnails_are_deduplicated(db, test_user, test_category, uploads, monkeypatch):
+    """投递到队列时，同一篇新闻已在排队则不再投递；任务开始执行时清除标记"""
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", False)
+    # worker 中的任务使用 SessionLocal
+    monkeypatch.setattr(news_task_module, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    queued = []
+    monkeypatch.setattr(generate_thumbnails, "delay", lambda news_ids: queued.append(news_ids))
+    news = _create(db, test_user, test_category, "news", cover_image="/uploads/covers/a.jpg")
+
+    NewsService.update(db, news.id, NewsUpdate(cover_image="/uploads/covers/a.jpg"))
+    assert queued == [[news.id]]
+
+    generate_thumbnails.run(queued[0])
+    assert thumbnail_path(news.id).exists()
+    NewsService.update(db, news.id, NewsUpdate(cover_image=None))
+    assert queued == [[news.id], [news.id]]
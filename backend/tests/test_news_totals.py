@@ -0,0 +1,106 @@
+"""
+新闻列表总数测试
+测试计数表的增量维护、限量计数与不返回总数
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.news import Category
+from app.schemas.news import NewsCreate, NewsUpdate, NewsSearch
+from app.services.news_service import NewsService
+from app.services.news_totals import NewsTotals
+
+
+def _create_news(db, author, category, slug, **fields):
+    news_in = NewsCreate(
+        title=fields.pop("title", f"News {slug}"),
+        slug=slug,
+        content="content",
+        category_id=category.id,
+        is_published=fields.pop("is_published", True),
+        **fields,
+    )
+    return NewsService.create(db, news_in=news_in, author_id=author.id)
+
+
+@pytest.fixture
+def other_category(db):
+    """第二个分类"""
+    category = Category(name="体育", slug="sports", is_active=True)
+    db.add(category)
+    db.commit()
+    db.refresh(category)
+    return category
+
+
+@pytest.mark.news
+def test_counters_follow_inserts_updates_and_deletes(db, test_user, test_category, other_category):
+    """计数表随新增、修改、删除增量维护"""
+    first = _create_news(db, test_user, test_category, "a", is_featured=True)
+    second = _create_news(db, test_user, test_category, "b")
+    _create_news(db, test_user, other_category, "c")
+    _create_news(db, test_user, test_category, "draft", is_published=False)
+
+    assert NewsTotals.count_from_counters(db) == 3
+    assert NewsTotals.count_from_counters(db, category_id=test_category.id) == 2
+    assert NewsTotals.count_from_counters(db, is_featured=True) == 1
+
+    NewsService.update(db, second.id, NewsUpdate(category_id=other_category.id, is_featured=True))
+    NewsService.delete(db, first.id)
+
+    assert NewsTotals.count_from_counters(db) == 2
+    assert NewsTotals.count_from_counters(db, category_id=test_category.id) == 0
+    assert NewsTotals.count_from_counters(db, category_id=other_category.id, is_featured=True) == 1
+
+
+@pytest.mark.news
+def test_listing_total_does_not_scan_news(db, test_user, test_category):
+    """无关键词的列表总数来自计数表，不对 news 做 COUNT"""
+    for i in range(3):
+        _create_news(db, test_user, test_category, str(i))
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", capture)
+    try:
+        result = NewsService.search_news(db, NewsSearch(category_id=test_category.id))
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", capture)
+
+    assert (result.total, result.total_type, result.pages) == (3, "exact", 1)
+    assert not any("count(*)" in sql.lower() for sql in statements)
+
+
+@pytest.mark.news
+def test_keyword_total_is_estimated_above_limit(db, test_user, test_category, monkeypatch):
+    """关键词搜索超过计数上限时标记为估算值"""
+    monkeypatch.setattr(settings, "NEWS_TOTAL_COUNT_LIMIT", 2)
+    for i in range(4):
+        _create_news(db, test_user, test_category, str(i), title=f"Rust update {i}")
+
+    below = NewsService.search_news(db, NewsSearch(q="rust", category_id=test_category.id, size=2))
+    monkeypatch.setattr(settings, "NEWS_TOTAL_COUNT_LIMIT", 10)
+    exact = NewsService.search_news(db, NewsSearch(q="rust", size=2))
+
+    assert below.total_type == "estimated"
+    assert below.total >= 3
+    assert (exact.total, exact.total_type, exact.pages) == (4, "exact", 2)
+
+
+@pytest.mark.news
+def test_total_can_be_omitted(client: TestClient, db, test_user, test_category):
+    """with_total=false 时不返回总数和总页数"""
+    _create_news(db, test_user, test_category, "a")
+
+    response = client.get("/api/v1/news/", params={"with_total": "false"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert data["total_type"] is None
+    assert data["pages"] is None
+    assert len(data["items"]) == 1
@@ -0,0 +1,87 @@
+"""
+密码哈希执行器测试
+登录与注册经执行器计算 bcrypt，排队满时返回 503，代价因子变化后登录时重新计算哈希
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.password_hasher import PasswordHasher, bcrypt_rounds, password_hasher
+from app.models.user import User
+from app.services.user_service import UserService
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    """测试使用最小代价因子，在调用线程中计算"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+
+
+@pytest.fixture
+def registered(client: TestClient, db, test_user_data):
+    """注册并验证邮箱的用户"""
+    response = client.post("/api/v1/auth/register", json=test_user_data)
+    assert response.status_code == 201
+    UserService.verify_email(db, response.json()["id"])
+    return response.json()["id"]
+
+
+def _login(client: TestClient, test_user_data, password=None):
+    return client.post("/api/v1/auth/login", data={
+        "username": test_user_data["email"], "password": password or test_user_data["password"],
+    })
+
+
+@pytest.mark.auth
+def test_register_and_login(client: TestClient, db, registered, test_user_data):
+    """注册时按配置的代价因子计算哈希，正确的密码可以登录"""
+    assert bcrypt_rounds(db.get(User, registered).hashed_password) == 4
+
+    assert _login(client, test_user_data).status_code == 200
+    assert _login(client, test_user_data, password="wrong-password").status_code == 401
+
+
+@pytest.mark.auth
+def test_login_rehashes_when_cost_changes(client: TestClient, db, registered, test_user_data, monkeypatch):
+    """调整 BCRYPT_ROUNDS 后登录成功时按新的代价因子重新计算哈希"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+    assert _login(client, test_user_data, password="wrong-password").status_code == 401
+    db.expire_all()
+    assert bcrypt_rounds(db.get(User, registered).hashed_password) == 4
+
+    assert _login(client, test_user_data).status_code == 200
+    db.expire_all()
+    assert bcrypt_rounds(db.get(User, registered).hashed_password) == 5
+    assert _login(client, test_user_data).status_code == 200
+
+
+@pytest.mark.auth
+def test_sheds_load_when_queue_is_full(client: TestClient, registered, test_user_data, monkeypatch):
+    """等待哈希的请求达到上限时返回 503"""
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_hasher, "_slots", slots)
+
+    response = _login(client, test_user_data)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.mark.unit
+def test_process_pool(monkeypatch):
+    """工作进程中计算与校验哈希"""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    hasher = PasswordHasher()
+    try:
+        hashed = hasher.hash("secret")
+        assert hasher.verify("secret", hashed)
+        assert not hasher.verify("other", hashed)
+        assert not hasher.verify("secret", "not-a-bcrypt-hash")
+        assert not hasher.needs_rehash(hashed)
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,100 @@
+"""
+用户身份缓存测试
+认证依赖命中缓存时不查询用户表，用户变更后缓存失效
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services.principal_cache import Principal, PrincipalCache
+from app.services.user_service import UserService
+
+
+def _principal_queries(counter):
+    return [
+        sql for sql in counter.statements
+        if sql.startswith("SELECT users.id, users.is_active, users.is_superuser, users.is_verified \nFROM users")
+    ]
+
+
+@pytest.fixture
+def headers(test_user):
+    return {"Authorization": f"Bearer {create_access_token(subject=test_user.id)}"}
+
+
+@pytest.mark.auth
+def test_authenticated_requests_hit_cache(client: TestClient, headers, test_category, count_queries):
+    """第一次认证查询身份列，之后的请求不再查询用户表"""
+    payload = {"name": "体育", "slug": "sports"}
+
+    with count_queries() as first:
+        assert client.post("/api/v1/news/categories/", headers=headers, json=payload).status_code == 403
+    with count_queries() as second:
+        assert client.post("/api/v1/news/categories/", headers=headers, json=payload).status_code == 403
+
+    assert len(_principal_queries(first)) == 1
+    assert not any("FROM users" in sql for sql in second.statements)
+
+
+@pytest.mark.auth
+def test_optional_user_hits_cache(client: TestClient, headers, test_category, count_queries):
+    """可选认证的详情接口同样使用缓存"""
+    news = client.post("/api/v1/news/", headers=headers, json={
+        "title": "Title", "slug": "title", "content": "content",
+        "category_id": test_category.id, "is_published": True,
+    }).json()
+
+    with count_queries() as counter:
+        assert client.get(f"/api/v1/news/{news['id']}", headers=headers).status_code == 200
+
+    assert _principal_queries(counter) == []
+
+
+@pytest.mark.auth
+def test_service_changes_invalidate(client: TestClient, db, headers, test_user, principal_cache):
+    """update / verify_email / delete 后缓存失效，下一次请求读到新状态"""
+    UserService.get_principal(db, test_user.id)
+    UserService.update(db, test_user.id, UserUpdate(full_name="Renamed"))
+    assert principal_cache.get(test_user.id) is None
+
+    db.execute(update(User).where(User.id == test_user.id).values(is_verified=False))
+    db.commit()
+    assert UserService.get_principal(db, test_user.id).is_verified is False
+    UserService.verify_email(db, test_user.id)
+    assert UserService.get_principal(db, test_user.id).is_verified is True
+
+    UserService.delete(db, test_user.id)
+    assert client.post("/api/v1/news/categories/", headers=headers, json={"name": "x", "slug": "x"}).status_code == 401
+
+
+@pytest.mark.auth
+def test_direct_changes_visible_after_ttl(db, test_user, principal_cache, monkeypatch):
+    """绕过服务层的修改在条目过期后可见"""
+    assert UserService.get_principal(db, test_user.id).is_superuser is False
+    db.execute(update(User).where(User.id == test_user.id).values(is_superuser=True))
+    db.commit()
+    assert UserService.get_principal(db, test_user.id).is_superuser is False
+
+    monkeypatch.setattr(settings, "USER_PRINCIPAL_CACHE_TTL_SECONDS", 0)
+    principal_cache.invalidate(test_user.id)
+    assert UserService.get_principal(db, test_user.id).is_superuser is True
+    assert len(principal_cache) == 0
+
+
+@pytest.mark.unit
+def test_lru_eviction(monkeypatch):
+    """超出容量时淘汰最久未使用的条目"""
+    monkeypatch.setattr(settings, "USER_PRINCIPAL_CACHE_SIZE", 2)
+    cache = PrincipalCache()
+    for user_id in (1, 2):
+        cache.set(Principal(user_id, True, False, True))
+
+    cache.get(1)
+    cache.set(Principal(3, True, False, True))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
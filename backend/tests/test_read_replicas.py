@@ -0,0 +1,158 @@
+"""
+读写分离测试
+两个 SQLite 文件分别充当主库和只读副本（副本不自动同步，可据此判断查询发往哪个库）
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.cache import MemoryCache
+from app.core.config import settings
+from app.core.database import ReplicaSet, RoutingSession, get_db, get_read_db, read_pins
+from app.core.security import create_access_token
+from app.main import app
+from app.models.base import Base
+from app.models.news import Category, News
+from app.models.user import User
+from app.schemas.news import NewsCreate
+from app.services.news_service import NewsService
+
+
+def _seed(bind, title: str) -> None:
+    """用户、分类与一篇新闻；主库和副本使用不同标题"""
+    Base.metadata.create_all(bind=bind)
+    with sessionmaker(bind=bind)() as db:
+        db.add_all([
+            User(
+                id=1, email="writer@example.com", username="writer", hashed_password="x",
+                is_active=True, is_superuser=False, is_verified=True,
+            ),
+            Category(id=1, name="科技", slug="tech", is_active=True),
+        ])
+        db.commit()
+        NewsService.create(db, NewsCreate(
+            title=title, slug="news", content="content", category_id=1, is_published=True,
+        ), author_id=1)
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    """主库、两个副本与路由会话工厂，替换应用的 SessionLocal"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica_engines = [create_engine(f"sqlite:///{tmp_path / f'replica{i}.db'}") for i in range(2)]
+    _seed(primary, "fresh")
+    for replica in replica_engines:
+        _seed(replica, "stale")
+
+    replicas = ReplicaSet(replica_engines)
+    SessionRouting = sessionmaker(class_=RoutingSession, replicas=replicas, autoflush=False, bind=primary)
+
+    def override_get_db():
+        db = SessionRouting()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(database, "SessionLocal", SessionRouting)
+    monkeypatch.setattr(read_pins, "_client", MemoryCache())
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.delitem(app.dependency_overrides, get_read_db)
+    yield primary, replicas, SessionRouting
+    for bind in (primary, *replica_engines):
+        bind.dispose()
+
+
+def _titles(bind):
+    with sessionmaker(bind=bind)() as db:
+        return db.scalars(select(News.title).order_by(News.id)).all()
+
+
+@pytest.mark.news
+def test_reads_go_to_replica(client: TestClient, cluster):
+    """读接口查询副本"""
+    listing = client.get("/api/v1/news/")
+    detail = client.get("/api/v1/news/1")
+
+    assert [item["title"] for item in listing.json()["items"]] == ["stale"]
+    assert detail.json()["title"] == "stale"
+
+
+@pytest.mark.news
+def test_writes_go_to_primary(client: TestClient, cluster):
+    """写入只发往主库，会话内写入后的查询也走主库"""
+    primary, replicas, SessionRouting = cluster
+
+    with SessionRouting() as db:
+        db.use_replica()
+        assert db.get(News, 1).title == "stale"
+        db.add(Category(id=2, name="体育", slug="sports", is_active=True))
+        db.flush()
+        assert db.replica is None
+        assert db.scalar(select(Category.slug).where(Category.id == 2)) == "sports"
+        db.commit()
+
+    assert all(
+        sessionmaker(bind=replica)().get(Category, 2) is None for replica in replicas.engines
+    )
+    assert sessionmaker(bind=primary)().get(Category, 2) is not None
+
+
+@pytest.mark.unit
+def test_round_robin(cluster):
+    """副本轮流使用"""
+    _, replicas, _ = cluster
+
+    chosen = [replicas.choose() for _ in range(4)]
+
+    assert chosen == [*replicas.engines, *replicas.engines]
+
+
+@pytest.mark.news
+def test_failed_replica_is_ejected(client: TestClient, cluster, tmp_path, monkeypatch):
+    """副本不可用时请求在主库上重试，副本被暂停使用，到期后恢复"""
+    primary, _, _ = cluster
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([broken])
+    monkeypatch.setattr(
+        database, "SessionLocal", sessionmaker(class_=RoutingSession, replicas=replicas, bind=primary)
+    )
+
+    response = client.get("/api/v1/news/1")
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "fresh"
+    assert not replicas.is_healthy(broken)
+    assert replicas.choose() is None
+
+    monkeypatch.setattr(settings, "REPLICA_EJECT_SECONDS", 0)
+    replicas.eject(broken)
+    assert replicas.choose() is broken
+
+
+@pytest.mark.news
+def test_read_your_writes(client: TestClient, cluster):
+    """用户写入后其读请求走主库，其他人仍读副本"""
+    primary, _, _ = cluster
+    headers = {"Authorization": f"Bearer {create_access_token(subject=1)}"}
+
+    created = client.post("/api/v1/news/", headers=headers, json={
+        "title": "new", "slug": "new", "content": "content", "category_id": 1, "is_published": True,
+    })
+    assert created.status_code == 201
+    assert _titles(primary) == ["fresh", "new"]
+
+    assert client.get(f"/api/v1/news/{created.json()['id']}", headers=headers).status_code == 200
+    assert client.get(f"/api/v1/news/{created.json()['id']}").status_code == 404
+
+
+@pytest.mark.auth
+def test_reads_without_writes_are_not_pinned(client: TestClient, cluster):
+    """只读请求不会把用户固定到主库"""
+    headers = {"Authorization": f"Bearer {create_access_token(subject=1)}"}
+
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert not read_pins.is_pinned(1)
+    assert client.get("/api/v1/news/1", headers=headers).json()["title"] == "stale"
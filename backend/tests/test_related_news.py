@@ -0,0 +1,116 @@
+"""
+相关新闻索引测试
+全量构建的邻居、写入后的增量更新、接口直接读取索引
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.news import Category, Tag
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services.news_service import NewsService
+from app.services.related_news import RelatedNewsIndex
+
+ARTICLES = {
+    "model": ("大模型推理能力提升", "新发布的大模型在推理和代码生成上明显提升，训练数据规模扩大"),
+    "agent": ("大模型智能体上线", "基于大模型的智能体可以自动完成代码生成与推理任务"),
+    "chip": ("训练芯片出货", "用于大模型训练的芯片出货量增长，数据中心扩容"),
+    "stock": ("股市收盘上涨", "今日股市收盘上涨，银行板块领涨，成交量放大"),
+    "bank": ("银行降息", "多家银行下调存款利率，股市银行板块走强"),
+}
+
+
+@pytest.fixture
+def articles(db, test_user, test_category):
+    """AI 主题三篇（model/agent 带同一标签）、财经主题两篇、一篇草稿"""
+    finance = Category(name="财经", slug="finance", is_active=True)
+    ai = Tag(name="人工智能", slug="ai")
+    db.add_all([finance, ai])
+    db.commit()
+
+    ids = {}
+    for slug, (title, content) in ARTICLES.items():
+        category_id = finance.id if slug in ("stock", "bank") else test_category.id
+        news = NewsService.create(db, NewsCreate(
+            title=title, slug=slug, content=content, category_id=category_id, is_published=True,
+            tag_ids=[ai.id] if slug in ("model", "agent") else [],
+        ), author_id=test_user.id)
+        ids[slug] = news.id
+    ids["draft"] = NewsService.create(db, NewsCreate(
+        title="大模型推理草稿", slug="draft", content=ARTICLES["model"][1], category_id=test_category.id,
+    ), author_id=test_user.id).id
+    ids["finance"], ids["tag"] = finance.id, ai.id
+    return ids
+
+
+def _related(index, news_id):
+    return [article.slug for article, _ in index.get(news_id)]
+
+
+@pytest.mark.news
+def test_rebuild_ranks_by_text_tags_and_category(db, articles, monkeypatch):
+    """全量构建：同主题、同标签、同分类的新闻排在前面，不含自身和未发布的新闻"""
+    monkeypatch.setattr(settings, "RELATED_NEWS_TOP_K", 3)
+    index = RelatedNewsIndex()
+    index.rebuild(db)
+
+    assert len(index) == 5
+    assert _related(index, articles["model"])[:2] == ["agent", "chip"]
+    # 没有任何共同特征的新闻不算相关
+    assert _related(index, articles["stock"]) == ["bank"]
+    assert index.get(articles["draft"]) == []
+    scores = [score for _, score in index.get(articles["model"])]
+    assert scores == sorted(scores, reverse=True) and 0 < scores[-1] < scores[0] <= 1
+
+
+@pytest.mark.news
+def test_incremental_updates(db, articles, related_index, monkeypatch):
+    """新建、修改、下线和删除新闻后，相关列表随之更新"""
+    monkeypatch.setattr(settings, "RELATED_NEWS_TOP_K", 2)
+    related_index.rebuild(db)
+
+    news = NewsService.create(db, NewsCreate(
+        title="银行股市观察", slug="bank-2", content="银行板块与股市成交量", category_id=articles["finance"],
+        is_published=True,
+    ), author_id=1)
+    assert "bank-2" in _related(related_index, articles["bank"])
+    assert set(_related(related_index, news.id)) == {"bank", "stock"}
+
+    NewsService.update(db, news.id, NewsUpdate(is_published=False))
+    assert related_index.get(news.id) == []
+    assert "bank-2" not in _related(related_index, articles["bank"])
+    assert _related(related_index, articles["bank"]) == ["stock"]
+
+    NewsService.update(db, articles["draft"], NewsUpdate(is_published=True, tag_ids=[articles["tag"]]))
+    assert _related(related_index, articles["model"])[0] == "draft"
+
+    NewsService.delete(db, articles["agent"])
+    assert "agent" not in _related(related_index, articles["model"])
+    assert "agent" not in _related(related_index, articles["draft"])
+
+
+@pytest.mark.news
+def test_incremental_matches_rebuild(db, articles, related_index, monkeypatch):
+    """逐条写入得到的相关列表与全量构建一致"""
+    monkeypatch.setattr(settings, "RELATED_NEWS_TOP_K", 2)
+    rebuilt = RelatedNewsIndex()
+    rebuilt.rebuild(db)
+
+    for slug in ARTICLES:
+        assert set(_related(related_index, articles[slug])) == set(_related(rebuilt, articles[slug]))
+
+
+@pytest.mark.news
+def test_related_endpoint_reads_index(client: TestClient, db, articles, related_index, count_queries):
+    """接口只读取索引，不查询数据库"""
+    related_index.rebuild(db)
+
+    with count_queries() as counter:
+        response = client.get(f"/api/v1/news/{articles['model']}/related", params={"limit": 2})
+        missing = client.get("/api/v1/news/999/related")
+
+    assert counter.count == 0
+    body = response.json()
+    assert [item["slug"] for item in body] == ["agent", "chip"]
+    assert set(body[0]) == {"id", "title", "slug", "summary", "cover_image", "category_id", "created_at", "score"}
+    assert missing.json() == []
@@ -0,0 +1,195 @@
+"""
+进程内搜索索引测试
+测试分词、BM25排序、增量更新和快照
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.news import NewsCreate, NewsUpdate, NewsSearch
+from app.services import news_service
+from app.services.news_service import NewsService
+from app.services import search_index
+from app.services.search_index import NewsSearchIndex, init_search_index, tokenize
+from app.tasks import news as news_task_module
+
+
+def _doc(news_id, title, content, summary=None, category_id=1, **flags):
+    return SimpleNamespace(
+        id=news_id,
+        title=title,
+        summary=summary,
+        content=content,
+        category_id=category_id,
+        is_published=flags.get("is_published", True),
+        is_featured=flags.get("is_featured", False),
+        is_breaking=flags.get("is_breaking", False),
+    )
+
+
+def test_tokenize_mixes_cjk_bigrams_and_words():
+    """汉字二元切分，英文按词切分并转小写"""
+    assert tokenize("人工智能 OpenAI发布GPT-5") == [
+        "人工", "工智", "智能", "openai", "发布", "gpt", "5",
+    ]
+    assert tokenize("新") == ["新"]
+    assert tokenize(None) == []
+
+
+def test_bm25_ranks_title_hits_above_body_hits():
+    """标题命中的权重高于正文"""
+    index = NewsSearchIndex()
+    index.add(_doc(1, "体育快讯", "人工智能在比赛中的应用"))
+    index.add(_doc(2, "人工智能新突破", "研究人员发布新模型"))
+    index.add(_doc(3, "经济观察", "市场平稳"))
+
+    total, news_ids = index.search("人工智能")
+
+    assert total == 2
+    assert news_ids == [2, 1]
+
+
+def test_single_cjk_character_query_matches():
+    """单字查询可以命中多字词中的汉字"""
+    index = NewsSearchIndex()
+    index.add(_doc(1, "人工智能新突破", "研究人员发布模型"))
+    index.add(_doc(2, "经济观察", "市场平稳"))
+
+    assert index.search("新") == (1, [1])
+    assert index.search("场") == (1, [2])
+
+
+def test_idf_ignores_dead_postings():
+    """失效槽位不计入文档频率：大量删除后排序与从头构建的索引一致"""
+    churned = NewsSearchIndex()
+    for news_id in range(100, 110):
+        churned.add(_doc(news_id, "芯片", "芯片"))
+        churned.remove(news_id)
+    fresh = NewsSearchIndex()
+    for index in (churned, fresh):
+        # “芯片”比“市场”少见，idf 更高，芯片词频高的 1 号应排在前面
+        index.add(_doc(1, "芯片", "市场"))
+        index.add(_doc(2, "市场", "芯片"))
+        index.add(_doc(3, "市场", "经济"))
+
+    assert fresh.search("芯片 市场") == (2, [1, 2])
+    assert churned.search("芯片 市场") == (2, [1, 2])
+
+
+def test_search_filters_and_paginates():
+    """按分类/精选过滤并分页"""
+    index = NewsSearchIndex()
+    for news_id in range(1, 6):
+        index.add(_doc(news_id, "芯片新闻", "芯片", category_id=news_id % 2, is_featured=news_id == 3))
+
+    assert index.search("芯片", category_id=1)[0] == 3
+    assert index.search("芯片", is_featured=True) == (1, [3])
+    total, page = index.search("芯片", offset=2, limit=2)
+    assert total == 5
+    assert len(page) == 2
+
+
+def test_reindex_and_remove_hide_stale_postings():
+    """更新、下线和删除后旧内容不再命中"""
+    index = NewsSearchIndex()
+    index.add(_doc(1, "旧标题", "内容"))
+    index.add(_doc(2, "旧标题", "内容"))
+    index.add(_doc(1, "新标题", "内容"))
+    index.add(_doc(2, "旧标题", "内容", is_published=False))
+
+    assert index.search("旧标题") == (0, [])
+    assert index.search("新标题") == (1, [1])
+
+    index.remove(1)
+    assert index.search("新标题") == (0, [])
+    assert len(index) == 0
+
+
+def test_snapshot_round_trip(tmp_path):
+    """快照保存后可以完整加载"""
+    index = NewsSearchIndex()
+    index.add(_doc(1, "量子计算", "实验室取得进展"))
+    index.add(_doc(2, "量子通信", "卫星"))
+    index.remove(2)
+    snapshot = tmp_path / "index.snapshot"
+    index.save(str(snapshot))
+
+    loaded = NewsSearchIndex()
+    assert loaded.load(str(snapshot))
+    assert loaded.search("量子") == (1, [1])
+    assert [p.name for p in tmp_path.iterdir()] == ["index.snapshot"]
+
+
+@pytest.mark.news
+def test_init_rebuilds_when_snapshot_is_corrupt(db, test_user, test_category, tmp_path, monkeypatch):
+    """快照损坏时从数据库重建，而不是让启动失败"""
+    index = NewsSearchIndex()
+    monkeypatch.setattr(search_index, "news_search_index", index)
+    NewsService.create(db, news_in=NewsCreate(
+        title="量子计算", slug="q", content="正文", category_id=test_category.id, is_published=True,
+    ), author_id=test_user.id)
+    snapshot = tmp_path / "index.snapshot"
+    snapshot.write_bytes(b"not a pickle")
+
+    init_search_index(db, str(snapshot))
+
+    assert index.is_loaded
+    assert index.search("量子")[0] == 1
+    assert NewsSearchIndex().load(str(snapshot))
+
+
+@pytest.mark.news
+def test_catch_up_reconciles_writes_from_other_processes(db, test_user, test_category):
+    """对账时移除已在数据库中删除的新闻，并补入水位线之前漏掉的新闻"""
+    def create(slug, title):
+        return NewsService.create(db, news_in=NewsCreate(
+            title=title, slug=slug, content="正文", category_id=test_category.id, is_published=True,
+        ), author_id=test_user.id)
+
+    deleted = create("a", "深度学习框架")
+    kept = create("b", "深度学习入门")
+    index = NewsSearchIndex()
+    index.rebuild(db)
+
+    # 模拟其他进程：删除一篇，并写入一篇 updated_at 早于水位线的新闻
+    db.delete(deleted)
+    db.commit()
+    late = create("c", "深度学习实践")
+    late.updated_at = index.watermark.replace(year=index.watermark.year - 1)
+    db.commit()
+
+    index.catch_up(db)
+
+    total, news_ids = index.search("深度学习")
+    assert total == 2
+    assert set(news_ids) == {kept.id, late.id}
+
+
+@pytest.mark.news
+def test_news_service_keeps_index_in_sync(db, test_user, test_category, monkeypatch):
+    """bm25 模式下 NewsService 的写操作增量更新索引，搜索不依赖数据库候选集"""
+    index = NewsSearchIndex()
+    monkeypatch.setattr(news_service, "news_search_index", index)
+    monkeypatch.setattr(news_task_module, "news_search_index", index)
+    monkeypatch.setattr(settings, "NEWS_SEARCH_MODE", "bm25")
+
+    def create(slug, title):
+        news_in = NewsCreate(
+            title=title, slug=slug, content="正文内容",
+            category_id=test_category.id, is_published=True,
+        )
+        return NewsService.create(db, news_in=news_in, author_id=test_user.id)
+
+    first = create("a", "深度学习框架发布")
+    second = create("b", "机器学习入门")
+    index.rebuild(db)
+
+    NewsService.update(db, second.id, NewsUpdate(title="深度学习入门"))
+    result = NewsService.search_news(db, NewsSearch(q="深度学习"))
+    assert {item.id for item in result.items} == {first.id, second.id}
+
+    NewsService.delete(db, first.id)
+    result = NewsService.search_news(db, NewsSearch(q="深度学习"))
+    assert result.total == 1
+    assert [item.id for item in result.items] == [second.id]
@@ -0,0 +1,103 @@
+"""
+站点地图测试
+索引与分片内容、键集分批扫描、分片缓存以及写入后只重新生成所在分片
+"""
+import gzip
+from xml.etree import ElementTree
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services import sitemap
+from app.services.news_service import NewsService
+
+NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+@pytest.fixture
+def news(db, test_user, test_category, monkeypatch):
+    """每个分片 4 个 id：id 1-7，其中 id 2 未发布"""
+    monkeypatch.setattr(settings, "SITEMAP_SHARD_SIZE", 4)
+    for i in range(1, 8):
+        NewsService.create(db, NewsCreate(
+            title=f"新闻 {i}", slug=f"news-{i}&x", content="正文",
+            category_id=test_category.id, is_published=i != 2,
+        ), author_id=test_user.id)
+
+
+def _locs(response):
+    root = ElementTree.fromstring(gzip.decompress(response.content))
+    return [loc.text for loc in root.iter(f"{NS}loc")]
+
+
+@pytest.mark.news
+def test_sitemap_index_and_shards(client: TestClient, news):
+    """索引列出每个分片；分片只包含区间内已发布的新闻"""
+    index = client.get("/api/v1/sitemaps/sitemap.xml")
+
+    assert index.headers["content-type"] == "application/xml"
+    shard_urls = [loc.text for loc in ElementTree.fromstring(index.content).iter(f"{NS}loc")]
+    assert shard_urls == [
+        "http://testserver/api/v1/sitemaps/sitemap-0.xml.gz",
+        "http://testserver/api/v1/sitemaps/sitemap-1.xml.gz",
+    ]
+
+    first = client.get("/api/v1/sitemaps/sitemap-0.xml.gz")
+    assert first.headers["content-type"] == "application/gzip"
+    assert _locs(first) == [f"{settings.SITE_URL}/news/news-{i}&x" for i in (1, 3)]
+    assert _locs(client.get("/api/v1/sitemaps/sitemap-1.xml.gz")) == [
+        f"{settings.SITE_URL}/news/news-{i}&x" for i in (4, 5, 6, 7)
+    ]
+    assert client.get("/api/v1/sitemaps/sitemap-2.xml.gz").status_code == 404
+
+
+@pytest.mark.news
+def test_shard_scanned_in_batches(client: TestClient, news, monkeypatch, count_queries):
+    """分片按 id 键集逐批扫描"""
+    monkeypatch.setattr(sitemap, "SCAN_BATCH_SIZE", 2)
+
+    with count_queries() as counter:
+        response = client.get("/api/v1/sitemaps/sitemap-1.xml.gz")
+
+    assert len(_locs(response)) == 4
+    scans = [sql for sql in counter.statements if "news.updated_at" in sql]
+    assert len(scans) == 3
+
+
+@pytest.mark.news
+def test_cached_shard_costs_no_queries(client: TestClient, news, count_queries):
+    """生成后的分片从缓存返回，带验证器；索引中给出已缓存分片的最后修改时间"""
+    first = client.get("/api/v1/sitemaps/sitemap-1.xml.gz")
+
+    with count_queries() as counter:
+        cached = client.get("/api/v1/sitemaps/sitemap-1.xml.gz")
+        revalidated = client.get("/api/v1/sitemaps/sitemap-1.xml.gz", headers={"If-None-Match": cached.headers["etag"]})
+
+    assert counter.count == 0
+    assert cached.content == first.content
+    assert revalidated.status_code == 304
+
+    index = ElementTree.fromstring(client.get("/api/v1/sitemaps/sitemap.xml").content)
+    assert [entry.find(f"{NS}lastmod") is not None for entry in index.iter(f"{NS}sitemap")] == [False, True]
+
+
+@pytest.mark.news
+def test_update_regenerates_only_its_shard(client: TestClient, db, news, count_queries):
+    """修改一篇新闻只使其所在分片失效"""
+    client.get("/api/v1/sitemaps/sitemap-0.xml.gz")
+    client.get("/api/v1/sitemaps/sitemap-1.xml.gz")
+
+    NewsService.update(db, 2, NewsUpdate(is_published=True))
+
+    with count_queries() as counter:
+        client.get("/api/v1/sitemaps/sitemap-1.xml.gz")
+    assert counter.count == 0
+
+    assert _locs(client.get("/api/v1/sitemaps/sitemap-0.xml.gz")) == [
+        f"{settings.SITE_URL}/news/news-{i}&x" for i in (1, 2, 3)
+    ]
+
+    NewsService.delete(db, 7)
+    assert len(_locs(client.get("/api/v1/sitemaps/sitemap-1.xml.gz"))) == 3
@@ -0,0 +1,94 @@
+"""
+已验证令牌缓存测试
+同一令牌只解码一次，条目在令牌过期时失效
+"""
+from datetime import timedelta
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import (
+    create_access_token, get_token_expiration, is_token_expired, verified_token_cache, verify_token,
+)
+
+
+@pytest.fixture(autouse=True)
+def token_cache():
+    verified_token_cache.clear()
+    yield verified_token_cache
+    verified_token_cache.clear()
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """统计 jwt.decode 调用次数"""
+    calls = []
+    decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+
+@pytest.mark.unit
+def test_helpers_share_one_decode(decode_calls):
+    """三个辅助函数对同一令牌只解码一次"""
+    token = create_access_token(subject=7)
+
+    assert verify_token(token) == "7"
+    assert is_token_expired(token) is False
+    assert get_token_expiration(token) is not None
+    assert verify_token(token) == "7"
+
+    assert len(decode_calls) == 1
+
+
+@pytest.mark.unit
+def test_invalid_tokens_are_not_cached(decode_calls, token_cache):
+    """签名错误或已过期的令牌每次都被拒绝，不进入缓存"""
+    token = create_access_token(subject=7)
+    tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+    expired = create_access_token(subject=7, expires_delta=timedelta(seconds=-1))
+
+    for _ in range(2):
+        assert verify_token(tampered) is None
+        assert verify_token(expired) is None
+    assert is_token_expired(expired) is True
+    assert get_token_expiration(expired) is None
+
+    assert len(token_cache) == 0
+    assert len(decode_calls) == 6
+
+
+@pytest.mark.unit
+def test_entry_expires_with_token(decode_calls, monkeypatch):
+    """缓存条目在令牌的 exp 时刻失效，之后重新验证并被拒绝"""
+    token = create_access_token(subject=7, expires_delta=timedelta(minutes=5))
+    assert verify_token(token) == "7"
+
+    now = security.time.time()
+    monkeypatch.setattr(security.time, "time", lambda: now + 301)
+
+    assert verified_token_cache.get(token) is None
+    assert len(decode_calls) == 1
+
+
+@pytest.mark.unit
+def test_cache_is_bounded(monkeypatch, token_cache):
+    """超过容量时淘汰最久未使用的令牌；容量为 0 时关闭缓存"""
+    monkeypatch.setattr(settings, "TOKEN_CACHE_SIZE", 2)
+    tokens = [create_access_token(subject=i) for i in range(3)]
+    for token in tokens:
+        verify_token(token)
+
+    assert len(token_cache) == 2
+    assert token_cache.get(tokens[0]) is None
+
+    monkeypatch.setattr(settings, "TOKEN_CACHE_SIZE", 0)
+    token_cache.clear()
+    verify_token(tokens[0])
+    assert len(token_cache) == 0
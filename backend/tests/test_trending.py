@@ -0,0 +1,122 @@
+"""
+热门新闻测试
+时间衰减、浏览累加、有界的前 N 名（挤出与补位）以及接口不查询数据库
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.models.news import Category, News
+from app.schemas.news import NewsCreate, NewsUpdate
+from app.services.news_service import NewsService
+from app.services.trending import TrendingEngine
+
+
+@pytest.fixture
+def news(db, test_user, test_category, monkeypatch):
+    """科技分类 3 篇、财经分类 1 篇、一篇草稿；发布时间依次错开，old 发布于 10 小时前且已有 100 次浏览"""
+    monkeypatch.setattr(settings, "TRENDING_HALF_LIFE_HOURS", 1.0)
+    finance = Category(name="财经", slug="finance", is_active=True)
+    db.add(finance)
+    db.commit()
+
+    ids = {}
+    for slug, category_id, published in [
+        ("old", test_category.id, True), ("fresh", test_category.id, True), ("quiet", test_category.id, True),
+        ("finance", finance.id, True), ("draft", test_category.id, False),
+    ]:
+        ids[slug] = NewsService.create(db, NewsCreate(
+            title=slug, slug=slug, content="正文", category_id=category_id, is_published=published,
+        ), author_id=test_user.id).id
+    now = datetime.now(timezone.utc)
+    for slug, age in [("old", timedelta(hours=10)), ("finance", timedelta(minutes=10)), ("quiet", timedelta(minutes=20))]:
+        db.execute(update(News).where(News.id == ids[slug]).values(created_at=now - age))
+    db.execute(update(News).where(News.id == ids["old"]).values(view_count=100))
+    db.commit()
+    ids["finance_category"] = finance.id
+    return ids
+
+
+def _ranked(engine, category_id=None):
+    return [article.slug for article, _ in engine.top(category_id)]
+
+
+@pytest.mark.news
+def test_rebuild_decays_old_counts(db, news):
+    """旧新闻的累计浏览按发布时间衰减，排在新发布的新闻之后；草稿不在列"""
+    engine = TrendingEngine()
+    engine.rebuild(db)
+
+    assert len(engine) == 4
+    assert _ranked(engine) == ["fresh", "finance", "quiet", "old"]
+    assert _ranked(engine, news["finance_category"]) == ["finance"]
+    assert engine.top(category_id=999) == []
+    old_score = engine.top()[-1][1]
+    # 100 次浏览加上发布本身，经过 10 个半衰期
+    assert old_score == pytest.approx(101 / 1024, rel=1e-3)
+
+
+@pytest.mark.news
+def test_views_raise_score(db, news, trending):
+    """浏览实时累加热度，热度不随时间重新计算排名"""
+    trending.rebuild(db)
+
+    for _ in range(3):
+        NewsService.increment_view_count(news["quiet"])
+    NewsService.increment_view_count(news["draft"])
+
+    ranked = trending.top()
+    assert ranked[0][0].slug == "quiet"
+    assert ranked[0][1] == pytest.approx(3 + 2 ** (-1 / 3), rel=1e-3)
+    assert "draft" not in _ranked(trending)
+
+    # 一小时前的浏览只计一半
+    trending.record(news["fresh"], 8, at=datetime.now(timezone.utc) - timedelta(hours=1))
+    assert trending.top()[0][1] == pytest.approx(5, rel=1e-3)
+
+
+@pytest.mark.news
+def test_bounded_top_evicts_and_refills(db, news, trending, test_category, monkeypatch):
+    """前 N 名有界：热度超过第 N 名时挤掉它；成员下线、删除或换分类时由次高者补上"""
+    monkeypatch.setattr(settings, "TRENDING_SIZE", 2)
+    trending.rebuild(db)
+    assert _ranked(trending) == ["fresh", "finance"]
+
+    trending.record(news["old"], 50)
+    assert _ranked(trending) == ["old", "fresh"]
+
+    NewsService.update(db, news["old"], NewsUpdate(is_published=False))
+    assert _ranked(trending) == ["fresh", "finance"]
+    assert _ranked(trending, test_category.id) == ["fresh", "quiet"]
+
+    NewsService.update(db, news["finance"], NewsUpdate(category_id=test_category.id))
+    assert _ranked(trending, news["finance_category"]) == []
+    assert _ranked(trending, test_category.id) == ["fresh", "finance"]
+
+    NewsService.delete(db, news["fresh"])
+    assert _ranked(trending) == ["finance", "quiet"]
+
+    NewsService.update(db, news["draft"], NewsUpdate(is_published=True, title="草稿上线"))
+    trending.record(news["draft"], 10)
+    assert trending.top()[0][0].title == "草稿上线"
+
+
+@pytest.mark.news
+def test_trending_endpoint(client: TestClient, db, news, trending, count_queries):
+    """接口只读取内存中的排行；浏览详情页会累加热度"""
+    trending.rebuild(db)
+    for _ in range(5):
+        client.get(f"/api/v1/news/{news['quiet']}")
+
+    with count_queries() as counter:
+        everything = client.get("/api/v1/news/trending", params={"limit": 2})
+        category = client.get("/api/v1/news/trending", params={"category_id": news["finance_category"]})
+
+    assert counter.count == 0
+    body = everything.json()
+    assert [item["slug"] for item in body] == ["quiet", "fresh"]
+    assert set(body[0]) == {"id", "title", "slug", "summary", "cover_image", "category_id", "created_at", "score"}
+    assert [item["slug"] for item in category.json()] == ["finance"]
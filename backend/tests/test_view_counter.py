@@ -0,0 +1,114 @@
+"""
+浏览计数缓冲测试
+测试浏览不写数据库、批量刷新、并发累加、刷新失败不丢失以及 Redis 缓冲
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.news import News
+from app.schemas.news import NewsCreate
+from app.services.news_service import NewsService
+
+
+@pytest.fixture
+def articles(db, test_user, test_category):
+    """三篇已发布新闻的ID"""
+    ids = []
+    for i in range(3):
+        news_in = NewsCreate(
+            title=f"News {i}", slug=f"news-{i}", content="content",
+            category_id=test_category.id, is_published=True,
+        )
+        ids.append(NewsService.create(db, news_in=news_in, author_id=test_user.id).id)
+    return ids
+
+
+def _view_counts(db, ids):
+    db.expire_all()
+    rows = db.execute(select(News.id, News.view_count).where(News.id.in_(ids)))
+    return dict(rows.all())
+
+
+@pytest.mark.news
+def test_detail_view_does_not_write(client: TestClient, db, articles, count_queries):
+    """详情接口不写数据库，响应中的浏览次数包含缓冲的部分"""
+    with count_queries() as counter:
+        client.get(f"/api/v1/news/{articles[0]}")
+        response = client.get(f"/api/v1/news/{articles[0]}")
+
+    assert response.json()["view_count"] == 2
+    assert not any(sql.lstrip().upper().startswith("UPDATE") for sql in counter.statements)
+    assert _view_counts(db, articles)[articles[0]] == 0
+
+
+@pytest.mark.news
+def test_flush_batches_increments(db, articles, view_counter, count_queries):
+    """刷新时每篇新闻执行一次增量 UPDATE，不修改 updated_at"""
+    updated_at = db.get(News, articles[0]).updated_at
+    for news_id, views in zip(articles, (5, 1, 0)):
+        for _ in range(views):
+            view_counter.add(news_id)
+
+    with count_queries() as counter:
+        assert view_counter.flush(db) == 2
+
+    assert _view_counts(db, articles) == {articles[0]: 5, articles[1]: 1, articles[2]: 0}
+    assert db.get(News, articles[0]).updated_at == updated_at
+    assert sum(sql.lstrip().upper().startswith("UPDATE") for sql in counter.statements) == 1
+    assert view_counter.flush(db) == 0
+
+
+@pytest.mark.news
+def test_concurrent_views_are_not_lost(db, articles, view_counter):
+    """并发浏览的增量全部写入"""
+    def view():
+        for _ in range(500):
+            view_counter.add(articles[0])
+
+    threads = [threading.Thread(target=view) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    view_counter.flush(db)
+
+    assert _view_counts(db, articles)[articles[0]] == 4000
+
+
+@pytest.mark.news
+def test_failed_flush_keeps_increments(db, articles, view_counter, monkeypatch):
+    """写入失败时增量放回缓冲，下次刷新写入"""
+    view_counter.add(articles[0], 3)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "execute", fail)
+        with pytest.raises(RuntimeError):
+            view_counter.flush(db)
+
+    assert view_counter.pending(articles[0]) == 3
+    view_counter.flush(db)
+    assert _view_counts(db, articles)[articles[0]] == 3
+
+
+@pytest.mark.news
+def test_redis_buffer(db, articles, view_counter, list_cache, monkeypatch):
+    """Redis 缓冲由任一进程刷新；刷新后写入的浏览留到下次"""
+    monkeypatch.setattr(settings, "VIEW_COUNT_BUFFER", "redis")
+    view_counter.add(articles[0], 2)
+    view_counter.add(articles[1])
+
+    assert view_counter.pending(articles[0]) == 2
+    assert view_counter._pending == {}
+    assert view_counter.flush(db) == 2
+    view_counter.add(articles[0])
+
+    assert _view_counts(db, articles)[articles[0]] == 2
+    assert view_counter.pending(articles[0]) == 1
+    assert not any(":flushing:" in key for key in list_cache._data)